@@ -12,6 +12,12 @@ class AppBaseConfig(BaseConfig):
     PORT: int = 8000
     RELOAD: bool = True
     ALLOWED_ORIGINS: Annotated[list[str], NoDecode] = []
+    FRIEND_CACHE_TTL_SECONDS: int = 60
+    HEATMAP_TILE_CACHE_TTL_SECONDS: int = 300
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    MAX_REQUEST_BODY_SIZE: int = 32 * 1024 * 1024
+    # Bearer token required by /metrics, which is disabled while unset
+    METRICS_TOKEN: str = ""
 
     @field_validator("ALLOWED_ORIGINS", mode="before")
     def parse_allowed_origins(cls, value: str) -> list[str]:
@@ -7,6 +7,10 @@ class DBConfig(BaseConfig):
     HOST: str = "localhost"
     PORT: int = 5432
     DB: str = "postgres"
+    # Diagnostics: warn about requests running more statements than the budget
+    # or repeating one statement shape threshold times; 0 disables each check
+    QUERY_BUDGET: int = 0
+    QUERY_REPEAT_THRESHOLD: int = 0
 
     @property
     def url(self) -> str:
@@ -0,0 +1,12 @@
+from app.core.config.base import BaseConfig
+
+
+class JobsConfig(BaseConfig):
+    # Interval between background runs in seconds, 0 disables the job
+    FRIEND_SUGGESTIONS_INTERVAL_SECONDS: int = 3600
+    FRIEND_SUGGESTIONS_BATCH_SIZE: int = 500
+    LEADERBOARD_SNAPSHOTS_INTERVAL_SECONDS: int = 300
+    EVENT_LOOP_LAG_INTERVAL_SECONDS: int = 1
+
+    class Config:
+        env_prefix = "JOBS_"
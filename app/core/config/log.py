@@ -0,0 +1,16 @@
+from app.core.config.base import BaseConfig
+
+
+class LogConfig(BaseConfig):
+    FILE: str = "app/app.log"
+    LEVEL: str = "INFO"
+    ROTATION_BYTES: int = 100 * 1024 * 1024
+    BACKUP_COUNT: int = 7
+    # Records waiting for the writer thread; new records are dropped when full
+    QUEUE_SIZE: int = 10000
+    # Share of access log lines kept; errors and slow requests are always logged
+    ACCESS_SAMPLE_RATE: float = 0.1
+    SLOW_REQUEST_MS: int = 1000
+
+    class Config:
+        env_prefix = "LOG_"
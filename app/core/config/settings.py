@@ -2,6 +2,8 @@ from app.core.config.app import AppBaseConfig
 from app.core.config.auth import AuthBaseConfig
 from app.core.config.base import BaseConfig
 from app.core.config.db import DBConfig
+from app.core.config.jobs import JobsConfig
+from app.core.config.log import LogConfig
 
 
 class AppSettings(BaseConfig):
@@ -12,6 +14,8 @@ class AppSettings(BaseConfig):
     app: AppBaseConfig = AppBaseConfig()
     auth: AuthBaseConfig = AuthBaseConfig()
     db: DBConfig = DBConfig()
+    jobs: JobsConfig = JobsConfig()
+    log: LogConfig = LogConfig()
 
 
 settings = AppSettings()
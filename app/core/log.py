@@ -0,0 +1,120 @@
+"""
+Logging pipeline that keeps file I/O off the event loop.
+
+Loguru formats a record in the calling thread and hands it to QueueSink,
+which only enqueues it; a daemon thread does the writing. The queue is
+bounded, so under pressure records are dropped and counted instead of
+stalling requests.
+"""
+
+import logging
+import queue
+import threading
+from logging.handlers import RotatingFileHandler
+from typing import TYPE_CHECKING, Optional
+
+from loguru import logger
+
+from app.core.metrics import Gauge, registry
+
+if TYPE_CHECKING:
+    from app.core.config.log import LogConfig
+
+_STOP = object()
+
+
+class QueueSink:
+    """
+    Loguru sink writing to a rotating file from a background thread.
+    """
+
+    def __init__(
+        self, path: str, max_bytes: int, backup_count: int, queue_size: int
+    ) -> None:
+        self.queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self.written = 0
+        self._reported_dropped = 0
+        self._handler = RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+        )
+        self._handler.setFormatter(logging.Formatter("%(message)s"))
+        self._thread = threading.Thread(
+            target=self._run, name="log-writer", daemon=True
+        )
+        self._thread.start()
+
+    def write(self, message: str) -> None:
+        try:
+            self.queue.put_nowait(message)
+        except queue.Full:
+            # Plain increment: an occasional lost count beats taking a lock
+            self.dropped += 1
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Flush what is queued and stop the writer thread."""
+        try:
+            self.queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+        self._handler.close()
+
+    def _run(self) -> None:
+        while True:
+            message = self.queue.get()
+            if message is _STOP:
+                return
+            self._emit(message.rstrip("\n"))
+            self.written += 1
+
+            if self.dropped != self._reported_dropped:
+                count = self.dropped - self._reported_dropped
+                self._reported_dropped = self.dropped
+                self._emit(f"Log queue full, dropped {count} records")
+
+    def _emit(self, line: str) -> None:
+        record = logging.LogRecord("app", logging.INFO, "", 0, line, None, None)
+        try:
+            self._handler.emit(record)
+        except Exception:
+            self._handler.handleError(record)
+
+
+log_sink: Optional[QueueSink] = None
+_handler_id: Optional[int] = None
+
+
+registry.register(
+    Gauge(
+        "log_records_dropped",
+        "Log records dropped because the write queue was full",
+        callback=lambda: log_sink.dropped if log_sink is not None else 0,
+    )
+)
+
+
+def configure_logging(config: "LogConfig") -> None:
+    """
+    Route application logs through the queued file sink.
+    """
+    global log_sink, _handler_id
+    if log_sink is not None:
+        return
+
+    log_sink = QueueSink(
+        config.FILE,
+        max_bytes=config.ROTATION_BYTES,
+        backup_count=config.BACKUP_COUNT,
+        queue_size=config.QUEUE_SIZE,
+    )
+    logger.configure(extra={"request_id": None})
+    _handler_id = logger.add(log_sink.write, level=config.LEVEL, serialize=True)
+
+
+def shutdown_logging() -> None:
+    global log_sink, _handler_id
+    if log_sink is not None:
+        logger.remove(_handler_id)
+        log_sink.stop()
+        log_sink, _handler_id = None, None
@@ -0,0 +1,325 @@
+"""
+In-process metrics in the Prometheus text exposition format.
+
+Metrics live in a module level registry for the lifetime of the worker; each
+uvicorn worker exposes its own values, to be aggregated by the scraper.
+"""
+
+import asyncio
+import bisect
+import functools
+import inspect
+import math
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+LabelValues = Tuple[Tuple[str, str], ...]
+
+# Seconds; fine-grained at the low end where queries and most requests land
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+
+class Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+
+    def samples(self) -> Iterable[Tuple[str, LabelValues, float]]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        for suffix, labels, value in self.samples():
+            lines.append(
+                f"{self.name}{suffix}{labels_text(labels)} {format_value(value)}"
+            )
+        return lines
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple((name, str(labels.get(name, ""))) for name in self.label_names)
+
+
+class Counter(Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> Iterable[Tuple[str, LabelValues, float]]:
+        return (("", key, value) for key, value in self._values.items())
+
+
+class Gauge(Metric):
+    """
+    Gauge set directly, or read from a callback at scrape time.
+    """
+
+    type_name = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Iterable[str] = (),
+        callback: Optional[Callable[[], float]] = None,
+    ):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[LabelValues, float] = {}
+        self.callback = callback
+
+    def set(self, value: float, **labels: str) -> None:
+        self._values[self._key(labels)] = value
+
+    def samples(self) -> Iterable[Tuple[str, LabelValues, float]]:
+        if self.callback is not None:
+            return [("", (), self.callback())]
+        return (("", key, value) for key, value in self._values.items())
+
+
+class Histogram(Metric):
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: non-cumulative bucket counts (+Inf last), sum
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        entry = self._values.get(key)
+        if entry is None:
+            entry = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+        counts, total = entry
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    def samples(self) -> Iterable[Tuple[str, LabelValues, float]]:
+        for key, (counts, total) in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                yield "_bucket", key + (("le", format_value(bound)),), cumulative
+            yield "_sum", key, total[0]
+            yield "_count", key, cumulative
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def labels_text(labels: LabelValues) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+registry = MetricsRegistry()
+
+http_requests = registry.register(
+    Counter(
+        "http_requests_total", "HTTP requests served", ["method", "route", "status"]
+    )
+)
+http_request_duration = registry.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "Time until the last response byte was sent",
+        ["method", "route"],
+    )
+)
+http_request_queries = registry.register(
+    Histogram(
+        "http_request_db_queries",
+        "SQL statements executed per request",
+        ["method", "route"],
+        buckets=COUNT_BUCKETS,
+    )
+)
+http_request_db_time = registry.register(
+    Histogram(
+        "http_request_db_seconds",
+        "Time spent in SQL statements per request",
+        ["method", "route"],
+    )
+)
+db_queries = registry.register(
+    Counter("db_queries_total", "SQL statements executed", ["repository"])
+)
+db_query_duration = registry.register(
+    Histogram("db_query_duration_seconds", "SQL statement duration", ["repository"])
+)
+db_pool_checkout_wait = registry.register(
+    Histogram(
+        "db_pool_checkout_wait_seconds",
+        "Time spent waiting for a pooled connection",
+    )
+)
+event_loop_lag = registry.register(
+    Histogram(
+        "event_loop_lag_seconds",
+        "Delay before the event loop runs a ready callback",
+    )
+)
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    db_seconds: float = 0.0
+    statements: Dict[str, int] = field(default_factory=dict)
+
+
+# Statistics of the request being served; SQLAlchemy copies the context into
+# the greenlet running the driver, so the engine hooks see it too
+request_stats: ContextVar[Optional[RequestStats]] = ContextVar(
+    "request_stats", default=None
+)
+# Outermost repository method on the stack, e.g. "RunRepository.get_many"
+query_tag: ContextVar[Optional[str]] = ContextVar("query_tag", default=None)
+
+
+def tag_repository_methods(cls: type) -> None:
+    """
+    Wrap the public coroutine methods of a repository class so statements are
+    attributed to the outermost repository method that issued them.
+    """
+    for name, attr in list(vars(cls).items()):
+        if not name.startswith("_") and inspect.iscoroutinefunction(attr):
+            setattr(cls, name, _tagged(attr))
+
+
+def _tagged(method: Callable) -> Callable:
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):  # type: ignore[no-untyped-def]
+        if query_tag.get() is not None:
+            return await method(self, *args, **kwargs)
+        token = query_tag.set(f"{type(self).__name__}.{method.__name__}")
+        try:
+            return await method(self, *args, **kwargs)
+        finally:
+            query_tag.reset(token)
+
+    return wrapper
+
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    Default async pool that records how long checkouts wait for a connection.
+    """
+
+    def _do_get(self):  # type: ignore[no-untyped-def]
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_checkout_wait.observe(time.perf_counter() - started)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Record statement counts and durations, and expose pool gauges.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, many):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        repository = query_tag.get() or "other"
+        db_queries.inc(repository=repository)
+        db_query_duration.observe(elapsed, repository=repository)
+
+        stats = request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += elapsed
+            stats.statements[statement] = stats.statements.get(statement, 0) + 1
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(context):
+        # after_cursor_execute doesn't run for failed statements, drop their
+        # start time so later statements on the connection pop their own
+        if context.connection is None or context.execution_context is None:
+            return
+        started = context.connection.info.get("query_started")
+        if started:
+            started.pop()
+
+    pool = engine.pool
+    for name, documentation, callback in (
+        ("db_pool_size", "Connections kept in the pool", pool.size),
+        ("db_pool_checked_out", "Connections in use", pool.checkedout),
+        ("db_pool_overflow", "Connections opened above pool_size", pool.overflow),
+    ):
+        registry.register(Gauge(name, documentation, callback=callback))
+
+
+async def sample_event_loop_lag() -> None:
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    await asyncio.sleep(0)
+    event_loop_lag.observe(loop.time() - started)
@@ -0,0 +1,343 @@
+"""
+Negotiated response compression and request body decompression.
+
+gzip is always available. zstd comes from the standard library on Python 3.14+
+or the zstandard package, brotli from the brotli package; encodings whose
+backend is not installed are simply never negotiated.
+"""
+
+import zlib
+from typing import Callable, Dict, List, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    from compression import zstd as stdlib_zstd
+except ImportError:
+    stdlib_zstd = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Response content types worth compressing; images and archives already are
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/xml", "image/svg")
+# Input fed at a time to the zstandard decompressor, which has no output limit:
+# bounds how far past max_size a decompression bomb gets before it's caught
+ZSTANDARD_INPUT_CHUNK = 1024
+
+
+class DecompressionError(ValueError):
+    pass
+
+
+class BodyTooLarge(DecompressionError):
+    pass
+
+
+class Compressor:
+    """
+    Streaming compressor: every chunk is flushed so clients can decode
+    partial responses.
+    """
+
+    def __init__(
+        self,
+        compress: Callable[[bytes], bytes],
+        flush: Callable[[], bytes],
+        finish: Callable[[], bytes],
+    ) -> None:
+        self._compress = compress
+        self._flush = flush
+        self._finish = finish
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._compress(data) + self._flush()
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compress(data) + self._finish()
+
+
+def _gzip_compressor() -> Compressor:
+    obj = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    return Compressor(obj.compress, lambda: obj.flush(zlib.Z_SYNC_FLUSH), obj.flush)
+
+
+def _gzip_decompress(data: bytes, max_size: int) -> bytes:
+    obj = zlib.decompressobj(zlib.MAX_WBITS | 16)
+    try:
+        result = obj.decompress(data, max_size + 1)
+    except zlib.error as e:
+        raise DecompressionError(str(e))
+    if len(result) > max_size:
+        raise BodyTooLarge()
+    if not obj.eof:
+        raise DecompressionError("Truncated gzip stream")
+    return result
+
+
+def _zstd_compressor() -> Compressor:
+    if stdlib_zstd is not None:
+        obj = stdlib_zstd.ZstdCompressor(level=3)
+        return Compressor(
+            obj.compress,
+            lambda: obj.flush(obj.FLUSH_BLOCK),
+            lambda: obj.flush(obj.FLUSH_FRAME),
+        )
+    obj = zstandard.ZstdCompressor(level=3).compressobj()
+    return Compressor(
+        obj.compress,
+        lambda: obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK),
+        obj.flush,
+    )
+
+
+def _zstd_decompress(data: bytes, max_size: int) -> bytes:
+    try:
+        if stdlib_zstd is not None:
+            obj = stdlib_zstd.ZstdDecompressor()
+            result = obj.decompress(data, max_length=max_size + 1)
+            complete = obj.eof
+        else:
+            obj = zstandard.ZstdDecompressor().decompressobj()
+            chunks: List[bytes] = []
+            size = 0
+            for start in range(0, len(data), ZSTANDARD_INPUT_CHUNK):
+                chunk = obj.decompress(data[start : start + ZSTANDARD_INPUT_CHUNK])
+                chunks.append(chunk)
+                size += len(chunk)
+                if size > max_size or obj.eof:
+                    break
+            result = b"".join(chunks)
+            complete = obj.eof
+    except Exception as e:
+        raise DecompressionError(str(e))
+    if len(result) > max_size:
+        raise BodyTooLarge()
+    if not complete:
+        raise DecompressionError("Truncated zstd stream")
+    return result
+
+
+def _brotli_compressor() -> Compressor:
+    obj = brotli.Compressor(quality=5)
+    return Compressor(obj.process, obj.flush, obj.finish)
+
+
+# In order of preference when the client accepts several
+RESPONSE_ENCODINGS: Dict[str, Callable[[], Compressor]] = {}
+if stdlib_zstd is not None or zstandard is not None:
+    RESPONSE_ENCODINGS["zstd"] = _zstd_compressor
+if brotli is not None:
+    RESPONSE_ENCODINGS["br"] = _brotli_compressor
+RESPONSE_ENCODINGS["gzip"] = _gzip_compressor
+
+REQUEST_ENCODINGS: Dict[str, Callable[[bytes, int], bytes]] = {"gzip": _gzip_decompress}
+if stdlib_zstd is not None or zstandard is not None:
+    REQUEST_ENCODINGS["zstd"] = _zstd_decompress
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Pick the preferred available encoding allowed by an Accept-Encoding header.
+    """
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.strip().lower()] = quality
+
+    candidates = [
+        (accepted.get(name, accepted.get("*", 0.0)), -i, name)
+        for i, name in enumerate(RESPONSE_ENCODINGS)
+    ]
+    quality, _, name = max(candidates)
+    return name if quality > 0 else None
+
+
+class CompressionMiddleware:
+    """
+    Compress responses with the best encoding the client accepts and
+    decompress gzip or zstd request bodies.
+
+    Responses smaller than minimum_size are sent as is. Streaming responses
+    are compressed chunk by chunk. Decompressed request bodies are capped at
+    max_body_size to defuse compression bombs.
+    """
+
+    def __init__(
+        self, app: ASGIApp, minimum_size: int = 1024, max_body_size: int = 2**25
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.max_body_size = max_body_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        if "content-encoding" in headers:
+            result = await self._decompress_request(scope, receive, headers)
+            if isinstance(result, JSONResponse):
+                await result(scope, receive, send)
+                return
+            scope, receive = result
+
+        encoding = negotiate_encoding(headers.get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressingResponder(
+            self.app, RESPONSE_ENCODINGS[encoding], encoding, self.minimum_size
+        )
+        await responder(scope, receive, send)
+
+    async def _decompress_request(
+        self, scope: Scope, receive: Receive, headers: Headers
+    ) -> Tuple[Scope, Receive] | JSONResponse:
+        encoding = headers["content-encoding"].strip().lower()
+        if encoding == "identity":
+            return scope, receive
+        decompress = REQUEST_ENCODINGS.get(encoding)
+        if decompress is None:
+            return JSONResponse(
+                {"message": f"Unsupported Content-Encoding: {encoding}"},
+                status_code=415,
+            )
+
+        declared = headers.get("content-length", "")
+        if declared.isdigit() and int(declared) > self.max_body_size:
+            return _too_large()
+
+        chunks: List[bytes] = []
+        received = 0
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return JSONResponse(
+                    {"message": "Incomplete request body"}, status_code=400
+                )
+            chunk = message.get("body", b"")
+            received += len(chunk)
+            # A compressed body can't be larger than the decompressed limit
+            if received > self.max_body_size:
+                return _too_large()
+            chunks.append(chunk)
+            more_body = message.get("more_body", False)
+
+        try:
+            body = decompress(b"".join(chunks), self.max_body_size)
+        except BodyTooLarge:
+            return _too_large()
+        except DecompressionError:
+            return JSONResponse(
+                {"message": f"Invalid {encoding} request body"}, status_code=400
+            )
+
+        raw_headers = [
+            (key, value)
+            for key, value in scope["headers"]
+            if key not in (b"content-encoding", b"content-length")
+        ]
+        raw_headers.append((b"content-length", str(len(body)).encode()))
+        sent = False
+
+        async def receive_decompressed() -> Message:
+            nonlocal sent
+            if sent:
+                return await receive()
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        return {**scope, "headers": raw_headers}, receive_decompressed
+
+
+def _too_large() -> JSONResponse:
+    return JSONResponse({"message": "Request body too large"}, status_code=413)
+
+
+class _CompressingResponder:
+    def __init__(
+        self,
+        app: ASGIApp,
+        compressor_factory: Callable[[], Compressor],
+        encoding: str,
+        minimum_size: int,
+    ) -> None:
+        self.app = app
+        self.compressor_factory = compressor_factory
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start_message: Optional[Message] = None
+        self.compressor: Optional[Compressor] = None
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            self.passthrough = "content-encoding" in headers or not any(
+                content_type.startswith(t) for t in COMPRESSIBLE_TYPES
+            )
+            # Hold the start message until the first body chunk shows the size
+            self.start_message = message
+            if self.passthrough:
+                await self.send(message)
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.start_message is not None:
+            start, self.start_message = self.start_message, None
+            if not more_body and len(body) < self.minimum_size:
+                self.passthrough = True
+                await self.send(start)
+                await self.send(message)
+                return
+
+            self.compressor = self.compressor_factory()
+            headers = MutableHeaders(raw=start["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if more_body:
+                del headers["Content-Length"]
+                body = self.compressor.chunk(body)
+            else:
+                body = self.compressor.finish(body)
+                headers["Content-Length"] = str(len(body))
+            await self.send(start)
+            await self.send({**message, "body": body})
+            return
+
+        body = (
+            self.compressor.chunk(body) if more_body else self.compressor.finish(body)
+        )
+        await self.send({**message, "body": body})
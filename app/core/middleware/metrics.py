@@ -0,0 +1,78 @@
+"""
+Per-endpoint latency and database usage metrics.
+"""
+
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import metrics
+from app.core.query_budget import check_budget
+
+
+class MetricsMiddleware:
+    """
+    Observe request latency, SQL statement count and SQL time per route.
+
+    Requests are labelled with the route template, e.g. /api/runs/{run_uuid},
+    so path parameters don't multiply the series. Routing stores the matched
+    route in the scope, which is why this middleware must sit inside any
+    middleware that replaces the scope dict.
+
+    With a query_budget or repeat_threshold set, requests exceeding them are
+    logged together with their most frequent statement shapes.
+    """
+
+    def __init__(
+        self, app: ASGIApp, query_budget: int = 0, repeat_threshold: int = 0
+    ) -> None:
+        self.app = app
+        self.query_budget = query_budget
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = metrics.RequestStats()
+        token = metrics.request_stats.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+        recorded = False
+
+        def record() -> None:
+            nonlocal recorded
+            recorded = True
+            route = getattr(scope.get("route"), "path", "unmatched")
+            labels = {"method": scope["method"], "route": route}
+            metrics.http_request_duration.observe(
+                time.perf_counter() - started, **labels
+            )
+            metrics.http_requests.inc(status=str(status_code), **labels)
+            metrics.http_request_queries.observe(stats.queries, **labels)
+            metrics.http_request_db_time.observe(stats.db_seconds, **labels)
+            if self.query_budget or self.repeat_threshold:
+                check_budget(
+                    stats,
+                    f"{scope['method']} {route}",
+                    self.query_budget,
+                    self.repeat_threshold,
+                )
+
+        async def send_with_metrics(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get(
+                "more_body", False
+            ):
+                record()
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            if not recorded:
+                record()
+            metrics.request_stats.reset(token)
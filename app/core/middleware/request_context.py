@@ -0,0 +1,93 @@
+"""
+Per-request correlation IDs and sampled access logs.
+"""
+
+import random
+import re
+import time
+from uuid import uuid4
+
+from loguru import logger
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+REQUEST_ID_HEADER = "X-Request-ID"
+# Client IDs end up in every log line and the response, so only short plain
+# tokens are accepted
+REQUEST_ID_PATTERN = re.compile(r"[A-Za-z0-9._-]{1,64}")
+
+
+class RequestContextMiddleware:
+    """
+    Tag every log record of a request with its correlation ID and log the
+    request once the last response byte is sent.
+
+    The ID is taken from the X-Request-ID header when the client sends a valid
+    one, otherwise generated, and echoed back in the response.
+
+    Only sample_rate of the access log lines are kept, except server errors
+    and requests slower than slow_request_ms.
+    """
+
+    def __init__(
+        self, app: ASGIApp, sample_rate: float = 1.0, slow_request_ms: int = 1000
+    ) -> None:
+        self.app = app
+        self.sample_rate = sample_rate
+        self.slow_request_ms = slow_request_ms
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = get_request_id(Headers(scope=scope))
+        started = time.perf_counter()
+        status_code = 500
+        logged = False
+
+        def log_access() -> None:
+            nonlocal logged
+            logged = True
+            duration_ms = (time.perf_counter() - started) * 1000
+            if (
+                status_code < 500
+                and duration_ms < self.slow_request_ms
+                and random.random() >= self.sample_rate
+            ):
+                return
+            logger.bind(access=True).info(
+                "{method} {path} {status_code} {duration_ms:.1f}ms",
+                method=scope["method"],
+                path=scope["path"],
+                status_code=status_code,
+                duration_ms=duration_ms,
+            )
+
+        async def send_with_context(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message)[REQUEST_ID_HEADER] = request_id
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get(
+                "more_body", False
+            ):
+                log_access()
+
+        with logger.contextualize(request_id=request_id):
+            try:
+                await self.app(scope, receive, send_with_context)
+            finally:
+                if not logged:
+                    log_access()
+
+
+def get_request_id(headers: Headers) -> str:
+    """
+    The client's X-Request-ID if it matches REQUEST_ID_PATTERN, else a new one.
+    """
+    request_id = headers.get(REQUEST_ID_HEADER)
+    if request_id and REQUEST_ID_PATTERN.fullmatch(request_id):
+        return request_id
+    return uuid4().hex
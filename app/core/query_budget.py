@@ -0,0 +1,108 @@
+"""
+Query budgets and N+1 detection.
+
+The engine hooks in app.core.metrics count every statement of the current
+request in RequestStats. This module groups those statements by shape, so the
+same query issued once per row of an earlier result stands out, and enforces a
+maximum statement count either as a logged warning per request (the
+DB_QUERY_BUDGET setting) or as a hard assertion in tests (assert_max_queries).
+"""
+
+import re
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+
+from loguru import logger
+
+from app.core.metrics import RequestStats, request_stats
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"\$\d+|%\(\w+\)s|%s|\?")
+# Expanded IN lists and multi-row VALUES differ only in their length
+_PLACEHOLDER_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+_ROW_LIST = re.compile(r"\(\?\)(?:\s*,\s*\(\?\))+")
+
+
+def statement_shape(statement: str) -> str:
+    """
+    Normalize a SQL statement so executions differing only in parameters,
+    literals or IN list length compare equal.
+    """
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = _STRING_LITERAL.sub("?", shape)
+    shape = _PLACEHOLDER.sub("?", shape)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _PLACEHOLDER_LIST.sub("?", shape)
+    return _ROW_LIST.sub("(?)", shape)
+
+
+def group_statements(stats: RequestStats) -> List[Tuple[str, int]]:
+    """
+    Statement shapes with their execution counts, most frequent first.
+    """
+    shapes: Dict[str, int] = {}
+    for statement, count in stats.statements.items():
+        shape = statement_shape(statement)
+        shapes[shape] = shapes.get(shape, 0) + count
+    return sorted(shapes.items(), key=lambda item: item[1], reverse=True)
+
+
+def repeated_statements(stats: RequestStats, threshold: int) -> List[Tuple[str, int]]:
+    """
+    Shapes executed at least threshold times: likely N+1 patterns.
+    """
+    return [(shape, n) for shape, n in group_statements(stats) if n >= threshold]
+
+
+def format_statements(shapes: List[Tuple[str, int]], limit: int = 5) -> str:
+    return "\n".join(f"  {count}x {shape}" for shape, count in shapes[:limit])
+
+
+def check_budget(
+    stats: RequestStats, label: str, budget: int, repeat_threshold: int
+) -> None:
+    """
+    Log a warning when a request exceeds the statement budget or repeats the
+    same statement shape. A zero budget or threshold disables that check.
+    """
+    over_budget = 0 < budget < stats.queries
+    repeated = repeated_statements(stats, repeat_threshold) if repeat_threshold else []
+    if not over_budget and not repeated:
+        return
+    logger.warning(
+        "{label} executed {queries} SQL statements (budget {budget}):\n{shapes}",
+        label=label,
+        queries=stats.queries,
+        budget=budget or "unlimited",
+        shapes=format_statements(repeated or group_statements(stats)),
+    )
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def assert_max_queries(limit: int) -> Iterator[RequestStats]:
+    """
+    Fail when the block executes more than limit SQL statements.
+
+        with assert_max_queries(3) as stats:
+            await service.list_friends(uow, user_uuid)
+
+    The statements are counted wherever the block runs them, including inside
+    repository methods awaited from it.
+    """
+    stats = RequestStats()
+    token = request_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        request_stats.reset(token)
+    if stats.queries > limit:
+        raise QueryBudgetExceeded(
+            f"{stats.queries} SQL statements executed, at most {limit} allowed:\n"
+            + format_statements(group_statements(stats))
+        )
@@ -0,0 +1,17 @@
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+
+class ModelResponse(JSONResponse):
+    """
+    JSON response rendered by pydantic-core in a single pass.
+
+    Endpoints with large payloads return it directly so FastAPI neither
+    revalidates the service output against the route's response_model (kept
+    for the OpenAPI schema) nor walks it through jsonable_encoder and json.dumps.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
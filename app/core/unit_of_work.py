@@ -7,9 +7,21 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.config import settings
 from app.core.db import async_session
 from app.repositories.achievement import AchievementRepository
-from app.repositories.challenge import ChallengeAttemptRepository, ChallengeRepository
-from app.repositories.friendship import FriendshipRepository
+from app.repositories.analytics import RunTotalsRepository
+from app.repositories.challenge import (
+    ChallengeAttemptRepository,
+    ChallengeBestTimeRepository,
+    ChallengeRepository,
+)
+from app.repositories.feed import ActivityRepository, FeedEntryRepository
+from app.repositories.friendship import (
+    FriendEdgeRepository,
+    FriendshipRepository,
+    FriendSuggestionRepository,
+)
 from app.repositories.goal import GoalRepository
+from app.repositories.heatmap import HeatmapTileRepository
+from app.repositories.personal_best import PersonalBestRepository
 from app.repositories.run import RunRepository
 from app.repositories.user import UserRepository
 
@@ -20,10 +32,18 @@ class ABCUnitOfWork(ABC):
     user: UserRepository
     goal: GoalRepository
     run: RunRepository
+    run_totals: RunTotalsRepository
+    personal_best: PersonalBestRepository
+    heatmap_tile: HeatmapTileRepository
     achievement: AchievementRepository
     friendship: FriendshipRepository
+    friend_edge: FriendEdgeRepository
+    friend_suggestion: FriendSuggestionRepository
     challenge: ChallengeRepository
     challenge_attempt: ChallengeAttemptRepository
+    challenge_best_time: ChallengeBestTimeRepository
+    activity: ActivityRepository
+    feed_entry: FeedEntryRepository
 
     @abstractmethod
     def __init__(self) -> None:
@@ -48,10 +68,18 @@ class UnitOfWork(ABCUnitOfWork):
         self.user = UserRepository(self.session)
         self.goal = GoalRepository(self.session)
         self.run = RunRepository(self.session)
+        self.run_totals = RunTotalsRepository(self.session)
+        self.personal_best = PersonalBestRepository(self.session)
+        self.heatmap_tile = HeatmapTileRepository(self.session)
         self.achievement = AchievementRepository(self.session)
         self.friendship = FriendshipRepository(self.session)
+        self.friend_edge = FriendEdgeRepository(self.session)
+        self.friend_suggestion = FriendSuggestionRepository(self.session)
         self.challenge = ChallengeRepository(self.session)
         self.challenge_attempt = ChallengeAttemptRepository(self.session)
+        self.challenge_best_time = ChallengeBestTimeRepository(self.session)
+        self.activity = ActivityRepository(self.session)
+        self.feed_entry = FeedEntryRepository(self.session)
 
         return self
 
@@ -67,7 +95,6 @@ class UnitOfWork(ABCUnitOfWork):
         else:
             await self.session.commit()
         await self.session.close()
-        await logger.complete()
 
         if exc:
             raise exc
@@ -7,8 +7,11 @@ from app.core.exc import UserNotAuthenticatedException
 from app.core.unit_of_work import ABCUnitOfWork, UnitOfWork
 from app.models import User
 from app.services.achievement import AchievementService, get_achievement_service
+from app.services.analytics import AnalyticsService, get_analytics_service
 from app.services.auth import AuthService, get_auth_service
+from app.services.feed import FeedService, get_feed_service
 from app.services.goal import GoalService, get_goal_service
+from app.services.heatmap import HeatmapService, get_heatmap_service
 from app.services.leaderboard import LeaderboardService, get_leaderboard_service
 from app.services.run import RunService, get_run_service
 from app.services.statistics import StatisticsService, get_statistics_service
@@ -23,7 +26,10 @@ GoalServiceDep = Annotated[GoalService, Depends(get_goal_service)]
 RunServiceDep = Annotated[RunService, Depends(get_run_service)]
 AchievementServiceDep = Annotated[AchievementService, Depends(get_achievement_service)]
 StatisticsServiceDep = Annotated[StatisticsService, Depends(get_statistics_service)]
+AnalyticsServiceDep = Annotated[AnalyticsService, Depends(get_analytics_service)]
 LeaderboardServiceDep = Annotated[LeaderboardService, Depends(get_leaderboard_service)]
+HeatmapServiceDep = Annotated[HeatmapService, Depends(get_heatmap_service)]
+FeedServiceDep = Annotated[FeedService, Depends(get_feed_service)]
 
 bearer_scheme = HTTPBearer()
 
@@ -0,0 +1,7 @@
+from app.enums.base import BaseStrEnum
+
+
+class AnalyticsGranularity(BaseStrEnum):
+    WEEK = "WEEK"
+    MONTH = "MONTH"
+    YEAR = "YEAR"
@@ -0,0 +1,6 @@
+from app.enums.base import BaseStrEnum
+
+
+class ChallengeView(BaseStrEnum):
+    FULL = "FULL"
+    CARD = "CARD"
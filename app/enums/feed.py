@@ -0,0 +1,7 @@
+from app.enums.base import BaseStrEnum
+
+
+class ActivityType(BaseStrEnum):
+    RUN = "RUN"
+    ACHIEVEMENT = "ACHIEVEMENT"
+    CHALLENGE_COMPLETED = "CHALLENGE_COMPLETED"
@@ -0,0 +1,6 @@
+from app.enums.base import BaseStrEnum
+
+
+class FriendSortBy(BaseStrEnum):
+    USERNAME = "USERNAME"
+    RECENT_ACTIVITY = "RECENT_ACTIVITY"
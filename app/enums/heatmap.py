@@ -0,0 +1,6 @@
+from app.enums.base import BaseStrEnum
+
+
+class HeatmapScope(BaseStrEnum):
+    ME = "ME"
+    FRIENDS = "FRIENDS"
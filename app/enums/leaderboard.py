@@ -0,0 +1,27 @@
+from app.enums.base import BaseStrEnum
+
+
+class AgeGroup(BaseStrEnum):
+    UNDER_20 = "UNDER_20"
+    AGE_20_29 = "20_29"
+    AGE_30_39 = "30_39"
+    AGE_40_49 = "40_49"
+    AGE_50_59 = "50_59"
+    AGE_60_69 = "60_69"
+    AGE_70_PLUS = "70_PLUS"
+
+
+class CohortGender(BaseStrEnum):
+    FEMALE = "FEMALE"
+    MALE = "MALE"
+
+
+class DistanceBand(BaseStrEnum):
+    """
+    Average run distance over the leaderboard period.
+    """
+
+    UNDER_5K = "UNDER_5K"
+    FROM_5K_TO_10K = "5K_10K"
+    FROM_10K_TO_HALF = "10K_HALF"
+    HALF_PLUS = "HALF_PLUS"
@@ -10,3 +10,11 @@ class RunSortBy(BaseStrEnum):
 class SortOrder(BaseStrEnum):
     ASC = "ASC"
     DESC = "DESC"
+
+
+class PersonalBestDistance(BaseStrEnum):
+    KM_1 = "1K"
+    KM_5 = "5K"
+    KM_10 = "10K"
+    HALF_MARATHON = "HALF_MARATHON"
+    MARATHON = "MARATHON"
@@ -0,0 +1,20 @@
+"""
+Card polylines of the challenges created before challenge cards existed.
+
+Run once from the command line after migrating:
+
+    python -m app.jobs.challenge_cards
+"""
+
+import asyncio
+
+from app.core.unit_of_work import UnitOfWork
+from app.services.challenge import get_challenge_service
+
+
+async def backfill_card_polylines() -> int:
+    return await get_challenge_service().backfill_card_polylines(UnitOfWork())
+
+
+if __name__ == "__main__":
+    print(f"Updated {asyncio.run(backfill_card_polylines())} challenges")
@@ -0,0 +1,25 @@
+"""
+Periodic refresh of the friend_suggestions table.
+
+Runs inside the application (see app.main) or once from the command line:
+
+    python -m app.jobs.friend_suggestions
+"""
+
+import asyncio
+
+from app.core.config import settings
+from app.core.unit_of_work import UnitOfWork
+from app.services.friendship import get_friendship_service
+
+
+async def refresh_friend_suggestions() -> int:
+    return await get_friendship_service().refresh_suggestions(
+        UnitOfWork(),
+        UnitOfWork(),
+        batch_size=settings.jobs.FRIEND_SUGGESTIONS_BATCH_SIZE,
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(refresh_friend_suggestions())
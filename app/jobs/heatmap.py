@@ -0,0 +1,54 @@
+"""
+Keep heatmap tiles in step with uploaded and deleted runs.
+
+Scheduled as background tasks by POST and DELETE /api/runs/ so the requests
+do not wait for the rasterization, or run from the command line for one run,
+or to rebuild every tile from the stored routes:
+
+    python -m app.jobs.heatmap <run_uuid>
+    python -m app.jobs.heatmap --all
+"""
+
+import asyncio
+import sys
+from typing import Any, List, Optional
+from uuid import UUID
+
+from loguru import logger
+
+from app.core.unit_of_work import UnitOfWork
+from app.services.heatmap import get_heatmap_service
+
+
+async def add_run_to_heatmap(run_id: UUID) -> int:
+    try:
+        return await get_heatmap_service().add_run(UnitOfWork(), run_id)
+    except Exception:
+        logger.exception("Heatmap update failed for run {run_id}", run_id=run_id)
+        return 0
+
+
+async def remove_route_from_heatmap(
+    run_id: UUID, user_uuid: UUID, route: Optional[List[Any]]
+) -> int:
+    try:
+        return await get_heatmap_service().remove_route(
+            UnitOfWork(), run_id, user_uuid, route
+        )
+    except Exception:
+        logger.exception(
+            "Heatmap update failed for a deleted run of {user_uuid}",
+            user_uuid=user_uuid,
+        )
+        return 0
+
+
+async def rebuild_heatmap() -> int:
+    return await get_heatmap_service().rebuild(UnitOfWork())
+
+
+if __name__ == "__main__":
+    if sys.argv[1] == "--all":
+        print(f"Added {asyncio.run(rebuild_heatmap())} runs")
+    else:
+        asyncio.run(add_run_to_heatmap(UUID(sys.argv[1])))
@@ -0,0 +1,20 @@
+"""
+Periodic refresh of the leaderboard_snapshots table behind cohort boards.
+
+Runs inside the application (see app.main) or once from the command line:
+
+    python -m app.jobs.leaderboard_snapshots
+"""
+
+import asyncio
+
+from app.core.unit_of_work import UnitOfWork
+from app.services.leaderboard import get_leaderboard_service
+
+
+async def refresh_leaderboard_snapshots() -> int:
+    return await get_leaderboard_service().refresh_snapshots(UnitOfWork())
+
+
+if __name__ == "__main__":
+    asyncio.run(refresh_leaderboard_snapshots())
@@ -0,0 +1,40 @@
+"""
+Best efforts over the standard distances for a freshly created run.
+
+Scheduled as a background task by POST /api/runs/ so the request does not wait
+for it, or run from the command line for one run, or for every run recorded
+before personal bests existed:
+
+    python -m app.jobs.personal_bests <run_uuid>
+    python -m app.jobs.personal_bests --all
+"""
+
+import asyncio
+import sys
+from uuid import UUID
+
+from loguru import logger
+
+from app.core.unit_of_work import UnitOfWork
+from app.services.statistics import get_statistics_service
+
+
+async def record_personal_bests(run_id: UUID) -> int:
+    try:
+        return await get_statistics_service().record_personal_bests(
+            UnitOfWork(), run_id
+        )
+    except Exception:
+        logger.exception("Personal bests failed for run {run_id}", run_id=run_id)
+        return 0
+
+
+async def backfill_personal_bests() -> int:
+    return await get_statistics_service().backfill_personal_bests(UnitOfWork())
+
+
+if __name__ == "__main__":
+    if sys.argv[1] == "--all":
+        print(f"Found {asyncio.run(backfill_personal_bests())} efforts")
+    else:
+        asyncio.run(record_personal_bests(UUID(sys.argv[1])))
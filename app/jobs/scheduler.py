@@ -0,0 +1,45 @@
+import asyncio
+from typing import Awaitable, Callable
+
+from loguru import logger
+
+JobFunc = Callable[[], Awaitable[object]]
+
+
+async def run_periodically(name: str, interval_seconds: int, job: JobFunc) -> None:
+    """
+    Run a job forever with a fixed pause between runs.
+
+    Failures are logged and do not stop the loop.
+    """
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await job()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Background job {name} failed", name=name)
+
+
+class JobScheduler:
+    """
+    Owns the background tasks started with the application.
+    """
+
+    def __init__(self) -> None:
+        self._tasks: list[asyncio.Task] = []
+
+    def add(self, name: str, interval_seconds: int, job: JobFunc) -> None:
+        if interval_seconds <= 0:
+            return
+        task = asyncio.create_task(
+            run_periodically(name, interval_seconds, job), name=name
+        )
+        self._tasks.append(task)
+
+    async def shutdown(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
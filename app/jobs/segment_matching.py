@@ -0,0 +1,29 @@
+"""
+Match a freshly created run against challenge courses.
+
+Scheduled as a background task by POST /api/runs/ so the request does not wait
+for it, or run once for a given run from the command line:
+
+    python -m app.jobs.segment_matching <run_uuid>
+"""
+
+import asyncio
+import sys
+from uuid import UUID
+
+from loguru import logger
+
+from app.core.unit_of_work import UnitOfWork
+from app.services.challenge import get_challenge_service
+
+
+async def match_run_segments(run_id: UUID) -> int:
+    try:
+        return await get_challenge_service().match_run(UnitOfWork(), run_id)
+    except Exception:
+        logger.exception("Segment matching failed for run {run_id}", run_id=run_id)
+        return 0
+
+
+if __name__ == "__main__":
+    asyncio.run(match_run_segments(UUID(sys.argv[1])))
@@ -1,26 +1,59 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from loguru import logger
 from pydantic import ValidationError
 
 from app.core import exc
 from app.core.config import settings
 from app.core.exc import handlers
+from app.core.log import configure_logging, shutdown_logging
+from app.core.metrics import sample_event_loop_lag
+from app.core.middleware.compression import CompressionMiddleware
+from app.core.middleware.metrics import MetricsMiddleware
+from app.core.middleware.request_context import RequestContextMiddleware
+from app.jobs.friend_suggestions import refresh_friend_suggestions
+from app.jobs.leaderboard_snapshots import refresh_leaderboard_snapshots
+from app.jobs.scheduler import JobScheduler
 from app.routers import router
+from app.routers.metrics import router as metrics_router
 
 
 def _configure_logging() -> None:
     """
     Configures logging for the application using Loguru.
+
+    Records are written to the log file by a background thread, see app.core.log.
     """
-    logger.add(
-        "app/app.log",
-        rotation="100 MB",
-        retention="7 days",
-        level="INFO",
-        serialize=True,
+    configure_logging(settings.log)
+
+
+@asynccontextmanager
+async def _lifespan(_: FastAPI) -> AsyncIterator[None]:
+    """
+    Starts periodic background jobs and stops them on shutdown.
+    """
+    scheduler = JobScheduler()
+    scheduler.add(
+        "friend_suggestions",
+        settings.jobs.FRIEND_SUGGESTIONS_INTERVAL_SECONDS,
+        refresh_friend_suggestions,
+    )
+    scheduler.add(
+        "leaderboard_snapshots",
+        settings.jobs.LEADERBOARD_SNAPSHOTS_INTERVAL_SECONDS,
+        refresh_leaderboard_snapshots,
     )
+    scheduler.add(
+        "event_loop_lag",
+        settings.jobs.EVENT_LOOP_LAG_INTERVAL_SECONDS,
+        sample_event_loop_lag,
+    )
+    yield
+    await scheduler.shutdown()
+    shutdown_logging()
 
 
 def _add_exception_handlers(app: FastAPI) -> None:
@@ -38,6 +71,12 @@ def _add_exception_handlers(app: FastAPI) -> None:
 
 
 def _add_middleware(app: FastAPI) -> None:
+    # Innermost: it reads the matched route from the scope routing fills in
+    app.add_middleware(
+        MetricsMiddleware,
+        query_budget=settings.db.QUERY_BUDGET,
+        repeat_threshold=settings.db.QUERY_REPEAT_THRESHOLD,
+    )
     app.add_middleware(
         CORSMiddleware,
         allow_origins=settings.app.ALLOWED_ORIGINS,
@@ -46,12 +85,24 @@ def _add_middleware(app: FastAPI) -> None:
         allow_headers=["*"],
         expose_headers=["X-CAPTCHA-Required"],
     )
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.app.COMPRESSION_MINIMUM_SIZE,
+        max_body_size=settings.app.MAX_REQUEST_BODY_SIZE,
+    )
+    # Outermost, so the correlation ID covers everything below it
+    app.add_middleware(
+        RequestContextMiddleware,
+        sample_rate=settings.log.ACCESS_SAMPLE_RATE,
+        slow_request_ms=settings.log.SLOW_REQUEST_MS,
+    )
 
 
 def create_app() -> FastAPI:
-    _app = FastAPI(title=settings.app.PROJECT_NAME)
+    _app = FastAPI(title=settings.app.PROJECT_NAME, lifespan=_lifespan)
 
     _app.include_router(router)
+    _app.include_router(metrics_router, prefix="/metrics", tags=["Metrics"])
     _add_middleware(_app)
     _configure_logging()
     _add_exception_handlers(_app)
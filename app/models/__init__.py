@@ -1,8 +1,13 @@
 from app.models.achievement import Achievement
+from app.models.analytics import RunDailyTotal, RunHourTotal, RunPaceTotal
 from app.models.base import Base
-from app.models.challenge import Challenge, ChallengeAttempt
-from app.models.friendship import Friendship
+from app.models.challenge import Challenge, ChallengeAttempt, ChallengeBestTime
+from app.models.feed import Activity, FeedEntry
+from app.models.friendship import FriendEdge, Friendship, FriendSuggestion
 from app.models.goal import Goal
+from app.models.heatmap import HeatmapRun, HeatmapTile
+from app.models.leaderboard import LeaderboardSnapshot
+from app.models.personal_best import PersonalBest
 from app.models.run import Run
 from app.models.user import User
 
@@ -13,6 +18,18 @@ __all__ = [
     "Run",
     "Achievement",
     "Friendship",
+    "FriendEdge",
+    "FriendSuggestion",
     "Challenge",
     "ChallengeAttempt",
+    "ChallengeBestTime",
+    "Activity",
+    "FeedEntry",
+    "RunDailyTotal",
+    "RunHourTotal",
+    "RunPaceTotal",
+    "PersonalBest",
+    "HeatmapTile",
+    "HeatmapRun",
+    "LeaderboardSnapshot",
 ]
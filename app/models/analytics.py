@@ -0,0 +1,94 @@
+from datetime import date
+from uuid import UUID
+
+from sqlalchemy import Date, Float, ForeignKey, Integer, SmallInteger
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class RunDailyTotal(Base):
+    """
+    Per-user run totals by local day.
+
+    Updated in the same transaction as every run that is added or deleted, so
+    weekly, monthly and yearly series over any range read at most one row per
+    active day instead of the runs themselves.
+
+    The cum_ columns are running totals through local_date, so the total
+    between two dates is the difference of two rows however long the range.
+    """
+
+    __tablename__ = "run_daily_totals"
+
+    user_uuid: Mapped[UUID] = mapped_column(
+        ForeignKey("users.uuid", ondelete="CASCADE"), primary_key=True
+    )
+    local_date: Mapped[date] = mapped_column(Date, primary_key=True)
+    week_key: Mapped[int] = mapped_column(
+        Integer, nullable=False, comment="ISO year * 100 + ISO week of local_date"
+    )
+    month_key: Mapped[int] = mapped_column(
+        Integer, nullable=False, comment="Year * 100 + month of local_date"
+    )
+    runs: Mapped[int] = mapped_column(Integer, nullable=False)
+    distance: Mapped[float] = mapped_column(
+        Float, nullable=False, comment="Distance in km"
+    )
+    duration: Mapped[float] = mapped_column(
+        Float, nullable=False, comment="Duration in minutes"
+    )
+    cum_runs: Mapped[int] = mapped_column(
+        Integer, nullable=False, comment="Runs through local_date"
+    )
+    cum_distance: Mapped[float] = mapped_column(
+        Float, nullable=False, comment="Distance in km through local_date"
+    )
+    cum_duration: Mapped[float] = mapped_column(
+        Float, nullable=False, comment="Duration in minutes through local_date"
+    )
+
+
+class RunHourTotal(Base):
+    """
+    Per-user run totals by year, weekday and local start hour, for the
+    day-of-week and hour-of-day heatmaps.
+    """
+
+    __tablename__ = "run_hour_totals"
+
+    user_uuid: Mapped[UUID] = mapped_column(
+        ForeignKey("users.uuid", ondelete="CASCADE"), primary_key=True
+    )
+    year: Mapped[int] = mapped_column(Integer, primary_key=True)
+    weekday: Mapped[int] = mapped_column(
+        SmallInteger, primary_key=True, comment="ISO weekday, 1 is Monday"
+    )
+    hour: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    runs: Mapped[int] = mapped_column(Integer, nullable=False)
+    distance: Mapped[float] = mapped_column(
+        Float, nullable=False, comment="Distance in km"
+    )
+    duration: Mapped[float] = mapped_column(
+        Float, nullable=False, comment="Duration in minutes"
+    )
+
+
+class RunPaceTotal(Base):
+    """
+    Per-user pace histogram by year.
+    """
+
+    __tablename__ = "run_pace_totals"
+
+    user_uuid: Mapped[UUID] = mapped_column(
+        ForeignKey("users.uuid", ondelete="CASCADE"), primary_key=True
+    )
+    year: Mapped[int] = mapped_column(Integer, primary_key=True)
+    pace_bucket: Mapped[int] = mapped_column(
+        Integer, primary_key=True, comment="Lower bound in seconds per km"
+    )
+    runs: Mapped[int] = mapped_column(Integer, nullable=False)
+    distance: Mapped[float] = mapped_column(
+        Float, nullable=False, comment="Distance in km"
+    )
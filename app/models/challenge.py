@@ -1,6 +1,20 @@
-from typing import TYPE_CHECKING, List
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, List
+from uuid import UUID
 
-from sqlalchemy import Boolean, ForeignKey, String
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    String,
+    UniqueConstraint,
+    func,
+    text,
+)
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base, TimestampMixin, UUIDMixin
@@ -22,6 +36,36 @@ class Challenge(Base, UUIDMixin, TimestampMixin):
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     description: Mapped[str] = mapped_column(String, nullable=True)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
+    min_lat: Mapped[float] = mapped_column(Float, nullable=True)
+    min_lng: Mapped[float] = mapped_column(Float, nullable=True)
+    max_lat: Mapped[float] = mapped_column(Float, nullable=True)
+    max_lng: Mapped[float] = mapped_column(Float, nullable=True)
+    start_cell: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=True,
+        comment="Endpoint grid cell of the course start, see app.utils.route_index",
+    )
+    end_cell: Mapped[int] = mapped_column(
+        BigInteger, nullable=True, comment="Endpoint grid cell of the course end"
+    )
+    course_distance: Mapped[float] = mapped_column(
+        Float, nullable=True, comment="Distance of the source run in km"
+    )
+    course_duration: Mapped[float] = mapped_column(
+        Float, nullable=True, comment="Duration of the source run in minutes"
+    )
+    course_polyline: Mapped[str] = mapped_column(
+        String,
+        nullable=True,
+        comment="Simplified source route as an encoded polyline",
+    )
+    creator_name: Mapped[str] = mapped_column(String(255), nullable=True)
+    route_index: Mapped[Dict[str, Any]] = mapped_column(
+        JSONB,
+        nullable=True,
+        deferred=True,
+        comment="Grid index of the source route segments, see app.utils.route_index",
+    )
 
     creator: Mapped["User"] = relationship("User", foreign_keys=[creator_id])
     source_run: Mapped["Run"] = relationship("Run", foreign_keys=[source_run_id])
@@ -29,6 +73,25 @@ class Challenge(Base, UUIDMixin, TimestampMixin):
         "ChallengeAttempt", back_populates="challenge", cascade="all, delete-orphan"
     )
 
+    __table_args__ = (
+        # Prefilter for matching new runs: courses contained in the run's box,
+        # searched on all four bounds at once, see ChallengeRepository
+        Index(
+            "ix_challenges_active_bbox",
+            func.box(func.point(min_lng, min_lat), func.point(max_lng, max_lat)),
+            postgresql_using="gist",
+            postgresql_where=text("is_active"),
+        ),
+        # Courses starting and ending in the cells a run passes near, so only
+        # those are loaded with their route index
+        Index(
+            "ix_challenges_active_endpoints",
+            "start_cell",
+            "end_cell",
+            postgresql_where=text("is_active"),
+        ),
+    )
+
 
 class ChallengeAttempt(Base, UUIDMixin, TimestampMixin):
     __tablename__ = "challenge_attempts"
@@ -43,9 +106,53 @@ class ChallengeAttempt(Base, UUIDMixin, TimestampMixin):
         ForeignKey("runs.uuid", ondelete="CASCADE"), nullable=False
     )
     success: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    duration: Mapped[float] = mapped_column(
+        Float, nullable=True, comment="Elapsed time on the course in minutes"
+    )
 
     challenge: Mapped["Challenge"] = relationship(
         "Challenge", back_populates="attempts"
     )
     user: Mapped["User"] = relationship("User", foreign_keys=[user_id])
     run: Mapped["Run"] = relationship("Run", foreign_keys=[run_id])
+
+    __table_args__ = (
+        # A run counts once per challenge, whether submitted or matched
+        UniqueConstraint("challenge_id", "run_id", name="uq_challenge_attempt_run"),
+    )
+
+
+class ChallengeBestTime(Base):
+    """
+    Fastest successful attempt per user and challenge, kept up to date on every
+    attempt so challenge leaderboards are a range scan on (challenge, duration).
+    Deleting the run behind a best time hands it to the user's next fastest
+    successful attempt, see ChallengeBestTimeRepository.remove_run.
+    """
+
+    __tablename__ = "challenge_best_times"
+
+    challenge_id: Mapped[UUID] = mapped_column(
+        ForeignKey("challenges.uuid", ondelete="CASCADE"), primary_key=True
+    )
+    user_id: Mapped[UUID] = mapped_column(
+        ForeignKey("users.uuid", ondelete="CASCADE"), primary_key=True
+    )
+    best_duration: Mapped[float] = mapped_column(
+        Float, nullable=False, comment="Duration in minutes"
+    )
+    run_id: Mapped[UUID] = mapped_column(
+        ForeignKey("runs.uuid", ondelete="CASCADE"), nullable=False
+    )
+    achieved_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
+
+    __table_args__ = (
+        Index(
+            "ix_challenge_best_times_challenge_id_duration",
+            "challenge_id",
+            "best_duration",
+            "achieved_at",
+        ),
+    )
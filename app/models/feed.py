@@ -0,0 +1,93 @@
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict
+from uuid import UUID
+
+if TYPE_CHECKING:
+    from app.models.user import User
+
+from sqlalchemy import (
+    Boolean,
+    DateTime,
+    ForeignKey,
+    Index,
+    PrimaryKeyConstraint,
+    String,
+    text,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.models.base import Base, CreatedAtMixin, UUIDMixin
+
+
+class Activity(Base, UUIDMixin, CreatedAtMixin):
+    __tablename__ = "activities"
+
+    actor_id: Mapped[UUID] = mapped_column(
+        ForeignKey("users.uuid", ondelete="CASCADE"),
+        nullable=False,
+    )
+    activity_type: Mapped[str] = mapped_column(
+        String(50),
+        nullable=False,
+        comment="Type of activity e.g. RUN, ACHIEVEMENT, CHALLENGE_COMPLETED",
+    )
+    object_id: Mapped[UUID] = mapped_column(
+        nullable=False,
+        comment="Run, achievement or challenge the activity refers to",
+    )
+    payload: Mapped[Dict[str, Any]] = mapped_column(
+        JSONB,
+        nullable=True,
+        comment="Denormalized summary rendered in the feed",
+    )
+    fanned_out: Mapped[bool] = mapped_column(
+        Boolean,
+        nullable=False,
+        comment="False if followers pull the activity at read time",
+    )
+
+    actor: Mapped["User"] = relationship("User")
+
+    __table_args__ = (
+        Index("ix_activities_actor_id_created_at", "actor_id", "created_at"),
+        Index(
+            "ix_activities_pull",
+            "actor_id",
+            "created_at",
+            postgresql_where=text("NOT fanned_out"),
+        ),
+    )
+
+
+class FeedEntry(Base):
+    """
+    Per-user timeline row, written when a friend's activity is fanned out.
+    """
+
+    __tablename__ = "feed_entries"
+
+    owner_id: Mapped[UUID] = mapped_column(
+        ForeignKey("users.uuid", ondelete="CASCADE"),
+        nullable=False,
+    )
+    activity_id: Mapped[UUID] = mapped_column(
+        ForeignKey("activities.uuid", ondelete="CASCADE"),
+        nullable=False,
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+    )
+
+    activity: Mapped["Activity"] = relationship("Activity")
+
+    __table_args__ = (
+        PrimaryKeyConstraint("owner_id", "activity_id"),
+        Index(
+            "ix_feed_entries_owner_id_created_at",
+            "owner_id",
+            "created_at",
+            "activity_id",
+        ),
+    )
@@ -1,10 +1,20 @@
 import enum
+from datetime import datetime
 from typing import TYPE_CHECKING
+from uuid import UUID
 
-from sqlalchemy import ForeignKey, String, UniqueConstraint
+from sqlalchemy import (
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    UniqueConstraint,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.models.base import Base, TimestampMixin, UUIDMixin
+from app.models.base import Base, CreatedAtMixin, TimestampMixin, UUIDMixin
 
 if TYPE_CHECKING:
     from app.models.user import User
@@ -34,3 +44,54 @@ class Friendship(Base, UUIDMixin, TimestampMixin):
     __table_args__ = (
         UniqueConstraint("requester_id", "addressee_id", name="uq_friendship_req_addr"),
     )
+
+
+class FriendEdge(Base, CreatedAtMixin):
+    """
+    Symmetric adjacency list of accepted friendships.
+
+    Every accepted friendship is stored twice, (a, b) and (b, a), so a user's
+    friends are a single range scan on the primary key.
+    """
+
+    __tablename__ = "friend_edges"
+
+    user_id: Mapped[UUID] = mapped_column(
+        ForeignKey("users.uuid", ondelete="CASCADE"), primary_key=True
+    )
+    friend_id: Mapped[UUID] = mapped_column(
+        ForeignKey("users.uuid", ondelete="CASCADE"), primary_key=True
+    )
+
+    __table_args__ = (
+        Index("ix_friend_edges_user_id_created_at", "user_id", "created_at"),
+    )
+
+
+class FriendSuggestion(Base):
+    """
+    Precomputed friend suggestions, refreshed by a periodic batch job.
+    """
+
+    __tablename__ = "friend_suggestions"
+
+    user_id: Mapped[UUID] = mapped_column(
+        ForeignKey("users.uuid", ondelete="CASCADE"), primary_key=True
+    )
+    candidate_id: Mapped[UUID] = mapped_column(
+        ForeignKey("users.uuid", ondelete="CASCADE"), primary_key=True
+    )
+    mutual_friends: Mapped[int] = mapped_column(Integer, nullable=False)
+    co_challenges: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        comment="Number of challenges both users have attempted",
+    )
+    score: Mapped[float] = mapped_column(Float, nullable=False)
+    computed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
+
+    candidate: Mapped["User"] = relationship("User", foreign_keys=[candidate_id])
+
+    __table_args__ = (Index("ix_friend_suggestions_user_id_score", "user_id", "score"),)
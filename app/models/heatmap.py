@@ -0,0 +1,47 @@
+from uuid import UUID
+
+from sqlalchemy import ForeignKey, Integer, LargeBinary, SmallInteger
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class HeatmapTile(Base):
+    """
+    One user's heatmap pixel counts in one web mercator tile.
+
+    Every run adds itself to the tiles its route crosses at every zoom level
+    when it is uploaded, so serving a tile never reads routes.
+    """
+
+    __tablename__ = "heatmap_tiles"
+
+    user_uuid: Mapped[UUID] = mapped_column(
+        ForeignKey("users.uuid", ondelete="CASCADE"), primary_key=True
+    )
+    zoom: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    x: Mapped[int] = mapped_column(Integer, primary_key=True)
+    y: Mapped[int] = mapped_column(Integer, primary_key=True)
+    pixels: Mapped[bytes] = mapped_column(
+        LargeBinary,
+        nullable=False,
+        comment="Pixel indices (uint16) then run counts (uint32), little-endian",
+    )
+
+
+class HeatmapRun(Base):
+    """
+    A run whose route is counted in its owner's heatmap tiles.
+
+    Written and deleted in the same transaction as the tile merge, so a run is
+    added at most once and only removed if it was added. There is no foreign
+    key to runs: the row has to outlive a deleted run until its route is taken
+    back out.
+    """
+
+    __tablename__ = "heatmap_runs"
+
+    run_uuid: Mapped[UUID] = mapped_column(primary_key=True)
+    user_uuid: Mapped[UUID] = mapped_column(
+        ForeignKey("users.uuid", ondelete="CASCADE"), nullable=False
+    )
@@ -0,0 +1,61 @@
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import DateTime, Float, ForeignKey, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class LeaderboardSnapshot(Base):
+    """
+    Per-user totals of a leaderboard period with the user's cohort and ranks
+    within it, refreshed by a periodic job.
+
+    Cohort boards read one cohort's rows in rank order instead of joining
+    users and ranking on every request.
+    """
+
+    __tablename__ = "leaderboard_snapshots"
+
+    period: Mapped[str] = mapped_column(String(16), primary_key=True)
+    period_key: Mapped[int] = mapped_column(
+        Integer,
+        primary_key=True,
+        comment="Week key or month key of the period, 0 for all time",
+    )
+    user_uuid: Mapped[UUID] = mapped_column(
+        ForeignKey("users.uuid", ondelete="CASCADE"), primary_key=True
+    )
+    age_group: Mapped[str] = mapped_column(String(16), nullable=False)
+    gender: Mapped[str] = mapped_column(String(16), nullable=False)
+    distance_band: Mapped[str] = mapped_column(String(16), nullable=False)
+    runs: Mapped[int] = mapped_column(Integer, nullable=False)
+    distance: Mapped[float] = mapped_column(
+        Float, nullable=False, comment="Distance in km"
+    )
+    duration: Mapped[float] = mapped_column(
+        Float, nullable=False, comment="Duration in minutes"
+    )
+    # Within age_group x gender
+    runs_rank: Mapped[int] = mapped_column(Integer, nullable=False)
+    distance_rank: Mapped[int] = mapped_column(Integer, nullable=False)
+    duration_rank: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Within age_group x gender x distance_band
+    band_runs_rank: Mapped[int] = mapped_column(Integer, nullable=False)
+    band_distance_rank: Mapped[int] = mapped_column(Integer, nullable=False)
+    band_duration_rank: Mapped[int] = mapped_column(Integer, nullable=False)
+    computed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
+
+    __table_args__ = (
+        Index(
+            "ix_leaderboard_snapshots_cohort",
+            "period",
+            "period_key",
+            "age_group",
+            "gender",
+            "distance_band",
+        ),
+    )
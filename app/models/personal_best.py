@@ -0,0 +1,51 @@
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import DateTime, Enum, Float, ForeignKey, Index, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.enums.run import PersonalBestDistance
+from app.models.base import Base
+
+
+class PersonalBest(Base):
+    """
+    Fastest effort over each standard distance within every run.
+
+    A user's personal best for a distance is their fastest row, one index
+    probe on (user_uuid, distance, duration); deleting a run removes its
+    efforts and the next fastest one takes over.
+    """
+
+    __tablename__ = "personal_bests"
+
+    run_id: Mapped[UUID] = mapped_column(
+        ForeignKey("runs.uuid", ondelete="CASCADE"), primary_key=True
+    )
+    distance: Mapped[PersonalBestDistance] = mapped_column(
+        Enum(PersonalBestDistance), primary_key=True
+    )
+    user_uuid: Mapped[UUID] = mapped_column(
+        ForeignKey("users.uuid", ondelete="CASCADE"), nullable=False
+    )
+    duration: Mapped[float] = mapped_column(
+        Float, nullable=False, comment="Duration in minutes"
+    )
+    started_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
+    start_index: Mapped[int] = mapped_column(
+        Integer, nullable=False, comment="First route point of the effort"
+    )
+    end_index: Mapped[int] = mapped_column(
+        Integer, nullable=False, comment="Last route point of the effort"
+    )
+
+    __table_args__ = (
+        Index(
+            "ix_personal_bests_user_uuid_distance_duration",
+            "user_uuid",
+            "distance",
+            "duration",
+        ),
+    )
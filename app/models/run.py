@@ -1,10 +1,19 @@
-from datetime import datetime
+from datetime import date, datetime
 from typing import TYPE_CHECKING, Any, Dict, List
 
 if TYPE_CHECKING:
     from app.models.user import User
 
-from sqlalchemy import DateTime, Float, ForeignKey, Integer, String
+from sqlalchemy import (
+    Date,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    SmallInteger,
+    String,
+)
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -31,6 +40,26 @@ class Run(Base, UUIDMixin, TimestampMixin):
         DateTime(timezone=True),
         nullable=False,
     )
+    local_date: Mapped[date] = mapped_column(
+        Date,
+        nullable=False,
+        comment="Start date in the user's time zone when the run was recorded",
+    )
+    local_hour: Mapped[int] = mapped_column(
+        SmallInteger,
+        nullable=False,
+        comment="Start hour in the user's time zone when the run was recorded",
+    )
+    week_key: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        comment="ISO year * 100 + ISO week of local_date",
+    )
+    month_key: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        comment="Year * 100 + month of local_date",
+    )
     duration: Mapped[float] = mapped_column(
         Float,
         nullable=False,
@@ -52,3 +81,12 @@ class Run(Base, UUIDMixin, TimestampMixin):
     )
 
     user: Mapped["User"] = relationship("User", back_populates="runs")
+
+    __table_args__ = (
+        Index("ix_runs_user_uuid_start_time", "user_uuid", "start_time"),
+        # Per-user day ranges: streaks, charts, goal periods
+        Index("ix_runs_user_uuid_local_date", "user_uuid", "local_date"),
+        # Everyone's runs in one week or month: leaderboards
+        Index("ix_runs_week_key_user_uuid", "week_key", "user_uuid"),
+        Index("ix_runs_month_key_user_uuid", "month_key", "user_uuid"),
+    )
@@ -2,6 +2,7 @@ from sqlalchemy import Integer, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base, TimestampMixin, UUIDMixin
+from app.utils.timezones import DEFAULT_TIMEZONE
 
 
 class User(Base, UUIDMixin, TimestampMixin):
@@ -37,6 +38,13 @@ class User(Base, UUIDMixin, TimestampMixin):
         Integer,
         nullable=True,
     )
+    timezone: Mapped[str] = mapped_column(
+        String(64),
+        nullable=False,
+        default=DEFAULT_TIMEZONE,
+        server_default=DEFAULT_TIMEZONE,
+        comment="IANA time zone name, used to bucket runs into local days",
+    )
 
     goals = relationship("Goal", back_populates="user")
     runs = relationship("Run", back_populates="user")
@@ -0,0 +1,313 @@
+from datetime import date
+from typing import Any, List, Optional, Type
+from uuid import UUID
+
+from sqlalchemy import Integer, cast, delete, extract, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.metrics import tag_repository_methods
+from app.enums.analytics import AnalyticsGranularity
+from app.models.analytics import RunDailyTotal, RunHourTotal, RunPaceTotal
+from app.models.base import Base
+from app.models.run import Run
+from app.utils.analytics import (
+    MAX_PACE_SECONDS,
+    MIN_PACE_SECONDS,
+    PACE_BUCKET_SECONDS,
+    pace_bucket,
+)
+
+TOTAL_COLUMNS = ["runs", "distance", "duration"]
+CUMULATIVE_COLUMNS = ["cum_runs", "cum_distance", "cum_duration"]
+
+# First key of the per-user advisory lock around running total updates, the
+# second one is a hash of the user's uuid
+DAILY_TOTALS_LOCK = 1
+
+
+class RunTotalsRepository:
+    """
+    Incrementally maintained run totals behind the analytics endpoints.
+
+    add_run and remove_run don't commit, so the totals change in the same
+    transaction as the run itself.
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def add_run(self, run: Run, sign: int = 1) -> None:
+        year = run.local_date.year
+        totals = {"runs": sign, "distance": sign * run.distance}
+        await self._add_daily(run, sign)
+        await self._increment(
+            RunHourTotal,
+            {
+                "user_uuid": run.user_uuid,
+                "year": year,
+                "weekday": run.local_date.isoweekday(),
+                "hour": run.local_hour,
+            },
+            {**totals, "duration": sign * run.duration},
+        )
+        bucket = pace_bucket(run.duration, run.distance)
+        if bucket is not None:
+            await self._increment(
+                RunPaceTotal,
+                {"user_uuid": run.user_uuid, "year": year, "pace_bucket": bucket},
+                totals,
+            )
+
+    async def remove_run(self, run: Run) -> None:
+        await self.add_run(run, sign=-1)
+        # Drop the buckets the run was the last one in
+        for model in (RunDailyTotal, RunHourTotal, RunPaceTotal):
+            await self.session.execute(
+                delete(model).where(model.user_uuid == run.user_uuid, model.runs <= 0)
+            )
+
+    async def _add_daily(self, run: Run, sign: int) -> None:
+        # Under READ COMMITTED two runs of the same user could both read the
+        # previous day's cum_* before either adds to the later days, so their
+        # updates are serialized until the transaction ends
+        await self.session.execute(
+            select(
+                func.pg_advisory_xact_lock(
+                    DAILY_TOTALS_LOCK, func.hashtext(str(run.user_uuid))
+                )
+            )
+        )
+
+        changes = {
+            "runs": sign,
+            "distance": sign * run.distance,
+            "duration": sign * run.duration,
+        }
+
+        # A new day starts from the running totals of the user's previous
+        # active day; then the run is added to its day and every later one
+        previous = {
+            f"cum_{name}": func.coalesce(
+                select(getattr(RunDailyTotal, f"cum_{name}"))
+                .where(
+                    RunDailyTotal.user_uuid == run.user_uuid,
+                    RunDailyTotal.local_date < run.local_date,
+                )
+                .order_by(RunDailyTotal.local_date.desc())
+                .limit(1)
+                .scalar_subquery(),
+                0,
+            )
+            for name in changes
+        }
+        await self._increment(
+            RunDailyTotal,
+            {
+                "user_uuid": run.user_uuid,
+                "local_date": run.local_date,
+                "week_key": run.week_key,
+                "month_key": run.month_key,
+            },
+            changes,
+            previous,
+        )
+        await self.session.execute(
+            update(RunDailyTotal)
+            .where(
+                RunDailyTotal.user_uuid == run.user_uuid,
+                RunDailyTotal.local_date >= run.local_date,
+            )
+            .values(
+                {
+                    f"cum_{name}": getattr(RunDailyTotal, f"cum_{name}") + change
+                    for name, change in changes.items()
+                }
+            )
+        )
+
+    async def _increment(
+        self,
+        model: Type[Base],
+        keys: dict,
+        values: dict,
+        initial: Optional[dict] = None,
+    ) -> None:
+        """
+        Add values to the row at keys, inserting it, with the initial values
+        of the other columns, if missing.
+        """
+        stmt = pg_insert(model).values(**keys, **values, **(initial or {}))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[
+                column.name for column in model.__table__.primary_key.columns
+            ],
+            set_={
+                name: getattr(model, name) + getattr(stmt.excluded, name)
+                for name in values
+            },
+        )
+        await self.session.execute(stmt)
+
+    async def rebuild(self, user_uuids: Optional[List[UUID]] = None) -> None:
+        """
+        Recompute the totals of the given users, or of everyone, from their runs.
+        """
+        user_filter = [Run.user_uuid.in_(user_uuids)] if user_uuids else []
+        for model in (RunDailyTotal, RunHourTotal, RunPaceTotal):
+            stmt = delete(model)
+            if user_uuids:
+                stmt = stmt.where(model.user_uuid.in_(user_uuids))
+            await self.session.execute(stmt)
+
+        totals = [
+            func.count(Run.uuid),
+            func.sum(Run.distance),
+            func.sum(Run.duration),
+        ]
+        running = {
+            "partition_by": Run.user_uuid,
+            "order_by": Run.local_date,
+        }
+        daily = select(
+            Run.user_uuid,
+            Run.local_date,
+            Run.week_key,
+            Run.month_key,
+            *totals,
+            *(func.sum(total).over(**running) for total in totals),
+        ).group_by(Run.user_uuid, Run.local_date, Run.week_key, Run.month_key)
+
+        year = func.div(Run.month_key, 100)
+        weekday = cast(extract("isodow", Run.local_date), Integer)
+        hourly = select(Run.user_uuid, year, weekday, Run.local_hour, *totals).group_by(
+            Run.user_uuid, year, weekday, Run.local_hour
+        )
+
+        # Same bucketing as pace_bucket
+        bucket = func.least(
+            func.greatest(
+                cast(
+                    func.floor(
+                        Run.duration * 60 / Run.distance / float(PACE_BUCKET_SECONDS)
+                    ),
+                    Integer,
+                )
+                * PACE_BUCKET_SECONDS,
+                MIN_PACE_SECONDS,
+            ),
+            MAX_PACE_SECONDS,
+        )
+        paces = (
+            select(Run.user_uuid, year, bucket, *totals[:2])
+            .where(Run.distance > 0)
+            .group_by(Run.user_uuid, year, bucket)
+        )
+
+        await self.session.execute(
+            pg_insert(RunDailyTotal).from_select(
+                [
+                    "user_uuid",
+                    "local_date",
+                    "week_key",
+                    "month_key",
+                    *TOTAL_COLUMNS,
+                    *CUMULATIVE_COLUMNS,
+                ],
+                daily.where(*user_filter),
+            )
+        )
+        await self.session.execute(
+            pg_insert(RunHourTotal).from_select(
+                ["user_uuid", "year", "weekday", "hour", *TOTAL_COLUMNS],
+                hourly.where(*user_filter),
+            )
+        )
+        await self.session.execute(
+            pg_insert(RunPaceTotal).from_select(
+                ["user_uuid", "year", "pace_bucket", *TOTAL_COLUMNS[:2]],
+                paces.where(*user_filter),
+            )
+        )
+        await self.session.commit()
+
+    async def get_series(
+        self,
+        user_uuid: UUID,
+        start_date: date,
+        end_date: date,
+        granularity: AnalyticsGranularity,
+    ) -> List[Any]:
+        """
+        Rows of (bucket, runs, distance, duration) per week key, month key or
+        year with runs between start_date and end_date inclusive.
+        """
+        if granularity == AnalyticsGranularity.WEEK:
+            bucket = RunDailyTotal.week_key
+        elif granularity == AnalyticsGranularity.MONTH:
+            bucket = RunDailyTotal.month_key
+        else:
+            bucket = func.div(RunDailyTotal.month_key, 100)
+
+        query = (
+            select(
+                bucket.label("bucket"),
+                func.sum(RunDailyTotal.runs).label("runs"),
+                func.sum(RunDailyTotal.distance).label("distance"),
+                func.sum(RunDailyTotal.duration).label("duration"),
+            )
+            .where(
+                RunDailyTotal.user_uuid == user_uuid,
+                RunDailyTotal.local_date >= start_date,
+                RunDailyTotal.local_date <= end_date,
+            )
+            .group_by("bucket")
+            .order_by("bucket")
+        )
+        result = await self.session.execute(query)
+        return result.all()
+
+    async def get_months(
+        self, user_uuid: UUID, start_date: date, end_date: date
+    ) -> List[Any]:
+        """
+        Rows of (month_key, runs, distance, duration, active_days) per month
+        with runs between start_date and end_date inclusive.
+        """
+        query = (
+            select(
+                RunDailyTotal.month_key,
+                func.sum(RunDailyTotal.runs).label("runs"),
+                func.sum(RunDailyTotal.distance).label("distance"),
+                func.sum(RunDailyTotal.duration).label("duration"),
+                func.count().label("active_days"),
+            )
+            .where(
+                RunDailyTotal.user_uuid == user_uuid,
+                RunDailyTotal.local_date >= start_date,
+                RunDailyTotal.local_date <= end_date,
+            )
+            .group_by(RunDailyTotal.month_key)
+            .order_by(RunDailyTotal.month_key)
+        )
+        result = await self.session.execute(query)
+        return result.all()
+
+    async def get_hours(self, user_uuid: UUID, year: int) -> List[RunHourTotal]:
+        query = select(RunHourTotal).where(
+            RunHourTotal.user_uuid == user_uuid, RunHourTotal.year == year
+        )
+        result = await self.session.execute(query)
+        return result.scalars().all()
+
+    async def get_paces(self, user_uuid: UUID, year: int) -> List[RunPaceTotal]:
+        query = (
+            select(RunPaceTotal)
+            .where(RunPaceTotal.user_uuid == user_uuid, RunPaceTotal.year == year)
+            .order_by(RunPaceTotal.pace_bucket)
+        )
+        result = await self.session.execute(query)
+        return result.scalars().all()
+
+
+tag_repository_methods(RunTotalsRepository)
@@ -6,6 +6,7 @@ from sqlalchemy import delete, func, select
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.metrics import tag_repository_methods
 from app.models import Base
 
 ModelType = TypeVar("ModelType", bound=Base)
@@ -16,6 +17,10 @@ class BaseRepository(Generic[ModelType]):
         self.session = session
         self.model = model
 
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        tag_repository_methods(cls)
+
     async def create_one(self, data: dict) -> ModelType:
         row: ModelType = self.model(**data)
         self.session.add(row)
@@ -139,3 +144,6 @@ class BaseRepository(Generic[ModelType]):
             for condition in filters:
                 query = query.filter(condition)
         await self.session.execute(query)
+
+
+tag_repository_methods(BaseRepository)
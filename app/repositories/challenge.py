@@ -1,12 +1,27 @@
-from typing import List
+from datetime import datetime
+from typing import Any, List
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import (
+    BigInteger,
+    any_,
+    bindparam,
+    delete,
+    func,
+    insert,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, undefer
 
-from app.models.challenge import Challenge, ChallengeAttempt
+from app.models.challenge import Challenge, ChallengeAttempt, ChallengeBestTime
+from app.models.user import User
 from app.repositories.base import BaseRepository
+from app.utils.route_index import BBox
 
 
 class ChallengeRepository(BaseRepository[Challenge]):
@@ -14,11 +29,20 @@ class ChallengeRepository(BaseRepository[Challenge]):
         super().__init__(session, Challenge)
 
     async def get_available_challenges(
-        self, friend_ids: List[UUID], page: int = 1, limit: int = 10
+        self,
+        friend_ids: List[UUID],
+        page: int = 1,
+        limit: int = 10,
+        with_relations: bool = True,
     ) -> tuple[List[Challenge], int]:
         # Include challenges created by friends
         filters = [Challenge.creator_id.in_(friend_ids), Challenge.is_active.is_(True)]
-        options = [selectinload(Challenge.creator), selectinload(Challenge.source_run)]
+        # Cards only need the denormalized columns, so skip loading the routes
+        options = (
+            [selectinload(Challenge.creator), selectinload(Challenge.source_run)]
+            if with_relations
+            else []
+        )
         return await self.get_many(
             page=page, limit=limit, filters=filters, options=options
         )
@@ -45,21 +69,232 @@ class ChallengeRepository(BaseRepository[Challenge]):
         result = await self.session.execute(query)
         return result.scalars().first()
 
+    async def update_creator_name(self, creator_id: UUID, name: str | None) -> None:
+        query = (
+            update(self.model)
+            .where(self.model.creator_id == creator_id)
+            .values(creator_name=name)
+        )
+        await self.session.execute(query)
+        await self.session.commit()
+
+    async def get_within_bbox(
+        self,
+        bbox: BBox,
+        endpoint_cells: List[int],
+        exclude_run_id: UUID | None = None,
+    ) -> List[Challenge]:
+        """
+        Active challenges whose course lies entirely inside the bounding box
+        and starts and ends in the given endpoint cells, with the route index
+        loaded.
+
+        The route index is only read for the rows left by both filters.
+        """
+        if not endpoint_cells:
+            return []
+        min_lat, min_lng, max_lat, max_lng = bbox
+        # Same expression as ix_challenges_active_bbox, so containment is one
+        # GiST search rather than a range scan on a single bound
+        course_box = func.box(
+            func.point(self.model.min_lng, self.model.min_lat),
+            func.point(self.model.max_lng, self.model.max_lat),
+        )
+        run_box = func.box(func.point(min_lng, min_lat), func.point(max_lng, max_lat))
+        # One array parameter however many cells the run covers
+        cells = bindparam("endpoint_cells", endpoint_cells, type_=ARRAY(BigInteger))
+        query = (
+            select(self.model)
+            .where(
+                self.model.is_active,
+                course_box.op("<@")(run_box),
+                self.model.start_cell == any_(cells),
+                self.model.end_cell == any_(cells),
+            )
+            .options(undefer(Challenge.route_index))
+        )
+        if exclude_run_id is not None:
+            query = query.where(self.model.source_run_id != exclude_run_id)
+        result = await self.session.execute(query)
+        return result.scalars().all()
+
 
 class ChallengeAttemptRepository(BaseRepository[ChallengeAttempt]):
     def __init__(self, session: AsyncSession) -> None:
         super().__init__(session, ChallengeAttempt)
 
     async def get_attempts_by_challenge(
-        self, challenge_id: UUID
+        self, challenge_id: UUID, with_runs: bool = True
     ) -> List[ChallengeAttempt]:
+        options = [selectinload(ChallengeAttempt.user)]
+        if with_runs:
+            options.append(selectinload(ChallengeAttempt.run))
         query = (
             select(self.model)
             .where(self.model.challenge_id == challenge_id)
-            .options(
-                selectinload(ChallengeAttempt.user), selectinload(ChallengeAttempt.run)
-            )
+            .options(*options)
             .order_by(self.model.created_at.desc())
         )
         result = await self.session.execute(query)
         return result.scalars().all()
+
+    async def create_once(self, data: dict) -> ChallengeAttempt | None:
+        """
+        Insert the attempt unless the run already has one on the challenge.
+
+        Returns:
+            The new attempt, or None if there already was one
+        """
+        stmt = (
+            pg_insert(self.model)
+            .values(**data)
+            .on_conflict_do_nothing(index_elements=["challenge_id", "run_id"])
+            .returning(self.model)
+        )
+        result = await self.session.scalars(stmt)
+        attempt = result.one_or_none()
+        await self.session.commit()
+        return attempt
+
+    async def get_challenge_ids_by_run(self, run_id: UUID) -> set[UUID]:
+        query = select(self.model.challenge_id).where(self.model.run_id == run_id)
+        result = await self.session.execute(query)
+        return set(result.scalars().all())
+
+
+class ChallengeBestTimeRepository(BaseRepository[ChallengeBestTime]):
+    def __init__(self, session: AsyncSession) -> None:
+        super().__init__(session, ChallengeBestTime)
+
+    async def record(
+        self,
+        challenge_id: UUID,
+        user_id: UUID,
+        duration: float,
+        run_id: UUID,
+        achieved_at: datetime,
+    ) -> None:
+        """Store the attempt if it beats the user's best time on the challenge."""
+        stmt = pg_insert(self.model).values(
+            challenge_id=challenge_id,
+            user_id=user_id,
+            best_duration=duration,
+            run_id=run_id,
+            achieved_at=achieved_at,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["challenge_id", "user_id"],
+            set_={
+                "best_duration": stmt.excluded.best_duration,
+                "run_id": stmt.excluded.run_id,
+                "achieved_at": stmt.excluded.achieved_at,
+            },
+            where=stmt.excluded.best_duration < self.model.best_duration,
+        )
+        await self.session.execute(stmt)
+        await self.session.commit()
+
+    async def remove_run(self, run_id: UUID) -> None:
+        """
+        Drop the best times set by a run about to be deleted, without
+        committing; each user's next fastest successful attempt takes over.
+        """
+        result = await self.session.execute(
+            delete(self.model)
+            .where(self.model.run_id == run_id)
+            .returning(self.model.challenge_id, self.model.user_id)
+        )
+        keys = [tuple(row) for row in result.all()]
+        if not keys:
+            return
+
+        attempts = (
+            select(
+                ChallengeAttempt.challenge_id,
+                ChallengeAttempt.user_id,
+                ChallengeAttempt.duration,
+                ChallengeAttempt.run_id,
+                ChallengeAttempt.created_at,
+                func.row_number()
+                .over(
+                    partition_by=(
+                        ChallengeAttempt.challenge_id,
+                        ChallengeAttempt.user_id,
+                    ),
+                    order_by=(ChallengeAttempt.duration, ChallengeAttempt.created_at),
+                )
+                .label("position"),
+            )
+            .where(
+                tuple_(ChallengeAttempt.challenge_id, ChallengeAttempt.user_id).in_(
+                    keys
+                ),
+                ChallengeAttempt.success,
+                ChallengeAttempt.duration.is_not(None),
+                ChallengeAttempt.run_id != run_id,
+            )
+            .subquery()
+        )
+        fastest = select(
+            attempts.c.challenge_id,
+            attempts.c.user_id,
+            attempts.c.duration,
+            attempts.c.run_id,
+            attempts.c.created_at,
+        ).where(attempts.c.position == 1)
+        await self.session.execute(
+            insert(self.model).from_select(
+                ["challenge_id", "user_id", "best_duration", "run_id", "achieved_at"],
+                fastest,
+            )
+        )
+
+    async def get_ranking(
+        self, challenge_id: UUID, page: int = 1, limit: int = 10
+    ) -> tuple[list[Any], int]:
+        """
+        Page of best times ordered by duration, then by who got there first.
+
+        Returns:
+            Rows of (ChallengeBestTime, username) and the number of ranked users
+        """
+        offset = (page - 1) * limit
+        query = (
+            select(self.model, User.username)
+            .join(User, User.uuid == self.model.user_id)
+            .where(self.model.challenge_id == challenge_id)
+            .order_by(self.model.best_duration, self.model.achieved_at)
+            .offset(offset)
+            .limit(limit)
+        )
+        total_query = (
+            select(func.count())
+            .select_from(self.model)
+            .where(self.model.challenge_id == challenge_id)
+        )
+
+        result = await self.session.execute(query)
+        total = await self.session.execute(total_query)
+        return [tuple(row) for row in result.all()], total.scalar()
+
+    async def get_user_position(
+        self, challenge_id: UUID, user_id: UUID
+    ) -> tuple[ChallengeBestTime, int] | None:
+        """
+        The user's best time and 1-based rank, or None if they have no result.
+        """
+        best = await self.get_one(challenge_id=challenge_id, user_id=user_id)
+        if best is None:
+            return None
+
+        ahead_query = (
+            select(func.count())
+            .select_from(self.model)
+            .where(
+                self.model.challenge_id == challenge_id,
+                tuple_(self.model.best_duration, self.model.achieved_at)
+                < (best.best_duration, best.achieved_at),
+            )
+        )
+        ahead = await self.session.execute(ahead_query)
+        return best, ahead.scalar() + 1
@@ -0,0 +1,98 @@
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import literal, select, tuple_, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.models.feed import Activity, FeedEntry
+from app.models.friendship import FriendEdge
+from app.repositories.base import BaseRepository
+
+
+class ActivityRepository(BaseRepository[Activity]):
+    def __init__(self, session: AsyncSession) -> None:
+        super().__init__(session, Activity)
+
+    async def get_pulled(
+        self,
+        actor_ids: list[UUID],
+        before: tuple[datetime, UUID] | None = None,
+        limit: int = 20,
+    ) -> list[Activity]:
+        """
+        Activities of high-fanout actors, which are not copied into timelines.
+        """
+        if not actor_ids:
+            return []
+
+        query = (
+            select(self.model)
+            .where(
+                self.model.actor_id.in_(actor_ids),
+                self.model.fanned_out.is_(False),
+            )
+            .options(selectinload(self.model.actor))
+            .order_by(self.model.created_at.desc(), self.model.uuid.desc())
+            .limit(limit)
+        )
+        if before:
+            query = query.where(tuple_(self.model.created_at, self.model.uuid) < before)
+
+        result = await self.session.execute(query)
+        return result.scalars().all()
+
+
+class FeedEntryRepository(BaseRepository[FeedEntry]):
+    def __init__(self, session: AsyncSession) -> None:
+        super().__init__(session, FeedEntry)
+
+    async def fan_out(self, activity: Activity, to_friends: bool = True) -> None:
+        """
+        Copy an activity into the timeline of the actor and, unless to_friends
+        is False, of all their friends.
+        """
+        followers = select(
+            FriendEdge.friend_id.label("owner_id"),
+            literal(activity.uuid).label("activity_id"),
+            literal(activity.created_at).label("created_at"),
+        ).where(FriendEdge.user_id == activity.actor_id)
+        actor = select(
+            literal(activity.actor_id).label("owner_id"),
+            literal(activity.uuid).label("activity_id"),
+            literal(activity.created_at).label("created_at"),
+        )
+
+        query = (
+            pg_insert(self.model)
+            .from_select(
+                ["owner_id", "activity_id", "created_at"],
+                union_all(followers, actor) if to_friends else actor,
+            )
+            .on_conflict_do_nothing()
+        )
+        await self.session.execute(query)
+        await self.session.commit()
+
+    async def get_timeline(
+        self,
+        owner_id: UUID,
+        before: tuple[datetime, UUID] | None = None,
+        limit: int = 20,
+    ) -> list[Activity]:
+        query = (
+            select(Activity)
+            .join(self.model, self.model.activity_id == Activity.uuid)
+            .where(self.model.owner_id == owner_id)
+            .options(selectinload(Activity.actor))
+            .order_by(self.model.created_at.desc(), self.model.activity_id.desc())
+            .limit(limit)
+        )
+        if before:
+            query = query.where(
+                tuple_(self.model.created_at, self.model.activity_id) < before
+            )
+
+        result = await self.session.execute(query)
+        return result.scalars().all()
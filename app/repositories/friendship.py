@@ -1,9 +1,26 @@
-from sqlalchemy import and_, or_, select
-from sqlalchemy.orm import selectinload
+from datetime import datetime
+from typing import Any
+from uuid import UUID
 
-from app.models.friendship import Friendship, FriendshipStatus
+from sqlalchemy import and_, exists, func, literal, or_, select, true, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import aliased, selectinload
+
+from app.enums.friendship import FriendSortBy
+from app.models.challenge import ChallengeAttempt
+from app.models.friendship import (
+    FriendEdge,
+    Friendship,
+    FriendshipStatus,
+    FriendSuggestion,
+)
+from app.models.run import Run
+from app.models.user import User
 from app.repositories.base import BaseRepository
 
+# First key of the advisory lock held while refreshing the suggestions
+SUGGESTIONS_LOCK = 3
+
 
 class FriendshipRepository(BaseRepository[Friendship]):
     def __init__(self, session):
@@ -25,20 +42,6 @@ class FriendshipRepository(BaseRepository[Friendship]):
         result = await self.session.execute(stmt)
         return result.scalars().first()
 
-    async def get_friends(self, user_id):
-        # Fetch friendships where user is involved and status is ACCEPTED
-        stmt = select(self.model).where(
-            and_(
-                or_(
-                    self.model.requester_id == user_id,
-                    self.model.addressee_id == user_id,
-                ),
-                self.model.status == FriendshipStatus.ACCEPTED,
-            )
-        )
-        result = await self.session.execute(stmt)
-        return result.scalars().all()
-
     async def get_pending_requests(self, user_id, type="incoming"):
         stmt = (
             select(self.model)
@@ -55,3 +58,309 @@ class FriendshipRepository(BaseRepository[Friendship]):
 
         result = await self.session.execute(stmt)
         return result.scalars().all()
+
+
+class FriendEdgeRepository(BaseRepository[FriendEdge]):
+    def __init__(self, session):
+        super().__init__(session, FriendEdge)
+
+    async def add_pair(self, user_id: UUID, friend_id: UUID) -> None:
+        await self.create_many(
+            [
+                {"user_id": user_id, "friend_id": friend_id},
+                {"user_id": friend_id, "friend_id": user_id},
+            ]
+        )
+
+    async def remove_pair(self, user_id: UUID, friend_id: UUID) -> None:
+        await self.delete_many(
+            filters=[
+                or_(
+                    and_(
+                        self.model.user_id == user_id,
+                        self.model.friend_id == friend_id,
+                    ),
+                    and_(
+                        self.model.user_id == friend_id,
+                        self.model.friend_id == user_id,
+                    ),
+                )
+            ]
+        )
+
+    async def count_friends(self, user_id: UUID, cap: int | None = None) -> int:
+        """Count the user's friends, stopping early once cap is exceeded."""
+        stmt = select(self.model.friend_id).where(self.model.user_id == user_id)
+        if cap is not None:
+            stmt = stmt.limit(cap + 1)
+        result = await self.session.execute(
+            select(func.count()).select_from(stmt.subquery())
+        )
+        return result.scalar()
+
+    async def get_friend_ids(self, user_id: UUID) -> list[UUID]:
+        stmt = select(self.model.friend_id).where(self.model.user_id == user_id)
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def list_friends(
+        self,
+        user_id: UUID,
+        page: int = 1,
+        limit: int = 10,
+        sort_by: FriendSortBy = FriendSortBy.USERNAME,
+        activity_week: int | None = None,
+    ) -> tuple[list[Any], int]:
+        """
+        Fetch friend users in one joined query.
+
+        When activity_week is given (or friends are sorted by activity) each row
+        also carries the friend's last run start time and the distance of their
+        runs with that week_key, from correlated subqueries.
+
+        Returns:
+            Rows of (User, last_run_at, recent_distance) and the total friend count
+        """
+        offset = (page - 1) * limit
+
+        query = (
+            select(User)
+            .join(self.model, self.model.friend_id == User.uuid)
+            .where(self.model.user_id == user_id)
+        )
+
+        with_activity = (
+            activity_week is not None or sort_by == FriendSortBy.RECENT_ACTIVITY
+        )
+        if with_activity:
+            # The newest run from ix_runs_user_uuid_start_time, and only the
+            # week's runs from ix_runs_week_key_user_uuid, not the whole history
+            last_run_at = (
+                select(Run.start_time)
+                .where(Run.user_uuid == User.uuid)
+                .order_by(Run.start_time.desc())
+                .limit(1)
+                .scalar_subquery()
+                .label("last_run_at")
+            )
+            recent_runs = select(func.coalesce(func.sum(Run.distance), 0)).where(
+                Run.user_uuid == User.uuid
+            )
+            if activity_week is not None:
+                recent_runs = recent_runs.where(Run.week_key == activity_week)
+            query = query.add_columns(
+                last_run_at, recent_runs.scalar_subquery().label("recent_distance")
+            )
+
+        if sort_by == FriendSortBy.RECENT_ACTIVITY:
+            query = query.order_by(last_run_at.desc().nulls_last())
+        query = query.order_by(User.username.asc().nulls_last(), User.uuid)
+
+        total_query = (
+            select(func.count())
+            .select_from(self.model)
+            .where(self.model.user_id == user_id)
+        )
+
+        result = await self.session.execute(query.offset(offset).limit(limit))
+        total = await self.session.execute(total_query)
+
+        if with_activity:
+            rows = [tuple(row) for row in result.all()]
+        else:
+            rows = [(user, None, None) for user in result.scalars().all()]
+        return rows, total.scalar()
+
+
+class FriendSuggestionRepository(BaseRepository[FriendSuggestion]):
+    def __init__(self, session):
+        super().__init__(session, FriendSuggestion)
+
+    async def get_suggestions(
+        self, user_id: UUID, limit: int = 20
+    ) -> list[FriendSuggestion]:
+        # Skip candidates who became friends since the last refresh
+        already_friends = exists().where(
+            FriendEdge.user_id == self.model.user_id,
+            FriendEdge.friend_id == self.model.candidate_id,
+        )
+        stmt = (
+            select(self.model)
+            .where(self.model.user_id == user_id, ~already_friends)
+            .options(selectinload(self.model.candidate))
+            .order_by(self.model.score.desc(), self.model.candidate_id)
+            .limit(limit)
+        )
+        result = await self.session.execute(stmt)
+        return result.scalars().all()
+
+    async def lock_refresh(self) -> bool:
+        """
+        Take the suggestion refresh lock until the transaction ends.
+
+        Returns:
+            False if another transaction holds it
+        """
+        result = await self.session.execute(
+            select(func.pg_try_advisory_xact_lock(SUGGESTIONS_LOCK, 0))
+        )
+        return result.scalar()
+
+    async def refresh_for_users(
+        self,
+        user_ids: list[UUID],
+        computed_at: datetime,
+        max_fanout: int,
+        max_suggestions: int,
+        mutual_weight: float,
+        co_challenge_weight: float,
+    ) -> None:
+        """
+        Recompute suggestions for a batch of users.
+
+        Candidates are found with a two-hop walk over friend_edges and through
+        shared challenge attempts. Every hop is capped at max_fanout rows per
+        node via LATERAL ... LIMIT, so users with thousands of friends cost a
+        bounded amount of work.
+        """
+        if not user_ids:
+            return
+
+        users = (
+            select(User.uuid.label("user_id"))
+            .where(User.uuid.in_(user_ids))
+            .subquery("batch_users")
+        )
+
+        # Friends of friends, counted once per mutual friend
+        hop1 = (
+            select(FriendEdge.friend_id)
+            .where(FriendEdge.user_id == users.c.user_id)
+            .order_by(FriendEdge.created_at.desc())
+            .limit(max_fanout)
+            .lateral("hop1")
+        )
+        edge2 = aliased(FriendEdge)
+        hop2 = (
+            select(edge2.friend_id)
+            .where(edge2.user_id == hop1.c.friend_id)
+            .order_by(edge2.created_at.desc())
+            .limit(max_fanout)
+            .lateral("hop2")
+        )
+        mutual = (
+            select(
+                users.c.user_id,
+                hop2.c.friend_id.label("candidate_id"),
+                func.count().label("mutual_friends"),
+                literal(0).label("co_challenges"),
+            )
+            .select_from(users)
+            .join(hop1, true())
+            .join(hop2, true())
+            .group_by(users.c.user_id, hop2.c.friend_id)
+        )
+
+        # Users who attempted the same challenges
+        own = (
+            select(ChallengeAttempt.challenge_id)
+            .where(ChallengeAttempt.user_id == users.c.user_id)
+            .group_by(ChallengeAttempt.challenge_id)
+            .order_by(func.max(ChallengeAttempt.created_at).desc())
+            .limit(max_fanout)
+            .lateral("own_challenges")
+        )
+        attempt2 = aliased(ChallengeAttempt)
+        others = (
+            select(attempt2.user_id)
+            .where(attempt2.challenge_id == own.c.challenge_id)
+            .order_by(attempt2.created_at.desc())
+            .limit(max_fanout)
+            .lateral("co_attempts")
+        )
+        co_participants = (
+            select(
+                users.c.user_id,
+                others.c.user_id.label("candidate_id"),
+                literal(0).label("mutual_friends"),
+                func.count(func.distinct(own.c.challenge_id)).label("co_challenges"),
+            )
+            .select_from(users)
+            .join(own, true())
+            .join(others, true())
+            .group_by(users.c.user_id, others.c.user_id)
+        )
+
+        candidates = union_all(mutual, co_participants).subquery("candidates")
+        mutual_friends = func.sum(candidates.c.mutual_friends)
+        co_challenges = func.sum(candidates.c.co_challenges)
+        score = mutual_friends * mutual_weight + co_challenges * co_challenge_weight
+
+        already_friends = exists().where(
+            FriendEdge.user_id == candidates.c.user_id,
+            FriendEdge.friend_id == candidates.c.candidate_id,
+        )
+        pending_request = exists().where(
+            or_(
+                and_(
+                    Friendship.requester_id == candidates.c.user_id,
+                    Friendship.addressee_id == candidates.c.candidate_id,
+                ),
+                and_(
+                    Friendship.requester_id == candidates.c.candidate_id,
+                    Friendship.addressee_id == candidates.c.user_id,
+                ),
+            )
+        )
+        scored = (
+            select(
+                candidates.c.user_id,
+                candidates.c.candidate_id,
+                mutual_friends.label("mutual_friends"),
+                co_challenges.label("co_challenges"),
+                score.label("score"),
+                func.row_number()
+                .over(partition_by=candidates.c.user_id, order_by=score.desc())
+                .label("rank"),
+            )
+            .where(
+                candidates.c.candidate_id != candidates.c.user_id,
+                ~already_friends,
+                ~pending_request,
+            )
+            .group_by(candidates.c.user_id, candidates.c.candidate_id)
+            .subquery("scored")
+        )
+        top = select(
+            scored.c.user_id,
+            scored.c.candidate_id,
+            scored.c.mutual_friends,
+            scored.c.co_challenges,
+            scored.c.score,
+            literal(computed_at).label("computed_at"),
+        ).where(scored.c.rank <= max_suggestions)
+
+        await self.delete_many(filters=[self.model.user_id.in_(user_ids)])
+        insert_stmt = pg_insert(self.model).from_select(
+            [
+                "user_id",
+                "candidate_id",
+                "mutual_friends",
+                "co_challenges",
+                "score",
+                "computed_at",
+            ],
+            top,
+        )
+        await self.session.execute(
+            insert_stmt.on_conflict_do_update(
+                index_elements=["user_id", "candidate_id"],
+                set_={
+                    "mutual_friends": insert_stmt.excluded.mutual_friends,
+                    "co_challenges": insert_stmt.excluded.co_challenges,
+                    "score": insert_stmt.excluded.score,
+                    "computed_at": insert_stmt.excluded.computed_at,
+                },
+            )
+        )
+        await self.session.commit()
@@ -0,0 +1,108 @@
+from typing import Dict, List
+from uuid import UUID
+
+from sqlalchemy import delete, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.heatmap import HeatmapRun, HeatmapTile
+from app.repositories.base import BaseRepository
+from app.utils.heatmap import TileKey
+
+
+class HeatmapTileRepository(BaseRepository[HeatmapTile]):
+    def __init__(self, session: AsyncSession) -> None:
+        super().__init__(session, HeatmapTile)
+
+    async def mark_run(self, run_uuid: UUID, user_uuid: UUID) -> bool:
+        """
+        Record the run as counted in the tiles, without committing.
+
+        Returns:
+            False if it already was
+        """
+        result = await self.session.execute(
+            pg_insert(HeatmapRun)
+            .values(run_uuid=run_uuid, user_uuid=user_uuid)
+            .on_conflict_do_nothing()
+            .returning(HeatmapRun.run_uuid)
+        )
+        return result.scalar() is not None
+
+    async def unmark_run(self, run_uuid: UUID) -> bool:
+        """
+        Record the run as no longer counted in the tiles, without committing.
+
+        Returns:
+            False if it was not counted
+        """
+        result = await self.session.execute(
+            delete(HeatmapRun)
+            .where(HeatmapRun.run_uuid == run_uuid)
+            .returning(HeatmapRun.run_uuid)
+        )
+        return result.scalar() is not None
+
+    async def lock_tiles(
+        self, user_uuid: UUID, keys: List[TileKey]
+    ) -> Dict[TileKey, bytes]:
+        """
+        The user's tiles at keys, created empty where missing and locked until
+        the transaction ends, so concurrent uploads merge one after another.
+        """
+        await self.session.execute(
+            pg_insert(self.model)
+            .values(
+                [
+                    {"user_uuid": user_uuid, "zoom": z, "x": x, "y": y, "pixels": b""}
+                    for z, x, y in sorted(keys)
+                ]
+            )
+            .on_conflict_do_nothing()
+        )
+        query = (
+            select(self.model.zoom, self.model.x, self.model.y, self.model.pixels)
+            .where(
+                self.model.user_uuid == user_uuid,
+                tuple_(self.model.zoom, self.model.x, self.model.y).in_(keys),
+            )
+            # Same lock order in every transaction
+            .order_by(self.model.zoom, self.model.x, self.model.y)
+            .with_for_update()
+        )
+        result = await self.session.execute(query)
+        return {(row.zoom, row.x, row.y): row.pixels for row in result.all()}
+
+    async def save_tiles(self, user_uuid: UUID, tiles: Dict[TileKey, bytes]) -> None:
+        """
+        Store the merged tiles and commit; tiles left without pixels are
+        deleted.
+        """
+        await self.session.execute(
+            update(self.model),
+            [
+                {"user_uuid": user_uuid, "zoom": z, "x": x, "y": y, "pixels": pixels}
+                for (z, x, y), pixels in tiles.items()
+            ],
+        )
+        await self.session.execute(
+            delete(self.model).where(
+                self.model.user_uuid == user_uuid, self.model.pixels == b""
+            )
+        )
+        await self.session.commit()
+
+    async def get_tiles(
+        self, user_uuids: List[UUID], zoom: int, x: int, y: int
+    ) -> List[bytes]:
+        """
+        The given users' copies of one tile.
+        """
+        query = select(self.model.pixels).where(
+            self.model.user_uuid.in_(user_uuids),
+            self.model.zoom == zoom,
+            self.model.x == x,
+            self.model.y == y,
+        )
+        result = await self.session.execute(query)
+        return list(result.scalars().all())
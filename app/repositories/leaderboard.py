@@ -1,97 +1,378 @@
-from datetime import datetime
-from typing import Any, List, Optional
+from datetime import date, datetime
+from typing import Any, List, Optional, Tuple
 from uuid import UUID
 
-from sqlalchemy import and_, desc, func, select
+from sqlalchemy import (
+    Select,
+    Subquery,
+    delete,
+    desc,
+    func,
+    literal,
+    or_,
+    select,
+    tuple_,
+    union_all,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.run import Run
+from app.core.metrics import tag_repository_methods
+from app.enums.leaderboard import AgeGroup, CohortGender, DistanceBand
+from app.models.analytics import RunDailyTotal
+from app.models.friendship import FriendEdge
+from app.models.leaderboard import LeaderboardSnapshot
 from app.models.user import User
-from app.schemas.leaderboard import LeaderboardMetric
+from app.schemas.leaderboard import LeaderboardMetric, LeaderboardPeriod
+from app.utils.cohorts import (
+    age_group_expression,
+    distance_band_expression,
+    gender_expression,
+)
+
+# First key of the advisory lock held while refreshing the snapshots
+SNAPSHOTS_LOCK = 2
+
+SNAPSHOT_COLUMNS = [
+    "period",
+    "period_key",
+    "user_uuid",
+    "age_group",
+    "gender",
+    "distance_band",
+    "runs",
+    "distance",
+    "duration",
+    "runs_rank",
+    "distance_rank",
+    "duration_rank",
+    "band_runs_rank",
+    "band_distance_rank",
+    "band_duration_rank",
+    "computed_at",
+]
 
 
 class LeaderboardRepository:
+    """
+    Leaderboards over any range of local dates, read from the running totals
+    in run_daily_totals: a user's total between two dates is the running total
+    of their last active day up to end_date minus the one before start_date,
+    two primary key lookups per user however long the range.
+
+    Cohort boards are read from leaderboard_snapshots, with ranks already
+    computed within every cohort. The snapshot methods don't commit: a refresh
+    is one transaction under lock_snapshots.
+    """
+
     def __init__(self, session: AsyncSession):
         self.session = session
 
     async def get_leaderboard(
         self,
+        user_uuid: UUID,
         metric: LeaderboardMetric,
-        start_date: Optional[datetime] = None,
-        end_date: Optional[datetime] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
         limit: int = 50,
-        user_ids: Optional[List[UUID]] = None,
+        around: int = 0,
+        friends_only: bool = False,
     ) -> List[dict]:
-        value_expr = self._get_metric_expression(metric)
-
-        # Build join conditions
-        join_conditions = [User.uuid == Run.user_uuid]
-        if start_date:
-            join_conditions.append(Run.start_time >= start_date)
-        if end_date:
-            join_conditions.append(Run.start_time <= end_date)
+        """
+        The top limit rows, the user's own row and the rows within around
+        positions of it, in rank order, in one query.
 
-        query = select(
-            User.uuid.label("user_uuid"),
-            User.username,
-            value_expr.label("value"),
-            func.rank().over(order_by=desc(value_expr)).label("rank"),
-        ).outerjoin(Run, and_(*join_conditions))
-
-        if user_ids:
-            query = query.where(User.uuid.in_(user_ids))
-
-        stmt = (
-            query.group_by(User.uuid, User.username)
-            .order_by(desc("value"))
-            .limit(limit)
-        )
+        Friends are joined from friend_edges, so the friends board is the same
+        query whatever the number of friends.
+        """
+        members = None
+        if friends_only:
+            members = union_all(
+                select(User.uuid.label("user_uuid")).where(User.uuid == user_uuid),
+                select(FriendEdge.friend_id).where(FriendEdge.user_id == user_uuid),
+            ).subquery("members")
+        ranked = self._ranked_query(metric, start_date, end_date, members)
+        stmt = self._top_and_around(ranked, user_uuid, limit, around)
 
         result = await self.session.execute(stmt)
         return result.all()
 
-    async def get_user_entry(
+    def _ranked_query(
         self,
-        user_uuid: UUID,
         metric: LeaderboardMetric,
-        start_date: Optional[datetime] = None,
-        end_date: Optional[datetime] = None,
-        user_ids: Optional[List[UUID]] = None,
-    ) -> Optional[dict]:
-        value_expr = self._get_metric_expression(metric)
-
-        # Build join conditions
-        join_conditions = [User.uuid == Run.user_uuid]
-        if start_date:
-            join_conditions.append(Run.start_time >= start_date)
-        if end_date:
-            join_conditions.append(Run.start_time <= end_date)
+        start_date: Optional[date],
+        end_date: Optional[date],
+        members: Optional[Subquery] = None,
+    ) -> Select:
+        """
+        Every user's total between start_date and end_date inclusive, either
+        open-ended, ranked by it; only the users in members if given.
 
-        query = select(
-            User.uuid.label("user_uuid"),
-            User.username,
-            value_expr.label("value"),
-            func.rank().over(order_by=desc(value_expr)).label("rank"),
-        ).outerjoin(Run, and_(*join_conditions))
+        position numbers the rows in rank order, ties broken by user.
+        """
+        column = self._get_metric_column(metric)
+        value_expr = func.coalesce(self._running_total(column, end_date), 0)
+        if start_date is not None:
+            value_expr = value_expr - func.coalesce(
+                self._running_total(column, start_date, inclusive=False), 0
+            )
 
-        if user_ids:
-            query = query.where(User.uuid.in_(user_ids))
+        query = select(User.uuid.label("user_uuid"), value_expr.label("value"))
+        if members is not None:
+            query = query.select_from(members).join(
+                User, User.uuid == members.c.user_uuid
+            )
+        totals = query.subquery()
 
-        subquery = query.group_by(User.uuid, User.username)
+        return select(
+            totals.c.user_uuid,
+            totals.c.value,
+            func.rank().over(order_by=desc(totals.c.value)).label("rank"),
+            func.row_number()
+            .over(order_by=(desc(totals.c.value), totals.c.user_uuid))
+            .label("position"),
+        )
 
-        subquery = subquery.subquery()
+    def _top_and_around(
+        self, ranked: Select, user_uuid: UUID, limit: int, around: int
+    ) -> Select:
+        """
+        Rows of a ranked query at positions up to limit or within around of
+        the user's, with usernames.
+        """
+        ranked = ranked.cte("ranked")
+        position = (
+            select(ranked.c.position)
+            .where(ranked.c.user_uuid == user_uuid)
+            .scalar_subquery()
+        )
+        return (
+            select(
+                ranked.c.user_uuid,
+                User.username,
+                ranked.c.value,
+                ranked.c.rank,
+                ranked.c.position,
+            )
+            .join(User, User.uuid == ranked.c.user_uuid)
+            .where(
+                or_(
+                    ranked.c.position <= limit,
+                    ranked.c.position.between(position - around, position + around),
+                )
+            )
+            .order_by(ranked.c.position)
+        )
 
-        stmt = select(subquery).where(subquery.c.user_uuid == user_uuid)
+    def _running_total(
+        self, column: Any, day: Optional[date], inclusive: bool = True
+    ) -> Any:
+        # Last active day on (or before) day, the latest one without a day
+        query = (
+            select(column)
+            .where(RunDailyTotal.user_uuid == User.uuid)
+            .order_by(RunDailyTotal.local_date.desc())
+            .limit(1)
+        )
+        if day is not None:
+            query = query.where(
+                RunDailyTotal.local_date <= day
+                if inclusive
+                else RunDailyTotal.local_date < day
+            )
+        return query.scalar_subquery()
+
+    async def get_cohort_leaderboard(
+        self,
+        user_uuid: UUID,
+        metric: LeaderboardMetric,
+        period: LeaderboardPeriod,
+        period_key: int,
+        age_group: AgeGroup,
+        gender: CohortGender,
+        distance_band: Optional[DistanceBand] = None,
+        limit: int = 50,
+        around: int = 0,
+    ) -> List[dict]:
+        """
+        Same rows as get_leaderboard, from one cohort's snapshot.
+        """
+        ranked = self._cohort_query(
+            metric, period, period_key, age_group, gender, distance_band
+        )
+        stmt = self._top_and_around(ranked, user_uuid, limit, around)
 
         result = await self.session.execute(stmt)
-        return result.one_or_none()
+        return result.all()
+
+    async def lock_snapshots(self) -> bool:
+        """
+        Take the snapshot refresh lock until the transaction ends.
 
-    def _get_metric_expression(self, metric: LeaderboardMetric) -> Any:
+        Returns:
+            False if another transaction holds it
+        """
+        result = await self.session.execute(
+            select(func.pg_try_advisory_xact_lock(SNAPSHOTS_LOCK, 0))
+        )
+        return result.scalar()
+
+    async def refresh_snapshot(
+        self, period: LeaderboardPeriod, period_key: int, computed_at: datetime
+    ) -> None:
+        """
+        Recompute one period's snapshot from the daily totals, without
+        committing.
+
+        Rows are upserted and the ones left with an older computed_at deleted.
+        Users without runs in the period, or without an age or recognized
+        gender, are left out.
+        """
+        if period == LeaderboardPeriod.ALL_TIME:
+            # Running totals of every user's last active day, no need to sum
+            # their whole history
+            totals = (
+                select(
+                    RunDailyTotal.user_uuid,
+                    RunDailyTotal.cum_runs.label("runs"),
+                    RunDailyTotal.cum_distance.label("distance"),
+                    RunDailyTotal.cum_duration.label("duration"),
+                )
+                .distinct(RunDailyTotal.user_uuid)
+                .order_by(RunDailyTotal.user_uuid, RunDailyTotal.local_date.desc())
+            )
+        else:
+            key = (
+                RunDailyTotal.week_key
+                if period == LeaderboardPeriod.WEEK
+                else RunDailyTotal.month_key
+            )
+            totals = (
+                select(
+                    RunDailyTotal.user_uuid,
+                    func.sum(RunDailyTotal.runs).label("runs"),
+                    func.sum(RunDailyTotal.distance).label("distance"),
+                    func.sum(RunDailyTotal.duration).label("duration"),
+                )
+                .where(key == period_key)
+                .group_by(RunDailyTotal.user_uuid)
+            )
+        totals = totals.subquery()
+
+        members = (
+            select(
+                totals,
+                age_group_expression(User.age).label("age_group"),
+                gender_expression(User.gender).label("gender"),
+                distance_band_expression(totals.c.distance, totals.c.runs).label(
+                    "distance_band"
+                ),
+            )
+            .join(User, User.uuid == totals.c.user_uuid)
+            .where(totals.c.runs > 0)
+            .subquery()
+        )
+
+        cohort = [members.c.age_group, members.c.gender]
+        band_cohort = [*cohort, members.c.distance_band]
+
+        def rank(partition_by: list, column: Any) -> Any:
+            return func.rank().over(partition_by=partition_by, order_by=desc(column))
+
+        snapshot = select(
+            literal(period.value),
+            literal(period_key),
+            members.c.user_uuid,
+            members.c.age_group,
+            members.c.gender,
+            members.c.distance_band,
+            members.c.runs,
+            members.c.distance,
+            members.c.duration,
+            rank(cohort, members.c.runs),
+            rank(cohort, members.c.distance),
+            rank(cohort, members.c.duration),
+            rank(band_cohort, members.c.runs),
+            rank(band_cohort, members.c.distance),
+            rank(band_cohort, members.c.duration),
+            literal(computed_at),
+        ).where(members.c.age_group.is_not(None), members.c.gender.is_not(None))
+
+        stmt = pg_insert(LeaderboardSnapshot).from_select(SNAPSHOT_COLUMNS, snapshot)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["period", "period_key", "user_uuid"],
+            set_={name: stmt.excluded[name] for name in SNAPSHOT_COLUMNS[3:]},
+        )
+        await self.session.execute(stmt)
+        # Users who dropped out of the period or of every cohort
+        await self.session.execute(
+            delete(LeaderboardSnapshot).where(
+                LeaderboardSnapshot.period == period.value,
+                LeaderboardSnapshot.period_key == period_key,
+                LeaderboardSnapshot.computed_at < computed_at,
+            )
+        )
+
+    async def delete_snapshots_except(
+        self, periods: List[Tuple[LeaderboardPeriod, int]]
+    ) -> None:
+        """
+        Drop the snapshots of every other period, without committing.
+        """
+        keep = [(period.value, period_key) for period, period_key in periods]
+        await self.session.execute(
+            delete(LeaderboardSnapshot).where(
+                tuple_(
+                    LeaderboardSnapshot.period, LeaderboardSnapshot.period_key
+                ).not_in(keep)
+            )
+        )
+
+    def _cohort_query(
+        self,
+        metric: LeaderboardMetric,
+        period: LeaderboardPeriod,
+        period_key: int,
+        age_group: AgeGroup,
+        gender: CohortGender,
+        distance_band: Optional[DistanceBand],
+    ) -> Select:
+        # Ranks are precomputed, positions only order the cohort's rows by them
+        rank = self._get_rank_column(metric, distance_band)
+        query = select(
+            LeaderboardSnapshot.user_uuid,
+            getattr(LeaderboardSnapshot, metric.value).label("value"),
+            rank.label("rank"),
+            func.row_number()
+            .over(order_by=(rank, LeaderboardSnapshot.user_uuid))
+            .label("position"),
+        ).where(
+            LeaderboardSnapshot.period == period.value,
+            LeaderboardSnapshot.period_key == period_key,
+            LeaderboardSnapshot.age_group == age_group.value,
+            LeaderboardSnapshot.gender == gender.value,
+        )
+        if distance_band is not None:
+            query = query.where(
+                LeaderboardSnapshot.distance_band == distance_band.value
+            )
+        return query
+
+    def _get_rank_column(
+        self, metric: LeaderboardMetric, distance_band: Optional[DistanceBand]
+    ) -> Any:
+        prefix = "band_" if distance_band is not None else ""
+        return getattr(LeaderboardSnapshot, f"{prefix}{metric.value}_rank")
+
+    def _get_metric_column(self, metric: LeaderboardMetric) -> Any:
         if metric == LeaderboardMetric.DISTANCE:
-            return func.coalesce(func.sum(Run.distance), 0)
+            return RunDailyTotal.cum_distance
         elif metric == LeaderboardMetric.DURATION:
-            return func.coalesce(func.sum(Run.duration), 0)
+            return RunDailyTotal.cum_duration
         elif metric == LeaderboardMetric.RUNS:
-            return func.count(Run.uuid)
+            return RunDailyTotal.cum_runs
         else:
             raise ValueError(f"Unknown metric: {metric}")
+
+
+tag_repository_methods(LeaderboardRepository)
@@ -0,0 +1,30 @@
+from uuid import UUID
+
+from sqlalchemy import select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.enums.run import PersonalBestDistance
+from app.models.personal_best import PersonalBest
+from app.repositories.base import BaseRepository
+
+
+class PersonalBestRepository(BaseRepository[PersonalBest]):
+    def __init__(self, session: AsyncSession) -> None:
+        super().__init__(session, PersonalBest)
+
+    async def get_user_bests(self, user_uuid: UUID) -> list[PersonalBest]:
+        """
+        The user's fastest effort per distance, in PersonalBestDistance order.
+        """
+        # One index probe per distance instead of reading every effort
+        fastest = [
+            select(self.model)
+            .where(self.model.user_uuid == user_uuid, self.model.distance == distance)
+            .order_by(self.model.duration, self.model.started_at)
+            .limit(1)
+            for distance in PersonalBestDistance
+        ]
+        query = select(self.model).from_statement(union_all(*fastest))
+        result = await self.session.execute(query)
+        bests = {best.distance: best for best in result.scalars().all()}
+        return [bests[d] for d in PersonalBestDistance if d in bests]
@@ -1,3 +1,7 @@
+from uuid import UUID
+
+from sqlalchemy import select
+
 from app.models.user import User
 from app.repositories.base import BaseRepository
 
@@ -12,3 +16,11 @@ class UserRepository(BaseRepository[User]):
     async def email_exists(self, email: str) -> bool:
         user = await self.get_one(email=email)
         return user is not None
+
+    async def list_uuids_after(self, after: UUID | None, limit: int) -> list[UUID]:
+        """Keyset-paginated user ids, for batch jobs walking every user."""
+        stmt = select(self.model.uuid).order_by(self.model.uuid).limit(limit)
+        if after is not None:
+            stmt = stmt.where(self.model.uuid > after)
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
@@ -1,11 +1,14 @@
 from fastapi import APIRouter
 
 from app.routers.achievements import router as achievements
+from app.routers.analytics import router as analytics
 from app.routers.auth import router as auth
 from app.routers.challenge import router as challenge
+from app.routers.feed import router as feed
 from app.routers.friendships import router as friendships
 from app.routers.goals import router as goals
 from app.routers.health_check import router as healthcheck
+from app.routers.heatmap import router as heatmap
 from app.routers.leaderboard import router as leaderboard
 from app.routers.runs import router as runs
 from app.routers.statistics import router as statistics
@@ -22,6 +25,9 @@ router.include_router(goals, prefix="/goals", tags=["Goals"])
 router.include_router(runs, prefix="/runs", tags=["Runs"])
 router.include_router(achievements, prefix="/achievements", tags=["Achievements"])
 router.include_router(statistics, prefix="/statistics", tags=["Statistics"])
+router.include_router(analytics, prefix="/analytics", tags=["Analytics"])
 router.include_router(leaderboard, prefix="/leaderboard", tags=["Leaderboard"])
 router.include_router(friendships, prefix="/friendships", tags=["Friendships"])
 router.include_router(challenge, prefix="/challenges", tags=["Challenges"])
+router.include_router(feed, prefix="/feed", tags=["Feed"])
+router.include_router(heatmap, prefix="/heatmap", tags=["Heatmap"])
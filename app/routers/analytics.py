@@ -0,0 +1,48 @@
+from datetime import date
+from typing import Annotated
+
+from fastapi import APIRouter, Query
+
+from app.dependencies import AnalyticsServiceDep, CurrentUserDep, UnitOfWorkDep
+from app.enums.analytics import AnalyticsGranularity
+from app.schemas.analytics import AnalyticsSeriesResponse, YearInReviewResponse
+from app.utils.timezones import local_today
+
+router = APIRouter()
+
+
+@router.get("/series", response_model=AnalyticsSeriesResponse)
+async def get_series(
+    current_user: CurrentUserDep,
+    analytics_service: AnalyticsServiceDep,
+    uow: UnitOfWorkDep,
+    granularity: AnalyticsGranularity = Query(AnalyticsGranularity.MONTH),
+    start_date: Annotated[
+        date | None, Query(description="Local date, a year before end_date if unset")
+    ] = None,
+    end_date: Annotated[
+        date | None, Query(description="Local date, inclusive, today if unset")
+    ] = None,
+) -> AnalyticsSeriesResponse:
+    return await analytics_service.get_series(
+        uow,
+        current_user.uuid,
+        granularity,
+        start_date=start_date,
+        end_date=end_date,
+        timezone=current_user.timezone,
+    )
+
+
+@router.get("/year-in-review", response_model=YearInReviewResponse)
+async def get_year_in_review(
+    current_user: CurrentUserDep,
+    analytics_service: AnalyticsServiceDep,
+    uow: UnitOfWorkDep,
+    year: Annotated[
+        int | None, Query(ge=2, le=9999, description="Current year if unset")
+    ] = None,
+) -> YearInReviewResponse:
+    return await analytics_service.get_year_in_review(
+        uow, current_user.uuid, year or local_today(current_user.timezone).year
+    )
@@ -3,11 +3,16 @@ from uuid import UUID
 
 from fastapi import APIRouter, Depends, Query, status
 
+from app.core.responses import ModelResponse
 from app.dependencies import CurrentUserDep, UnitOfWorkDep
+from app.enums.challenge import ChallengeView
 from app.schemas.challenge import (
     ChallengeAttemptCreate,
     ChallengeAttemptResponse,
+    ChallengeAttemptSummary,
+    ChallengeCardListResponse,
     ChallengeCreate,
+    ChallengeLeaderboardResponse,
     ChallengeListResponse,
     ChallengeResponse,
 )
@@ -29,13 +34,16 @@ async def create_challenge(
     uow: UnitOfWorkDep,
     service: ChallengeServiceDep,
     current_user: CurrentUserDep,
-) -> ChallengeResponse:
-    return await service.create_challenge(uow, current_user, data)
+) -> ModelResponse:
+    return ModelResponse(
+        await service.create_challenge(uow, current_user, data),
+        status_code=status.HTTP_201_CREATED,
+    )
 
 
 @router.get(
     "/",
-    response_model=ChallengeListResponse,
+    response_model=ChallengeListResponse | ChallengeCardListResponse,
     summary="List available challenges (from friends)",
 )
 async def list_challenges(
@@ -44,8 +52,16 @@ async def list_challenges(
     current_user: CurrentUserDep,
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
-) -> ChallengeListResponse:
-    return await service.list_available_challenges(uow, current_user.uuid, page, limit)
+    view: ChallengeView = Query(
+        ChallengeView.FULL,
+        description="CARD returns course summaries without the source run",
+    ),
+) -> ModelResponse:
+    return ModelResponse(
+        await service.list_available_challenges(
+            uow, current_user.uuid, page, limit, view
+        )
+    )
 
 
 @router.get(
@@ -58,8 +74,8 @@ async def get_challenge(
     uow: UnitOfWorkDep,
     service: ChallengeServiceDep,
     current_user: CurrentUserDep,
-) -> ChallengeResponse:
-    return await service.get_challenge(uow, challenge_id)
+) -> ModelResponse:
+    return ModelResponse(await service.get_challenge(uow, challenge_id))
 
 
 @router.get(
@@ -72,8 +88,8 @@ async def get_challenge_by_run(
     uow: UnitOfWorkDep,
     service: ChallengeServiceDep,
     current_user: CurrentUserDep,
-) -> ChallengeResponse | None:
-    return await service.get_challenge_by_run(uow, run_id)
+) -> ModelResponse:
+    return ModelResponse(await service.get_challenge_by_run(uow, run_id))
 
 
 @router.post(
@@ -87,19 +103,44 @@ async def attempt_challenge(
     uow: UnitOfWorkDep,
     service: ChallengeServiceDep,
     current_user: CurrentUserDep,
-) -> ChallengeAttemptResponse:
-    return await service.attempt_challenge(uow, current_user.uuid, challenge_id, data)
+) -> ModelResponse:
+    return ModelResponse(
+        await service.attempt_challenge(uow, current_user.uuid, challenge_id, data)
+    )
 
 
 @router.get(
     "/{challenge_id}/attempts",
-    response_model=list[ChallengeAttemptResponse],
+    response_model=list[ChallengeAttemptResponse] | list[ChallengeAttemptSummary],
     summary="Get all attempts for a challenge",
+    description="Every attempt, successful or not. Ranked best times are served "
+    "by /{challenge_id}/leaderboard.",
 )
 async def get_challenge_attempts(
     challenge_id: UUID,
     uow: UnitOfWorkDep,
     service: ChallengeServiceDep,
     current_user: CurrentUserDep,
-) -> list[ChallengeAttemptResponse]:
-    return await service.get_challenge_attempts(uow, challenge_id)
+    view: ChallengeView = Query(
+        ChallengeView.FULL, description="CARD omits the attempt runs"
+    ),
+) -> ModelResponse:
+    return ModelResponse(await service.get_challenge_attempts(uow, challenge_id, view))
+
+
+@router.get(
+    "/{challenge_id}/leaderboard",
+    response_model=ChallengeLeaderboardResponse,
+    summary="Get best times for a challenge",
+)
+async def get_challenge_leaderboard(
+    challenge_id: UUID,
+    uow: UnitOfWorkDep,
+    service: ChallengeServiceDep,
+    current_user: CurrentUserDep,
+    page: int = Query(1, ge=1),
+    limit: int = Query(10, ge=1, le=100),
+) -> ChallengeLeaderboardResponse:
+    return await service.get_challenge_leaderboard(
+        uow, challenge_id, current_user.uuid, page, limit
+    )
@@ -0,0 +1,23 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Query
+
+from app.dependencies import CurrentUserDep, FeedServiceDep, UnitOfWorkDep
+from app.schemas.feed import FeedResponse
+
+router = APIRouter()
+
+
+@router.get("/", response_model=FeedResponse)
+async def get_feed(
+    current_user: CurrentUserDep,
+    feed_service: FeedServiceDep,
+    uow: UnitOfWorkDep,
+    cursor: Annotated[
+        str | None, Query(description="Cursor returned by the previous page")
+    ] = None,
+    limit: Annotated[int, Query(ge=1, le=100, description="Items per page")] = 20,
+) -> FeedResponse:
+    return await feed_service.get_feed(
+        uow, current_user.uuid, cursor=cursor, limit=limit
+    )
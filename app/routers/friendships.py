@@ -1,15 +1,17 @@
 from typing import Annotated
 from uuid import UUID
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, status
 
 from app.dependencies import CurrentUserDep, UnitOfWorkDep
+from app.enums.friendship import FriendSortBy
 from app.schemas.friendship import (
     FriendListResponse,
     FriendRequestCreate,
     FriendRequestListResponse,
     FriendRequestRespond,
     FriendshipResponse,
+    FriendSuggestionListResponse,
 )
 from app.services.friendship import FriendshipService, get_friendship_service
 
@@ -37,6 +39,16 @@ async def list_friend_requests(
     return await service.list_requests(uow, current_user.uuid)
 
 
+@router.get("/suggestions", response_model=FriendSuggestionListResponse)
+async def list_friend_suggestions(
+    current_user: CurrentUserDep,
+    service: FriendshipServiceDep,
+    uow: UnitOfWorkDep,
+    limit: Annotated[int, Query(ge=1, le=50, description="Max suggestions")] = 20,
+) -> FriendSuggestionListResponse:
+    return await service.list_suggestions(uow, current_user.uuid, limit=limit)
+
+
 @router.post("/{request_id}/respond")
 async def respond_to_friend_request(
     request_id: UUID,
@@ -53,5 +65,31 @@ async def list_friends(
     current_user: CurrentUserDep,
     service: FriendshipServiceDep,
     uow: UnitOfWorkDep,
+    page: Annotated[int, Query(ge=1, description="Page number")] = 1,
+    limit: Annotated[int, Query(ge=1, le=100, description="Items per page")] = 10,
+    sort_by: Annotated[
+        FriendSortBy, Query(description="Sort by field")
+    ] = FriendSortBy.USERNAME,
+    include_activity: Annotated[
+        bool, Query(description="Include last run and weekly distance")
+    ] = False,
 ) -> FriendListResponse:
-    return await service.list_friends(uow, current_user.uuid)
+    return await service.list_friends(
+        uow,
+        current_user.uuid,
+        page=page,
+        limit=limit,
+        sort_by=sort_by,
+        include_activity=include_activity,
+        timezone=current_user.timezone,
+    )
+
+
+@router.delete("/{friend_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def remove_friend(
+    friend_id: UUID,
+    current_user: CurrentUserDep,
+    service: FriendshipServiceDep,
+    uow: UnitOfWorkDep,
+) -> None:
+    await service.remove_friend(uow, current_user.uuid, friend_id)
@@ -0,0 +1,64 @@
+import hashlib
+
+from fastapi import APIRouter, Query, Request, Response
+
+from app.core.config import settings
+from app.dependencies import CurrentUserDep, HeatmapServiceDep, UnitOfWorkDep
+from app.enums.heatmap import HeatmapScope
+from app.schemas.heatmap import HeatmapTileResponse
+from app.utils.heatmap import TILE_SIZE, encode_tile, render_png
+
+router = APIRouter()
+
+
+@router.get(
+    "/{zoom}/{x}/{y}.png",
+    response_class=Response,
+    responses={200: {"content": {"image/png": {}}}},
+)
+async def get_tile_png(
+    request: Request,
+    current_user: CurrentUserDep,
+    heatmap_service: HeatmapServiceDep,
+    uow: UnitOfWorkDep,
+    zoom: int,
+    x: int,
+    y: int,
+    scope: HeatmapScope = Query(HeatmapScope.ME),
+) -> Response:
+    counts = await heatmap_service.get_tile(uow, current_user.uuid, scope, zoom, x, y)
+
+    # Tiles change only when runs are added or deleted, let clients revalidate
+    etag = '"%s"' % hashlib.blake2b(encode_tile(counts), digest_size=8).hexdigest()
+    headers = {
+        "Cache-Control": (
+            f"private, max-age={settings.app.HEATMAP_TILE_CACHE_TTL_SECONDS}"
+        ),
+        "ETag": etag,
+    }
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(render_png(counts), media_type="image/png", headers=headers)
+
+
+@router.get("/{zoom}/{x}/{y}", response_model=HeatmapTileResponse)
+async def get_tile(
+    current_user: CurrentUserDep,
+    heatmap_service: HeatmapServiceDep,
+    uow: UnitOfWorkDep,
+    zoom: int,
+    x: int,
+    y: int,
+    scope: HeatmapScope = Query(HeatmapScope.ME),
+) -> HeatmapTileResponse:
+    counts = await heatmap_service.get_tile(uow, current_user.uuid, scope, zoom, x, y)
+    indices = sorted(counts)
+    return HeatmapTileResponse(
+        zoom=zoom,
+        x=x,
+        y=y,
+        size=TILE_SIZE,
+        max_count=max(counts.values(), default=0),
+        indices=indices,
+        counts=[counts[i] for i in indices],
+    )
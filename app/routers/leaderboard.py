@@ -1,6 +1,10 @@
+from datetime import date
+from typing import Optional
+
 from fastapi import APIRouter, Query
 
 from app.dependencies import CurrentUserDep, LeaderboardServiceDep, UnitOfWorkDep
+from app.enums.leaderboard import AgeGroup, CohortGender, DistanceBand
 from app.schemas.leaderboard import (
     LeaderboardMetric,
     LeaderboardPeriod,
@@ -9,6 +13,8 @@ from app.schemas.leaderboard import (
 
 router = APIRouter()
 
+MAX_AROUND = 25
+
 
 @router.get("/", response_model=LeaderboardResponse)
 async def get_leaderboard(
@@ -18,7 +24,37 @@ async def get_leaderboard(
     metric: LeaderboardMetric = Query(LeaderboardMetric.DISTANCE),
     period: LeaderboardPeriod = Query(LeaderboardPeriod.WEEK),
     friends_only: bool = Query(False),
+    start_date: Optional[date] = Query(
+        None, description="First day of a custom period, in local dates"
+    ),
+    end_date: Optional[date] = Query(
+        None, description="Last day of a custom period, inclusive"
+    ),
+    age_group: Optional[AgeGroup] = Query(
+        None, description="Cohort board, together with gender"
+    ),
+    gender: Optional[CohortGender] = Query(None),
+    distance_band: Optional[DistanceBand] = Query(
+        None, description="Narrows a cohort board by average run distance"
+    ),
+    around: int = Query(
+        0,
+        ge=0,
+        le=MAX_AROUND,
+        description="Also return the entries this many positions around yours",
+    ),
 ) -> LeaderboardResponse:
     return await leaderboard_service.get_leaderboard(
-        uow, metric, period, current_user.uuid, friends_only=friends_only
+        uow,
+        metric,
+        period,
+        current_user.uuid,
+        friends_only=friends_only,
+        timezone=current_user.timezone,
+        start_date=start_date,
+        end_date=end_date,
+        age_group=age_group,
+        gender=gender,
+        distance_band=distance_band,
+        around=around,
     )
@@ -0,0 +1,33 @@
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header
+from fastapi.responses import PlainTextResponse
+
+from app.core.config import settings
+from app.core.exc import ForbiddenException, UnauthorizedException
+from app.core.metrics import registry
+
+router = APIRouter()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def verify_metrics_token(authorization: Optional[str] = Header(None)) -> None:
+    token = settings.app.METRICS_TOKEN
+    if not token:
+        raise ForbiddenException("Metrics are disabled")
+    scheme, _, credentials = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(
+        credentials.encode(), token.encode()
+    ):
+        raise UnauthorizedException("Invalid metrics token")
+
+
+@router.get(
+    "",
+    description="Metrics in the Prometheus text format.",
+    dependencies=[Depends(verify_metrics_token)],
+)
+async def get_metrics() -> PlainTextResponse:
+    return PlainTextResponse(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
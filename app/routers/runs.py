@@ -1,11 +1,15 @@
 from typing import Annotated
 from uuid import UUID
 
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, BackgroundTasks, Query
 
+from app.core.responses import ModelResponse
 from app.dependencies import CurrentUserDep, RunServiceDep, UnitOfWorkDep
 from app.enums.run import RunSortBy, SortOrder
 from app.enums.statistics import StatisticsPeriod
+from app.jobs.heatmap import add_run_to_heatmap, remove_route_from_heatmap
+from app.jobs.personal_bests import record_personal_bests
+from app.jobs.segment_matching import match_run_segments
 from app.schemas.runs import (
     RunCreateRequest,
     RunListResponse,
@@ -22,8 +26,16 @@ async def create_run(
     data: RunCreateRequest,
     run_service: RunServiceDep,
     uow: UnitOfWorkDep,
-) -> RunResponse:
-    return await run_service.create_run(uow, current_user.uuid, data)
+    background_tasks: BackgroundTasks,
+) -> ModelResponse:
+    run = await run_service.create_run(
+        uow, current_user.uuid, data, current_user.timezone
+    )
+    # Challenge courses covered by the run are timed after the response is sent
+    background_tasks.add_task(match_run_segments, run.uuid)
+    background_tasks.add_task(record_personal_bests, run.uuid)
+    background_tasks.add_task(add_run_to_heatmap, run.uuid)
+    return ModelResponse(run, status_code=201)
 
 
 @router.get("/", response_model=RunListResponse)
@@ -44,7 +56,7 @@ async def list_runs(
     ] = None,
     sort_by: Annotated[RunSortBy, Query(description="Sort by field")] = RunSortBy.DATE,
     order: Annotated[SortOrder, Query(description="Sort order")] = SortOrder.DESC,
-) -> RunListResponse:
+) -> ModelResponse:
     runs, total = await run_service.list_runs(
         uow,
         current_user.uuid,
@@ -55,11 +67,14 @@ async def list_runs(
         max_distance=max_distance,
         sort_by=sort_by,
         order=order,
+        timezone=current_user.timezone,
     )
     total_pages = (total + limit - 1) // limit
 
-    return RunListResponse(
-        runs=runs, total=total, page=page, limit=limit, total_pages=total_pages
+    return ModelResponse(
+        RunListResponse(
+            runs=runs, total=total, page=page, limit=limit, total_pages=total_pages
+        )
     )
 
 
@@ -69,8 +84,8 @@ async def get_run(
     run_uuid: UUID,
     run_service: RunServiceDep,
     uow: UnitOfWorkDep,
-) -> RunResponse:
-    return await run_service.get_run(uow, current_user.uuid, run_uuid)
+) -> ModelResponse:
+    return ModelResponse(await run_service.get_run(uow, current_user.uuid, run_uuid))
 
 
 @router.patch("/{run_uuid}", response_model=RunResponse)
@@ -80,8 +95,10 @@ async def update_run(
     data: RunUpdateRequest,
     run_service: RunServiceDep,
     uow: UnitOfWorkDep,
-) -> RunResponse:
-    return await run_service.update_run(uow, current_user.uuid, run_uuid, data)
+) -> ModelResponse:
+    return ModelResponse(
+        await run_service.update_run(uow, current_user.uuid, run_uuid, data)
+    )
 
 
 @router.delete("/{run_uuid}", response_model=RunResponse)
@@ -90,5 +107,10 @@ async def delete_run(
     run_uuid: UUID,
     run_service: RunServiceDep,
     uow: UnitOfWorkDep,
-) -> RunResponse:
-    return await run_service.delete_run(uow, current_user.uuid, run_uuid)
+    background_tasks: BackgroundTasks,
+) -> ModelResponse:
+    run = await run_service.delete_run(uow, current_user.uuid, run_uuid)
+    background_tasks.add_task(
+        remove_route_from_heatmap, run.uuid, run.user_uuid, run.route
+    )
+    return ModelResponse(run)
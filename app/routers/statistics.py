@@ -2,7 +2,11 @@ from fastapi import APIRouter
 
 from app.dependencies import CurrentUserDep, StatisticsServiceDep, UnitOfWorkDep
 from app.enums.statistics import StatisticsPeriod
-from app.schemas.statistics import UserStatisticsResponse, VisualizationResponse
+from app.schemas.statistics import (
+    PersonalBestsResponse,
+    UserStatisticsResponse,
+    VisualizationResponse,
+)
 
 router = APIRouter()
 
@@ -13,7 +17,9 @@ async def get_user_statistics(
     statistics_service: StatisticsServiceDep,
     uow: UnitOfWorkDep,
 ) -> UserStatisticsResponse:
-    return await statistics_service.get_user_statistics(uow, current_user.uuid)
+    return await statistics_service.get_user_statistics(
+        uow, current_user.uuid, current_user.timezone
+    )
 
 
 @router.get("/visualization", response_model=VisualizationResponse)
@@ -24,6 +30,15 @@ async def get_visualization_data(
     period: StatisticsPeriod,
 ) -> VisualizationResponse:
     data = await statistics_service.get_visualization_data(
-        uow, current_user.uuid, period
+        uow, current_user.uuid, period, current_user.timezone
     )
     return VisualizationResponse(data=data)
+
+
+@router.get("/personal-bests", response_model=PersonalBestsResponse)
+async def get_personal_bests(
+    current_user: CurrentUserDep,
+    statistics_service: StatisticsServiceDep,
+    uow: UnitOfWorkDep,
+) -> PersonalBestsResponse:
+    return await statistics_service.get_personal_bests(uow, current_user.uuid)
@@ -0,0 +1,73 @@
+from datetime import date
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from app.enums.analytics import AnalyticsGranularity
+
+
+class AnalyticsPoint(BaseModel):
+    label: str  # 2026-W43, 2026-10 or 2026
+    start_date: date
+    runs: int
+    distance: float
+    duration: float
+
+
+class AnalyticsSeriesResponse(BaseModel):
+    granularity: AnalyticsGranularity
+    points: List[AnalyticsPoint]
+
+
+class AnalyticsTotals(BaseModel):
+    runs: int
+    distance: float  # km
+    duration: float  # minutes
+    active_days: int
+    average_pace: Optional[float]  # min/km
+
+
+class MonthComparison(BaseModel):
+    month: int
+    distance: float
+    previous_distance: float
+    runs: int
+    previous_runs: int
+
+
+class HeatmapCell(BaseModel):
+    weekday: int  # ISO weekday, 1 is Monday
+    hour: int  # local start hour
+    runs: int
+    distance: float
+
+
+class WeekdayTotal(BaseModel):
+    weekday: int
+    runs: int
+    distance: float
+
+
+class HourTotal(BaseModel):
+    hour: int
+    runs: int
+    distance: float
+
+
+class PaceBucket(BaseModel):
+    pace_from: float  # min/km, inclusive
+    pace_to: float  # min/km, exclusive
+    runs: int
+    distance: float
+
+
+class YearInReviewResponse(BaseModel):
+    year: int
+    totals: AnalyticsTotals
+    previous_totals: AnalyticsTotals
+    distance_change: Optional[float]  # percent over the previous year
+    months: List[MonthComparison]
+    heatmap: List[HeatmapCell]
+    weekdays: List[WeekdayTotal]
+    hours: List[HourTotal]
+    pace_histogram: List[PaceBucket]
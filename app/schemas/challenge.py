@@ -17,19 +17,26 @@ class ChallengeCreate(ChallengeBase):
     source_run_id: UUID
 
 
-class ChallengeResponse(ChallengeBase):
+class ChallengeCardResponse(ChallengeBase):
     uuid: UUID
     creator_id: UUID
-    source_run_id: UUID
+    creator_name: Optional[str] = None
     is_active: bool
+    course_distance: Optional[float] = None  # km
+    course_duration: Optional[float] = None  # minutes
+    course_polyline: Optional[str] = None
     created_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class ChallengeResponse(ChallengeCardResponse):
+    source_run_id: UUID
     updated_at: datetime
 
     creator: Optional[UserResponse] = None
     source_run: Optional[RunResponse] = None
 
-    model_config = {"from_attributes": True}
-
 
 class ChallengeListResponse(BaseModel):
     items: List[ChallengeResponse]
@@ -39,19 +46,50 @@ class ChallengeListResponse(BaseModel):
     total_pages: int
 
 
+class ChallengeCardListResponse(BaseModel):
+    items: List[ChallengeCardResponse]
+    total: int
+    page: int
+    limit: int
+    total_pages: int
+
+
 class ChallengeAttemptCreate(BaseModel):
     run_id: UUID
 
 
-class ChallengeAttemptResponse(BaseModel):
+class ChallengeAttemptSummary(BaseModel):
     uuid: UUID
     challenge_id: UUID
     user_id: UUID
     run_id: UUID
     success: bool
+    duration: Optional[float] = None
     created_at: datetime
 
     user: Optional[UserResponse] = None
-    run: Optional[RunResponse] = None
 
     model_config = {"from_attributes": True}
+
+
+class ChallengeAttemptResponse(ChallengeAttemptSummary):
+    run: Optional[RunResponse] = None
+
+
+class ChallengeLeaderboardEntry(BaseModel):
+    rank: int
+    user_uuid: UUID
+    username: Optional[str]
+    best_duration: float  # minutes
+    run_id: UUID
+    achieved_at: datetime
+    is_current_user: bool = False
+
+
+class ChallengeLeaderboardResponse(BaseModel):
+    entries: List[ChallengeLeaderboardEntry]
+    current_user_entry: Optional[ChallengeLeaderboardEntry] = None
+    total: int
+    page: int
+    limit: int
+    total_pages: int
@@ -0,0 +1,26 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from pydantic import BaseModel
+
+from app.enums.feed import ActivityType
+from app.schemas.users import UserResponse
+
+
+class FeedItemResponse(BaseModel):
+    uuid: UUID
+    actor_id: UUID
+    activity_type: ActivityType
+    object_id: UUID
+    payload: Optional[Dict[str, Any]]
+    created_at: datetime
+
+    actor: Optional[UserResponse] = None
+
+    model_config = {"from_attributes": True}
+
+
+class FeedResponse(BaseModel):
+    items: list[FeedItemResponse]
+    next_cursor: Optional[str] = None
@@ -36,9 +36,34 @@ class FriendshipResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class FriendActivity(BaseModel):
+    last_run_at: Optional[datetime]
+    weekly_distance: float  # km since the start of the current week
+
+
+class FriendResponse(UserResponse):
+    activity: Optional[FriendActivity] = None
+
+
 class FriendListResponse(BaseModel):
-    friends: list[UserResponse]
+    friends: list[FriendResponse]
     total: int
+    page: int
+    limit: int
+    total_pages: int
+
+
+class FriendSuggestionResponse(BaseModel):
+    candidate: UserResponse
+    mutual_friends: int
+    co_challenges: int
+    score: float
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class FriendSuggestionListResponse(BaseModel):
+    suggestions: list[FriendSuggestionResponse]
 
 
 class FriendRequestListResponse(BaseModel):
@@ -0,0 +1,18 @@
+from typing import List
+
+from pydantic import BaseModel
+
+
+class HeatmapTileResponse(BaseModel):
+    """
+    Sparse intensity array of a 256x256 tile: pixel y * size + x was passed
+    by counts[i] runs for every indices[i]; other pixels by none.
+    """
+
+    zoom: int
+    x: int
+    y: int
+    size: int
+    max_count: int
+    indices: List[int]
+    counts: List[int]
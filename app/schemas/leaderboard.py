@@ -1,3 +1,4 @@
+from datetime import date
 from enum import Enum
 from typing import List
 from uuid import UUID
@@ -15,6 +16,7 @@ class LeaderboardPeriod(str, Enum):
     WEEK = "week"
     MONTH = "month"
     ALL_TIME = "all_time"
+    CUSTOM = "custom"
 
 
 class LeaderboardEntry(BaseModel):
@@ -28,3 +30,7 @@ class LeaderboardEntry(BaseModel):
 class LeaderboardResponse(BaseModel):
     entries: List[LeaderboardEntry]
     current_user_entry: LeaderboardEntry | None = None
+    # Entries within `around` positions of the current user, them included
+    neighbors: List[LeaderboardEntry] = []
+    start_date: date | None = None
+    end_date: date | None = None
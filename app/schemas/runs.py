@@ -1,8 +1,19 @@
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Annotated, Any, Dict, List, Optional, Union
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+from typing_extensions import NotRequired, Required, TypedDict
+
+from app.utils.polyline import decode_polyline
+
+# 3000-01-01T00:00:00Z, rejects millisecond timestamps in CompactRoute
+MAX_TIMESTAMP = 32503680000
+
+# Shape of the ISO 8601 timestamps RoutePoint accepts, checked without parsing
+ISO_8601_PATTERN = (
+    r"^\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(:\d{2}(\.\d{1,6})?)?(Z|[+-]\d{2}:?\d{2})?$"
+)
 
 
 class RunResponse(BaseModel):
@@ -21,6 +32,96 @@ class RunResponse(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class RoutePoint(TypedDict):
+    """
+    One point of a route, validated as a plain dictionary and stored as sent:
+    no model instance per point, and timestamps keep their POSIX seconds or
+    ISO 8601 form, both read by app.utils.route_index.parse_timestamp.
+    """
+
+    __pydantic_config__ = ConfigDict(extra="forbid", allow_inf_nan=False)
+
+    latitude: Required[Annotated[float, Field(ge=-90, le=90)]]
+    longitude: Required[Annotated[float, Field(ge=-180, le=180)]]
+    accuracy: NotRequired[Optional[Annotated[float, Field(ge=0)]]]
+    altitude: NotRequired[Optional[float]]
+    speed: NotRequired[Optional[Annotated[float, Field(ge=0)]]]
+    timestamp: NotRequired[
+        Optional[Union[float, Annotated[str, Field(pattern=ISO_8601_PATTERN)]]]
+    ]
+
+
+class CompactRoute(BaseModel):
+    """
+    Route as parallel arrays, or coordinates as an encoded polyline.
+
+    Optional arrays must match the number of points. Timestamps are POSIX
+    seconds, stored as they are.
+    """
+
+    polyline: Optional[str] = None
+    latitude: Optional[List[float]] = None
+    longitude: Optional[List[float]] = None
+    accuracy: Optional[List[float]] = None
+    altitude: Optional[List[float]] = None
+    speed: Optional[List[float]] = None
+    timestamp: Optional[List[float]] = None
+
+    model_config = {"extra": "forbid", "allow_inf_nan": False}
+
+    @model_validator(mode="after")
+    def validate_arrays(self) -> "CompactRoute":
+        if self.polyline is not None:
+            if self.latitude is not None or self.longitude is not None:
+                raise ValueError("Send either polyline or latitude/longitude")
+            try:
+                points = decode_polyline(self.polyline)
+            except ValueError as e:
+                raise ValueError(f"Invalid polyline: {e}")
+            self.latitude = [p[0] for p in points]
+            self.longitude = [p[1] for p in points]
+            self.polyline = None
+
+        if self.latitude is None or self.longitude is None:
+            raise ValueError("latitude and longitude are required")
+
+        size = len(self.latitude)
+        for field in ("longitude", "accuracy", "altitude", "speed", "timestamp"):
+            values = getattr(self, field)
+            if values is not None and len(values) != size:
+                raise ValueError(f"{field} has {len(values)} values, expected {size}")
+
+        # Range checks over whole arrays instead of per point
+        if size and not (
+            -90 <= min(self.latitude) <= max(self.latitude) <= 90
+            and -180 <= min(self.longitude) <= max(self.longitude) <= 180
+        ):
+            raise ValueError("Coordinates out of range")
+        for field in ("accuracy", "speed"):
+            values = getattr(self, field)
+            if values and min(values) < 0:
+                raise ValueError(f"{field} must not be negative")
+        if self.timestamp and not (
+            0 <= min(self.timestamp) <= max(self.timestamp) < MAX_TIMESTAMP
+        ):
+            raise ValueError("timestamp must be POSIX seconds")
+        return self
+
+    def to_route(self) -> List[Dict[str, Any]]:
+        # Dict literals, then one pass per optional column, are well ahead of
+        # building every point from zipped keys
+        route = [
+            {"latitude": lat, "longitude": lng}
+            for lat, lng in zip(self.latitude, self.longitude)
+        ]
+        for field in ("accuracy", "altitude", "speed", "timestamp"):
+            values = getattr(self, field)
+            if values is not None:
+                for point, value in zip(route, values):
+                    point[field] = value
+        return route
+
+
 class RunCreateRequest(BaseModel):
     name: Optional[str] = Field(None, max_length=255)
     start_time: datetime
@@ -28,7 +129,24 @@ class RunCreateRequest(BaseModel):
     duration: float = Field(..., gt=0, description="Duration in minutes")
     distance: float = Field(..., ge=0, description="Distance in km")
     calories: Optional[int] = Field(None, ge=0)
-    route: Optional[List[Dict[str, Any]]] = None
+    route: Optional[List[RoutePoint]] = None
+    route_compact: Optional[CompactRoute] = Field(
+        None, description="Faster alternative to route for long recordings"
+    )
+
+    @model_validator(mode="after")
+    def validate_single_route(self) -> "RunCreateRequest":
+        if self.route is not None and self.route_compact is not None:
+            raise ValueError("Send either route or route_compact")
+        return self
+
+    def route_dicts(self) -> Optional[List[Dict[str, Any]]]:
+        """
+        Route points as JSON-ready dictionaries for storage.
+        """
+        if self.route_compact is not None:
+            return self.route_compact.to_route()
+        return self.route
 
 
 class RunUpdateRequest(BaseModel):
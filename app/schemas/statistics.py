@@ -1,7 +1,11 @@
+from datetime import datetime
 from typing import List, Optional
+from uuid import UUID
 
 from pydantic import BaseModel
 
+from app.enums.run import PersonalBestDistance
+
 
 class TotalStats(BaseModel):
     total_distance: float
@@ -35,3 +39,15 @@ class UserStatisticsResponse(BaseModel):
 
 class VisualizationResponse(BaseModel):
     data: List[VisualizationDataPoint]
+
+
+class PersonalBestResponse(BaseModel):
+    distance: PersonalBestDistance
+    duration: float  # minutes
+    pace: float  # min/km
+    run_id: UUID
+    started_at: datetime
+
+
+class PersonalBestsResponse(BaseModel):
+    personal_bests: List[PersonalBestResponse]
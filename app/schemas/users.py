@@ -2,7 +2,9 @@ from datetime import datetime
 from typing import Optional
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
+
+from app.utils.timezones import DEFAULT_TIMEZONE, validate_timezone
 
 
 class UserResponse(BaseModel):
@@ -13,6 +15,7 @@ class UserResponse(BaseModel):
     gender: Optional[str]
     height: Optional[int]
     weight: Optional[int]
+    timezone: str = DEFAULT_TIMEZONE
     created_at: datetime
     updated_at: datetime
 
@@ -25,6 +28,12 @@ class UserUpdateRequest(BaseModel):
     gender: Optional[str] = Field(None, max_length=255)
     height: Optional[int] = Field(None, ge=1, le=300)  # cm
     weight: Optional[int] = Field(None, ge=1, le=500)  # kg
+    timezone: Optional[str] = Field(None, max_length=64, examples=["Europe/Kyiv"])
+
+    @field_validator("timezone")
+    @classmethod
+    def check_timezone(cls, value: Optional[str]) -> Optional[str]:
+        return validate_timezone(value) if value is not None else None
 
 
 class UserListResponse(BaseModel):
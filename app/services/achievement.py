@@ -1,91 +1,124 @@
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from uuid import UUID
 
-from sqlalchemy import func, select
+from sqlalchemy import and_, func, select
 
 from app.core.unit_of_work import ABCUnitOfWork
+from app.enums.feed import ActivityType
 from app.enums.goal import GoalType, TimePeriod
+from app.models.achievement import Achievement
 from app.models.run import Run
 from app.schemas.achievements import AchievementResponse
+from app.services.feed import FeedService, get_feed_service
+from app.utils.timezones import DEFAULT_TIMEZONE, local_today
 
 
 class AchievementService:
+    def __init__(self, feed_service: FeedService):
+        self.feed_service = feed_service
+
     async def check_and_award_achievements(
-        self, uow: ABCUnitOfWork, user_uuid: UUID
+        self, uow: ABCUnitOfWork, user_uuid: UUID, timezone: str = DEFAULT_TIMEZONE
     ) -> None:
         async with uow:
             # 1. Fetch active goals
             goals, total = await uow.goal.get_many(user_uuid=user_uuid, is_active=True)
-
-            for goal in goals:
-                # 2. Determine time period range
-                start_date, end_date, period_identifier = self._get_period_range(
-                    goal.time_period
+            if not goals:
+                return
+
+            # 2. Determine the time period ranges in the user's time zone and
+            # the progress in each of them, all periods in a single aggregate
+            # query over the (user_uuid, local_date) index
+            today = local_today(timezone)
+            periods = {
+                goal.time_period: self._get_period_range(goal.time_period, today)
+                for goal in goals
+            }
+            progress_by_period = await self._calculate_progress(uow, user_uuid, periods)
+
+            # 3. Check which goals are met
+            met_goals = [
+                goal
+                for goal in goals
+                if progress_by_period[goal.time_period][goal.goal_type] >= goal.target
+            ]
+            if not met_goals:
+                return
+
+            # 4. Skip goals already awarded for the current period
+            periods_met = {periods[goal.time_period][2] for goal in met_goals}
+            achievements, _ = await uow.achievement.get_many(
+                limit=len(met_goals),
+                filters=[
+                    Achievement.meta_data["goal_id"].astext.in_(
+                        [str(goal.uuid) for goal in met_goals]
+                    ),
+                    Achievement.meta_data["period"].astext.in_(periods_met),
+                ],
+                user_uuid=user_uuid,
+                achievement_type="GOAL_COMPLETION",
+            )
+            awarded = {
+                (ach.meta_data.get("goal_id"), ach.meta_data.get("period"))
+                for ach in achievements
+                if ach.meta_data
+            }
+
+            for goal in met_goals:
+                period_identifier = periods[goal.time_period][2]
+                if (str(goal.uuid), period_identifier) in awarded:
+                    continue
+
+                progress = progress_by_period[goal.time_period][goal.goal_type]
+                # 5. Award achievement
+                achievement = await uow.achievement.create_one(
+                    {
+                        "user_uuid": user_uuid,
+                        "title": f"{goal.time_period.value.title()} {goal.goal_type.value.title()} Goal Met",
+                        "description": f"You achieved your goal of {goal.target} {self._get_unit(goal.goal_type)}!",
+                        "earned_at": datetime.now(),
+                        "achievement_type": "GOAL_COMPLETION",
+                        "meta_data": {
+                            "goal_id": str(goal.uuid),
+                            "period": period_identifier,
+                            "target": goal.target,
+                            "achieved": progress,
+                            "goal_type": goal.goal_type.value,
+                            "time_period": goal.time_period.value,
+                        },
+                    }
                 )
-
-                # 3. Calculate progress
-                progress = await self._calculate_progress(
-                    uow, user_uuid, goal.goal_type, start_date, end_date
+                await self.feed_service.publish(
+                    uow,
+                    user_uuid,
+                    ActivityType.ACHIEVEMENT,
+                    achievement.uuid,
+                    {
+                        "title": achievement.title,
+                        "description": achievement.description,
+                    },
                 )
 
-                # 4. Check if goal is met
-                if progress >= goal.target:
-                    achievements, _ = await uow.achievement.get_many(
-                        user_uuid=user_uuid, achievement_type="GOAL_COMPLETION"
-                    )
-
-                    already_awarded = False
-                    for ach in achievements:
-                        if (
-                            ach.meta_data.get("goal_id") == str(goal.uuid)
-                            and ach.meta_data.get("period") == period_identifier
-                        ):
-                            already_awarded = True
-                            break
-
-                    if not already_awarded:
-                        # 6. Award achievement
-                        await uow.achievement.create_one(
-                            {
-                                "user_uuid": user_uuid,
-                                "title": f"{goal.time_period.value.title()} {goal.goal_type.value.title()} Goal Met",
-                                "description": f"You achieved your goal of {goal.target} {self._get_unit(goal.goal_type)}!",
-                                "earned_at": datetime.now(),
-                                "achievement_type": "GOAL_COMPLETION",
-                                "meta_data": {
-                                    "goal_id": str(goal.uuid),
-                                    "period": period_identifier,
-                                    "target": goal.target,
-                                    "achieved": progress,
-                                    "goal_type": goal.goal_type.value,
-                                    "time_period": goal.time_period.value,
-                                },
-                            }
-                        )
-
     def _get_period_range(
-        self, time_period: TimePeriod
-    ) -> tuple[datetime, datetime, str]:
-        now = datetime.now()
+        self, time_period: TimePeriod, today: date
+    ) -> tuple[date, date, str]:
+        # Local dates: [start_date, end_date)
         if time_period == TimePeriod.WEEKLY:
             # Monday start
-            start_date = now - timedelta(days=now.weekday())
-            start_date = start_date.replace(hour=0, minute=0, second=0, microsecond=0)
+            start_date = today - timedelta(days=today.weekday())
             end_date = start_date + timedelta(days=7)
             period_identifier = f"{start_date.year}-W{start_date.isocalendar()[1]}"
         elif time_period == TimePeriod.MONTHLY:
-            start_date = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+            start_date = today.replace(day=1)
             # Next month calculation
-            if now.month == 12:
-                end_date = now.replace(year=now.year + 1, month=1, day=1)
+            if today.month == 12:
+                end_date = today.replace(year=today.year + 1, month=1, day=1)
             else:
-                end_date = now.replace(month=now.month + 1, day=1)
+                end_date = today.replace(month=today.month + 1, day=1)
             period_identifier = f"{start_date.year}-M{start_date.month}"
         elif time_period == TimePeriod.YEARLY:
-            start_date = now.replace(
-                month=1, day=1, hour=0, minute=0, second=0, microsecond=0
-            )
-            end_date = now.replace(year=now.year + 1, month=1, day=1)
+            start_date = today.replace(month=1, day=1)
+            end_date = today.replace(year=today.year + 1, month=1, day=1)
             period_identifier = f"{start_date.year}"
         else:
             raise ValueError(f"Unsupported time period: {time_period}")
@@ -96,34 +129,34 @@ class AchievementService:
         self,
         uow: ABCUnitOfWork,
         user_uuid: UUID,
-        goal_type: GoalType,
-        start_date: datetime,
-        end_date: datetime,
-    ) -> float:
-        # We can use SQL aggregation for efficiency
-        if goal_type == GoalType.DISTANCE:
-            stmt = select(func.sum(Run.distance)).where(
-                Run.user_uuid == user_uuid,
-                Run.start_time >= start_date,
-                Run.start_time < end_date,
-            )
-        elif goal_type == GoalType.DURATION:
-            stmt = select(func.sum(Run.duration)).where(
-                Run.user_uuid == user_uuid,
-                Run.start_time >= start_date,
-                Run.start_time < end_date,
-            )
-        elif goal_type == GoalType.NUMBER_OF_RUNS:
-            stmt = select(func.count(Run.uuid)).where(
-                Run.user_uuid == user_uuid,
-                Run.start_time >= start_date,
-                Run.start_time < end_date,
-            )
-        else:
-            return 0.0
-
-        result = await uow.session.execute(stmt)
-        return result.scalar() or 0.0
+        periods: dict[TimePeriod, tuple[date, date, str]],
+    ) -> dict[TimePeriod, dict[GoalType, float]]:
+        # One aggregate per goal type and period, filtered in a single scan
+        columns = []
+        for start_date, end_date, _ in periods.values():
+            in_period = and_(Run.local_date >= start_date, Run.local_date < end_date)
+            columns += [
+                func.sum(Run.distance).filter(in_period),
+                func.sum(Run.duration).filter(in_period),
+                func.count(Run.uuid).filter(in_period),
+            ]
+        # Bounded by the widest period, so only its index range is read
+        stmt = select(*columns).where(
+            Run.user_uuid == user_uuid,
+            Run.local_date >= min(start for start, _, _ in periods.values()),
+            Run.local_date < max(end for _, end, _ in periods.values()),
+        )
+        row = (await uow.session.execute(stmt)).one()
+
+        progress = {}
+        for i, time_period in enumerate(periods):
+            distance, duration, count = row[i * 3 : i * 3 + 3]
+            progress[time_period] = {
+                GoalType.DISTANCE: distance or 0.0,
+                GoalType.DURATION: duration or 0.0,
+                GoalType.NUMBER_OF_RUNS: count or 0.0,
+            }
+        return progress
 
     def _get_unit(self, goal_type: GoalType) -> str:
         if goal_type == GoalType.DISTANCE:
@@ -148,4 +181,4 @@ class AchievementService:
 
 
 def get_achievement_service() -> AchievementService:
-    return AchievementService()
+    return AchievementService(get_feed_service())
@@ -0,0 +1,172 @@
+from datetime import date, timedelta
+from typing import Any, Iterable, Optional
+from uuid import UUID
+
+from app.core.exc import BadRequestException
+from app.core.unit_of_work import ABCUnitOfWork
+from app.enums.analytics import AnalyticsGranularity
+from app.schemas.analytics import (
+    AnalyticsPoint,
+    AnalyticsSeriesResponse,
+    AnalyticsTotals,
+    HeatmapCell,
+    HourTotal,
+    MonthComparison,
+    PaceBucket,
+    WeekdayTotal,
+    YearInReviewResponse,
+)
+from app.utils.analytics import (
+    PACE_BUCKET_SECONDS,
+    bucket_keys,
+    bucket_label,
+    bucket_start,
+)
+from app.utils.timezones import DEFAULT_TIMEZONE, local_today
+
+MAX_SERIES_POINTS = 1000
+
+
+class AnalyticsService:
+    """
+    Long-range statistics read from the run totals tables, which are kept up
+    to date as runs are added and deleted, never from the runs themselves.
+    """
+
+    async def get_series(
+        self,
+        uow: ABCUnitOfWork,
+        user_uuid: UUID,
+        granularity: AnalyticsGranularity,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        timezone: str = DEFAULT_TIMEZONE,
+    ) -> AnalyticsSeriesResponse:
+        # The last year up to today by default; buckets cut by the range only
+        # count its days
+        end_date = end_date or local_today(timezone)
+        start_date = start_date or end_date - timedelta(days=365)
+        if start_date > end_date:
+            raise BadRequestException("start_date must not be after end_date")
+        keys = bucket_keys(start_date, end_date, granularity)
+        if len(keys) > MAX_SERIES_POINTS:
+            raise BadRequestException(
+                f"Range too long, at most {MAX_SERIES_POINTS} points per series"
+            )
+
+        async with uow:
+            rows = await uow.run_totals.get_series(
+                user_uuid, start_date, end_date, granularity
+            )
+
+        rows_by_bucket = {row.bucket: row for row in rows}
+        points = []
+        for key in keys:
+            row = rows_by_bucket.get(key)
+            points.append(
+                AnalyticsPoint(
+                    label=bucket_label(key, granularity),
+                    start_date=bucket_start(key, granularity),
+                    runs=row.runs if row else 0,
+                    distance=row.distance if row else 0.0,
+                    duration=row.duration if row else 0.0,
+                )
+            )
+        return AnalyticsSeriesResponse(granularity=granularity, points=points)
+
+    async def get_year_in_review(
+        self, uow: ABCUnitOfWork, user_uuid: UUID, year: int
+    ) -> YearInReviewResponse:
+        async with uow:
+            months = await uow.run_totals.get_months(
+                user_uuid, date(year - 1, 1, 1), date(year, 12, 31)
+            )
+            hours = await uow.run_totals.get_hours(user_uuid, year)
+            paces = await uow.run_totals.get_paces(user_uuid, year)
+
+        current = {
+            row.month_key % 100: row for row in months if row.month_key // 100 == year
+        }
+        previous = {
+            row.month_key % 100: row for row in months if row.month_key // 100 < year
+        }
+        totals = self._totals(current.values())
+        previous_totals = self._totals(previous.values())
+
+        distance_change = None
+        if previous_totals.distance:
+            distance_change = round(
+                (totals.distance / previous_totals.distance - 1) * 100, 1
+            )
+
+        month_comparisons = [
+            MonthComparison(
+                month=month,
+                distance=current[month].distance if month in current else 0.0,
+                previous_distance=(
+                    previous[month].distance if month in previous else 0.0
+                ),
+                runs=current[month].runs if month in current else 0,
+                previous_runs=previous[month].runs if month in previous else 0,
+            )
+            for month in range(1, 13)
+        ]
+
+        heatmap = sorted(
+            (
+                HeatmapCell(
+                    weekday=cell.weekday,
+                    hour=cell.hour,
+                    runs=cell.runs,
+                    distance=cell.distance,
+                )
+                for cell in hours
+            ),
+            key=lambda cell: (cell.weekday, cell.hour),
+        )
+        weekdays = [
+            WeekdayTotal(weekday=day, runs=0, distance=0.0) for day in range(1, 8)
+        ]
+        hour_totals = [HourTotal(hour=hour, runs=0, distance=0.0) for hour in range(24)]
+        for cell in heatmap:
+            for total in (weekdays[cell.weekday - 1], hour_totals[cell.hour]):
+                total.runs += cell.runs
+                total.distance += cell.distance
+
+        pace_histogram = [
+            PaceBucket(
+                pace_from=row.pace_bucket / 60,
+                pace_to=(row.pace_bucket + PACE_BUCKET_SECONDS) / 60,
+                runs=row.runs,
+                distance=row.distance,
+            )
+            for row in paces
+        ]
+
+        return YearInReviewResponse(
+            year=year,
+            totals=totals,
+            previous_totals=previous_totals,
+            distance_change=distance_change,
+            months=month_comparisons,
+            heatmap=heatmap,
+            weekdays=weekdays,
+            hours=hour_totals,
+            pace_histogram=pace_histogram,
+        )
+
+    def _totals(self, months: Iterable[Any]) -> AnalyticsTotals:
+        months = list(months)
+        distance = sum(row.distance for row in months)
+        duration = sum(row.duration for row in months)
+        return AnalyticsTotals(
+            runs=sum(row.runs for row in months),
+            distance=distance,
+            duration=duration,
+            active_days=sum(row.active_days for row in months),
+            average_pace=duration / distance if distance > 0 else None,
+        )
+
+
+def get_analytics_service() -> AnalyticsService:
+    return AnalyticsService()
@@ -1,19 +1,62 @@
 from uuid import UUID
 
+from sqlalchemy import select, update
+from sqlalchemy.orm import joinedload, undefer
+
 from app.core.exc import ForbiddenException, ObjectNotFoundException
 from app.core.unit_of_work import ABCUnitOfWork
+from app.enums.challenge import ChallengeView
+from app.enums.feed import ActivityType
+from app.models.challenge import Challenge, ChallengeAttempt, ChallengeBestTime
+from app.models.run import Run
 from app.models.user import User
 from app.schemas.challenge import (
     ChallengeAttemptCreate,
     ChallengeAttemptResponse,
+    ChallengeAttemptSummary,
+    ChallengeCardListResponse,
+    ChallengeCardResponse,
     ChallengeCreate,
+    ChallengeLeaderboardEntry,
+    ChallengeLeaderboardResponse,
     ChallengeListResponse,
     ChallengeResponse,
 )
-from app.utils.distance_utils import extract_route_endpoints, points_within_radius
+from app.services.feed import FeedService, get_feed_service
+from app.services.friendship import FriendshipService, get_friendship_service
+from app.utils.distance_utils import points_within_radius
+from app.utils.polyline import encode_polyline, simplify_points
+from app.utils.route_index import (
+    bboxes_overlap,
+    build_route_index,
+    build_route_track,
+    compute_bbox,
+    endpoint_cell,
+    endpoint_cells_near,
+    expand_bbox,
+    find_course_traversals,
+    index_endpoints,
+    may_traverse,
+    on_course_ratio,
+    route_to_points,
+    route_to_timed_points,
+)
+
+# Radius around the course endpoints and maximum deviation along the course
+ROUTE_MATCH_RADIUS_METERS = 100
+# Share of attempt points that must stay on the course
+MIN_ON_COURSE_RATIO = 0.9
+# Largest deviation of the challenge card polyline from the source route
+CARD_POLYLINE_TOLERANCE_METERS = 10
 
 
 class ChallengeService:
+    def __init__(
+        self, friendship_service: FriendshipService, feed_service: FeedService
+    ):
+        self.friendship_service = friendship_service
+        self.feed_service = feed_service
+
     async def create_challenge(
         self, uow: ABCUnitOfWork, user: "User", data: ChallengeCreate
     ) -> ChallengeResponse:
@@ -32,6 +75,8 @@ class ChallengeService:
             challenge_data = data.model_dump()
             challenge_data["creator_id"] = str(user.uuid)
             challenge_data["source_run_id"] = str(data.source_run_id)
+            challenge_data.update(self._route_index_fields(run.route))
+            challenge_data.update(self._card_fields(run, user))
 
             challenge = await uow.challenge.create_one(challenge_data)
 
@@ -42,36 +87,43 @@ class ChallengeService:
             return ChallengeResponse.model_validate(challenge)
 
     async def list_available_challenges(
-        self, uow: ABCUnitOfWork, user_id: UUID, page: int, limit: int
-    ) -> ChallengeListResponse:
+        self,
+        uow: ABCUnitOfWork,
+        user_id: UUID,
+        page: int,
+        limit: int,
+        view: ChallengeView = ChallengeView.FULL,
+    ) -> ChallengeListResponse | ChallengeCardListResponse:
+        response_cls, item_cls = (
+            (ChallengeCardListResponse, ChallengeCardResponse)
+            if view == ChallengeView.CARD
+            else (ChallengeListResponse, ChallengeResponse)
+        )
         async with uow:
             # 1. Get friends
-            friendships = await uow.friendship.get_friends(user_id)
-            friend_ids = []
-            for f in friendships:
-                if str(f.requester_id) == str(user_id):
-                    friend_ids.append(f.addressee_id)
-                else:
-                    friend_ids.append(f.requester_id)
+            friend_ids = await self.friendship_service.get_friend_ids(uow, user_id)
 
             # Add self to see own challenges? Maybe not "available" but good for testing.
             # Let's stick to friends for "available to beat".
 
             if not friend_ids:
-                return ChallengeListResponse(
+                return response_cls(
                     items=[], total=0, page=page, limit=limit, total_pages=0
                 )
 
             # 2. Get challenges
             challenges, total = await uow.challenge.get_available_challenges(
-                friend_ids, page=page, limit=limit
+                friend_ids,
+                page=page,
+                limit=limit,
+                with_relations=(view == ChallengeView.FULL),
             )
 
             # 3. Populate creator info (optional, but good for UI)
             # Relationships are now eager loaded in the repository
-            items = [ChallengeResponse.model_validate(c) for c in challenges]
+            items = [item_cls.model_validate(c) for c in challenges]
 
-            return ChallengeListResponse(
+            return response_cls(
                 items=items,
                 total=total,
                 page=page,
@@ -110,60 +162,154 @@ class ChallengeService:
     ) -> ChallengeAttemptResponse:
         async with uow:
             # 1. Get challenge
-            challenge = await uow.challenge.get_one(uuid=challenge_id)
+            challenge = await uow.challenge.get_one(
+                uuid=challenge_id, options=[undefer(Challenge.route_index)]
+            )
             if not challenge:
                 raise ObjectNotFoundException(challenge_id, "Challenge")
 
-            # 2. Get source run
-            source_run = await uow.run.get_one(uuid=challenge.source_run_id)
-            if not source_run:
-                raise ObjectNotFoundException(challenge.source_run_id, "Source Run")
-
-            # 3. Get attempt run
-            attempt_run = await uow.run.get_one(uuid=data.run_id)
+            # 2. Get the course index, building it once for legacy challenges
+            route_index = challenge.route_index
+            if route_index is None:
+                source_run = await uow.run.get_one(uuid=challenge.source_run_id)
+                if not source_run:
+                    raise ObjectNotFoundException(challenge.source_run_id, "Source Run")
+                fields = self._route_index_fields(source_run.route)
+                if fields["route_index"] is not None:
+                    await uow.challenge.update_one(challenge_id, fields)
+                route_index = fields["route_index"]
+
+            # 3. Get attempt run, with its runner for the response
+            attempt_run = await uow.run.get_one(
+                uuid=data.run_id, options=[joinedload(Run.user)]
+            )
             if not attempt_run:
                 raise ObjectNotFoundException(data.run_id, "Attempt Run")
 
             if str(attempt_run.user_uuid) != str(user_id):
                 raise ForbiddenException("You can only submit your own runs")
 
-            # 4. Calculate success based on route comparison
-            # Extract first and last points from both routes
-            source_start, source_end = extract_route_endpoints(source_run.route)
-            attempt_start, attempt_end = extract_route_endpoints(attempt_run.route)
-
-            # Success if both start and end points are within 100m radius
-            # Default to False if routes are missing or invalid
-            success = False
-            if source_start and source_end and attempt_start and attempt_end:
-                start_match = points_within_radius(
-                    source_start, attempt_start, radius_meters=100
-                )
-                end_match = points_within_radius(
-                    source_end, attempt_end, radius_meters=100
-                )
-                success = start_match and end_match
-
-            # 5. Create Attempt
-            attempt = await uow.challenge_attempt.create_one(
-                {
-                    "challenge_id": str(challenge_id),
-                    "user_id": str(user_id),
-                    "run_id": str(data.run_id),
-                    "success": success,
-                }
+            # 4. A run counts once per challenge, it may already have been
+            # matched in the background
+            attempt = await uow.challenge_attempt.get_one(
+                challenge_id=challenge_id, run_id=data.run_id
             )
+            if attempt is None:
+                # 5. Calculate success based on route comparison
+                success = self._matches_course(route_index, attempt_run.route)
+
+                # 6. Create Attempt, unless a concurrent match got there first
+                attempt = await uow.challenge_attempt.create_once(
+                    {
+                        "challenge_id": str(challenge_id),
+                        "user_id": str(user_id),
+                        "run_id": str(data.run_id),
+                        "success": success,
+                        "duration": attempt_run.duration,
+                    }
+                )
+                if attempt is None:
+                    attempt = await uow.challenge_attempt.get_one(
+                        challenge_id=challenge_id, run_id=data.run_id
+                    )
+                elif success:
+                    await self._record_success(uow, challenge, attempt)
 
             # Manually populate relationships to avoid MissingGreenlet
-            user = await uow.user.get_one(uuid=user_id)
-            attempt.user = user
+            attempt.user = attempt_run.user
             attempt.run = attempt_run
 
             return ChallengeAttemptResponse.model_validate(attempt)
 
+    async def match_run(self, uow: ABCUnitOfWork, run_id: UUID) -> int:
+        """
+        Record an attempt on every active challenge whose course was run as
+        part of the given run.
+
+        Candidates are challenges whose course bounding box fits inside the
+        run's and which start and finish in endpoint cells the run passes
+        near, so only their route indexes are loaded. The run's distances and
+        grid are built once; candidates whose start or finish the run never
+        comes within the radius of are dropped from the grid alone, the rest
+        are searched for within the route and timed on the matched stretch
+        only.
+
+        Returns:
+            Number of attempts recorded
+        """
+        async with uow:
+            run = await uow.run.get_one(uuid=run_id)
+            if not run:
+                return 0
+
+            points, timestamps = route_to_timed_points(run.route)
+            track = build_route_track(points, ROUTE_MATCH_RADIUS_METERS)
+            if track is None:
+                return 0
+            bbox = compute_bbox(points)
+
+            candidates = await uow.challenge.get_within_bbox(
+                expand_bbox(bbox, ROUTE_MATCH_RADIUS_METERS),
+                endpoint_cells_near(points, ROUTE_MATCH_RADIUS_METERS),
+                exclude_run_id=run.uuid,
+            )
+            if not candidates:
+                return 0
+            already_attempted = await uow.challenge_attempt.get_challenge_ids_by_run(
+                run.uuid
+            )
+
+            candidates = [
+                c
+                for c in candidates
+                if c.uuid not in already_attempted and c.route_index
+            ]
+            reachable = may_traverse(
+                [c.route_index for c in candidates], track, ROUTE_MATCH_RADIUS_METERS
+            )
+
+            recorded = 0
+            for challenge, may_match in zip(candidates, reachable):
+                if not may_match:
+                    continue
+
+                traversals = find_course_traversals(
+                    challenge.route_index,
+                    track,
+                    ROUTE_MATCH_RADIUS_METERS,
+                    MIN_ON_COURSE_RATIO,
+                )
+                durations = [
+                    self._elapsed_minutes(run, timestamps, first, last)
+                    for first, last in traversals
+                ]
+                durations = [d for d in durations if d is not None]
+                if not durations:
+                    continue
+
+                attempt = await uow.challenge_attempt.create_once(
+                    {
+                        "challenge_id": str(challenge.uuid),
+                        "user_id": str(run.user_uuid),
+                        "run_id": str(run.uuid),
+                        "success": True,
+                        "duration": min(durations),
+                    }
+                )
+                if attempt is None:
+                    # Submitted by hand while matching
+                    continue
+                await self._record_success(uow, challenge, attempt)
+                recorded += 1
+
+            return recorded
+
     async def get_challenge_attempts(
-        self, uow: ABCUnitOfWork, challenge_id: UUID
-    ) -> list[ChallengeAttemptResponse]:
+        self,
+        uow: ABCUnitOfWork,
+        challenge_id: UUID,
+        view: ChallengeView = ChallengeView.FULL,
+    ) -> list[ChallengeAttemptResponse] | list[ChallengeAttemptSummary]:
         async with uow:
             # Verify challenge exists
             challenge = await uow.challenge.get_one(uuid=challenge_id)
@@ -172,14 +318,212 @@ class ChallengeService:
 
             # Get attempts
             attempts = await uow.challenge_attempt.get_attempts_by_challenge(
-                challenge_id
+                challenge_id, with_runs=(view == ChallengeView.FULL)
             )
 
             # Attempts already have user and run eager loaded from repository
-            return [
-                ChallengeAttemptResponse.model_validate(attempt) for attempt in attempts
+            item_cls = (
+                ChallengeAttemptSummary
+                if view == ChallengeView.CARD
+                else ChallengeAttemptResponse
+            )
+            return [item_cls.model_validate(attempt) for attempt in attempts]
+
+    async def get_challenge_leaderboard(
+        self,
+        uow: ABCUnitOfWork,
+        challenge_id: UUID,
+        current_user_id: UUID,
+        page: int = 1,
+        limit: int = 10,
+    ) -> ChallengeLeaderboardResponse:
+        async with uow:
+            challenge = await uow.challenge.get_one(uuid=challenge_id)
+            if not challenge:
+                raise ObjectNotFoundException(challenge_id, "Challenge")
+
+            rows, total = await uow.challenge_best_time.get_ranking(
+                challenge_id, page=page, limit=limit
+            )
+            offset = (page - 1) * limit
+            entries = [
+                self._to_leaderboard_entry(
+                    best, username, offset + i + 1, current_user_id
+                )
+                for i, (best, username) in enumerate(rows)
             ]
 
+            current_user_entry = next((e for e in entries if e.is_current_user), None)
+            if current_user_entry is None:
+                position = await uow.challenge_best_time.get_user_position(
+                    challenge_id, current_user_id
+                )
+                if position:
+                    best, rank = position
+                    user = await uow.user.get_one(uuid=current_user_id)
+                    current_user_entry = self._to_leaderboard_entry(
+                        best, user.username, rank, current_user_id
+                    )
+
+            return ChallengeLeaderboardResponse(
+                entries=entries,
+                current_user_entry=current_user_entry,
+                total=total,
+                page=page,
+                limit=limit,
+                total_pages=(total + limit - 1) // limit,
+            )
+
+    def _to_leaderboard_entry(
+        self,
+        best: ChallengeBestTime,
+        username: str | None,
+        rank: int,
+        current_user_id: UUID,
+    ) -> ChallengeLeaderboardEntry:
+        return ChallengeLeaderboardEntry(
+            rank=rank,
+            user_uuid=best.user_id,
+            username=username,
+            best_duration=best.best_duration,
+            run_id=best.run_id,
+            achieved_at=best.achieved_at,
+            is_current_user=(best.user_id == current_user_id),
+        )
+
+    async def backfill_card_polylines(
+        self, uow: ABCUnitOfWork, batch_size: int = 100
+    ) -> int:
+        """
+        Store the card polyline of every challenge created before challenge
+        cards existed, in batches of challenges.
+
+        Returns:
+            Number of challenges updated
+        """
+        updated = 0
+        last_uuid = None
+        async with uow:
+            while True:
+                stmt = (
+                    select(Challenge.uuid, Run.route)
+                    .join(Run, Run.uuid == Challenge.source_run_id)
+                    .where(Challenge.course_polyline.is_(None), Run.route.is_not(None))
+                    .order_by(Challenge.uuid)
+                    .limit(batch_size)
+                )
+                if last_uuid is not None:
+                    stmt = stmt.where(Challenge.uuid > last_uuid)
+                rows = (await uow.session.execute(stmt)).all()
+                if not rows:
+                    return updated
+
+                for challenge_id, route in rows:
+                    points = simplify_points(
+                        route_to_points(route), CARD_POLYLINE_TOLERANCE_METERS
+                    )
+                    if not points:
+                        continue
+                    await uow.session.execute(
+                        update(Challenge)
+                        .where(Challenge.uuid == challenge_id)
+                        .values(course_polyline=encode_polyline(points))
+                    )
+                    updated += 1
+                last_uuid = rows[-1].uuid
+
+    async def _record_success(
+        self, uow: ABCUnitOfWork, challenge: Challenge, attempt: ChallengeAttempt
+    ) -> None:
+        await uow.challenge_best_time.record(
+            challenge.uuid,
+            attempt.user_id,
+            duration=attempt.duration,
+            run_id=attempt.run_id,
+            achieved_at=attempt.created_at,
+        )
+        await self.feed_service.publish(
+            uow,
+            attempt.user_id,
+            ActivityType.CHALLENGE_COMPLETED,
+            challenge.uuid,
+            {"challenge_name": challenge.name, "run_id": str(attempt.run_id)},
+        )
+
+    def _elapsed_minutes(
+        self, run: Run, timestamps: list[float | None], first: int, last: int
+    ) -> float | None:
+        # Time the matched stretch from point timestamps; without them only a
+        # run that is the course end to end can fall back to its own duration
+        start, end = timestamps[first], timestamps[last]
+        if start is not None and end is not None and end > start:
+            return (end - start) / 60
+        if first == 0 and last == len(timestamps) - 1:
+            return run.duration
+        return None
+
+    def _card_fields(self, run: Run, user: User) -> dict:
+        points = simplify_points(
+            route_to_points(run.route), CARD_POLYLINE_TOLERANCE_METERS
+        )
+        return {
+            "course_distance": run.distance,
+            "course_duration": run.duration,
+            "course_polyline": encode_polyline(points) if points else None,
+            "creator_name": user.username,
+        }
+
+    def _route_index_fields(self, route: list | None) -> dict:
+        route_index = build_route_index(route, ROUTE_MATCH_RADIUS_METERS)
+        bbox = route_index["bbox"] if route_index else [None] * 4
+        start_cell = end_cell = None
+        if route_index:
+            start_cell = endpoint_cell(*route_index["points"][0])
+            end_cell = endpoint_cell(*route_index["points"][-1])
+        return {
+            "route_index": route_index,
+            "min_lat": bbox[0],
+            "min_lng": bbox[1],
+            "max_lat": bbox[2],
+            "max_lng": bbox[3],
+            "start_cell": start_cell,
+            "end_cell": end_cell,
+        }
+
+    def _matches_course(self, route_index: dict | None, route: list | None) -> bool:
+        # Default to False if routes are missing or invalid
+        if not route_index:
+            return False
+
+        points = route_to_points(route)
+        attempt_bbox = compute_bbox(points)
+        if attempt_bbox is None:
+            return False
+
+        # Cheap rejection of routes run somewhere else entirely
+        if not bboxes_overlap(
+            route_index["bbox"], attempt_bbox, ROUTE_MATCH_RADIUS_METERS
+        ):
+            return False
+
+        # Both start and end points must be within the radius
+        course_start, course_end = index_endpoints(route_index)
+        attempt_start = {"latitude": points[0][0], "longitude": points[0][1]}
+        attempt_end = {"latitude": points[-1][0], "longitude": points[-1][1]}
+        if not (
+            points_within_radius(
+                course_start, attempt_start, radius_meters=ROUTE_MATCH_RADIUS_METERS
+            )
+            and points_within_radius(
+                course_end, attempt_end, radius_meters=ROUTE_MATCH_RADIUS_METERS
+            )
+        ):
+            return False
+
+        # And the run in between has to follow the course
+        ratio = on_course_ratio(route_index, points, ROUTE_MATCH_RADIUS_METERS)
+        return ratio >= MIN_ON_COURSE_RATIO
+
 
 def get_challenge_service() -> ChallengeService:
-    return ChallengeService()
+    return ChallengeService(get_friendship_service(), get_feed_service())
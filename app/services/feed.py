@@ -0,0 +1,86 @@
+from typing import Any
+from uuid import UUID
+
+from app.core.unit_of_work import ABCUnitOfWork
+from app.enums.feed import ActivityType
+from app.schemas.feed import FeedItemResponse, FeedResponse
+from app.services.friendship import FriendshipService, get_friendship_service
+from app.utils.pagination import decode_cursor, encode_cursor
+
+# Actors with more friends than this are not fanned out on write; their
+# activities are merged into followers' feeds at read time instead.
+FANOUT_MAX_FRIENDS = 1000
+
+
+class FeedService:
+    def __init__(self, friendship_service: FriendshipService):
+        self.friendship_service = friendship_service
+
+    async def publish(
+        self,
+        uow: ABCUnitOfWork,
+        actor_id: UUID,
+        activity_type: ActivityType,
+        object_id: UUID,
+        payload: dict[str, Any],
+    ) -> None:
+        """
+        Record an activity and push it to the actor's timeline and, below
+        FANOUT_MAX_FRIENDS, to the timelines of their friends.
+
+        Must be called inside an open unit of work.
+        """
+        friend_count = await uow.friend_edge.count_friends(
+            actor_id, cap=FANOUT_MAX_FRIENDS
+        )
+        fan_out = friend_count <= FANOUT_MAX_FRIENDS
+
+        activity = await uow.activity.create_one(
+            {
+                "actor_id": actor_id,
+                "activity_type": activity_type,
+                "object_id": object_id,
+                "payload": payload,
+                "fanned_out": fan_out,
+            }
+        )
+        # The actor's own entry is written either way, get_pulled only merges
+        # in friends' activities
+        await uow.feed_entry.fan_out(activity, to_friends=fan_out)
+
+    async def get_feed(
+        self,
+        uow: ABCUnitOfWork,
+        user_id: UUID,
+        cursor: str | None = None,
+        limit: int = 20,
+    ) -> FeedResponse:
+        before = decode_cursor(cursor) if cursor else None
+
+        async with uow:
+            activities = await uow.feed_entry.get_timeline(
+                user_id, before=before, limit=limit
+            )
+
+            # Merge in activities of friends that were too popular to fan out
+            friend_ids = await self.friendship_service.get_friend_ids(uow, user_id)
+            pulled = await uow.activity.get_pulled(
+                friend_ids, before=before, limit=limit
+            )
+            if pulled:
+                activities = sorted(
+                    [*activities, *pulled],
+                    key=lambda a: (a.created_at, a.uuid),
+                    reverse=True,
+                )[:limit]
+
+            items = [FeedItemResponse.model_validate(a) for a in activities]
+            next_cursor = None
+            if len(items) == limit:
+                next_cursor = encode_cursor(items[-1].created_at, items[-1].uuid)
+
+            return FeedResponse(items=items, next_cursor=next_cursor)
+
+
+def get_feed_service() -> FeedService:
+    return FeedService(get_friendship_service())
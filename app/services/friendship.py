@@ -1,23 +1,54 @@
+from datetime import datetime
+from datetime import timezone as dt_timezone
 from uuid import UUID
 
+from loguru import logger
+
+from app.core.cache import TTLCache
+from app.core.config import settings
 from app.core.exc import (
     BadRequestException,
     ForbiddenException,
     ObjectNotFoundException,
 )
 from app.core.unit_of_work import ABCUnitOfWork
+from app.enums.friendship import FriendSortBy
 from app.models.friendship import FriendshipStatus
 from app.models.user import User
 from app.schemas.friendship import (
+    FriendActivity,
     FriendListResponse,
     FriendRequestAction,
     FriendRequestListResponse,
+    FriendResponse,
     FriendshipResponse,
+    FriendSuggestionListResponse,
+    FriendSuggestionResponse,
+)
+from app.utils.timezones import DEFAULT_TIMEZONE, local_today, week_key
+
+# Suggestion engine tuning: how many edges are followed per node on each hop,
+# how many suggestions are kept per user and how candidates are scored
+SUGGESTION_MAX_FANOUT = 500
+SUGGESTION_MAX_RESULTS = 50
+SUGGESTION_MUTUAL_FRIEND_WEIGHT = 1.0
+SUGGESTION_CO_CHALLENGE_WEIGHT = 0.5
+
+# Friend ids per user, invalidated whenever a friendship is accepted or removed
+friend_ids_cache: TTLCache[UUID, list[UUID]] = TTLCache(
+    ttl_seconds=settings.app.FRIEND_CACHE_TTL_SECONDS
 )
-from app.schemas.users import UserResponse
 
 
 class FriendshipService:
+    async def get_friend_ids(self, uow: ABCUnitOfWork, user_id: UUID) -> list[UUID]:
+        """Return ids of the user's accepted friends, served from cache if possible."""
+        friend_ids = friend_ids_cache.get(user_id)
+        if friend_ids is None:
+            friend_ids = await uow.friend_edge.get_friend_ids(user_id)
+            friend_ids_cache.set(user_id, friend_ids)
+        return list(friend_ids)
+
     async def send_request(
         self, uow: ABCUnitOfWork, requester: User, email: str
     ) -> FriendshipResponse:
@@ -101,35 +132,72 @@ class FriendshipService:
                 await uow.friendship.update_one(
                     request_id, {"status": FriendshipStatus.ACCEPTED}
                 )
+                await uow.friend_edge.add_pair(
+                    friendship.requester_id, friendship.addressee_id
+                )
             else:
                 await uow.friendship.delete_one(request_id)
 
+        # Only once committed, or a concurrent read could cache the old edges
+        if action == FriendRequestAction.ACCEPT:
+            friend_ids_cache.invalidate(
+                friendship.requester_id, friendship.addressee_id
+            )
+
+    async def remove_friend(
+        self, uow: ABCUnitOfWork, user_id: UUID, friend_id: UUID
+    ) -> None:
+        async with uow:
+            friendship = await uow.friendship.get_friendship(user_id, friend_id)
+            if not friendship or friendship.status != FriendshipStatus.ACCEPTED:
+                raise ObjectNotFoundException(friend_id, "Friend")
+
+            await uow.friend_edge.remove_pair(user_id, friend_id)
+            await uow.friendship.delete_one(friendship.uuid)
+
+        # Only once committed, or a concurrent read could cache the old edges
+        friend_ids_cache.invalidate(user_id, friend_id)
+
     async def list_friends(
-        self, uow: ABCUnitOfWork, user_id: UUID
+        self,
+        uow: ABCUnitOfWork,
+        user_id: UUID,
+        page: int = 1,
+        limit: int = 10,
+        sort_by: FriendSortBy = FriendSortBy.USERNAME,
+        include_activity: bool = False,
+        timezone: str = DEFAULT_TIMEZONE,
     ) -> FriendListResponse:
         async with uow:
-            friendships = await uow.friendship.get_friends(user_id)
+            # The viewer's current ISO week, matched against each run's week_key
+            activity_week = (
+                week_key(local_today(timezone)) if include_activity else None
+            )
+            rows, total = await uow.friend_edge.list_friends(
+                user_id,
+                page=page,
+                limit=limit,
+                sort_by=sort_by,
+                activity_week=activity_week,
+            )
 
             friends = []
-            for f in friendships:
-                # Determine which user is the friend
-                if str(f.requester_id) == str(user_id):
-                    # We need to fetch the addressee.
-                    # Since we are inside a session, we can access the relationship if lazy loading is enabled,
-                    # or we should eagerly load it in the repo.
-                    # For now, let's assume lazy loading works or we fetch explicitly.
-                    # To be safe and async-friendly, let's fetch explicitly if relationship is not loaded.
-                    # Actually, let's just use the relationship if it's awaitable or configured for async.
-                    # Standard SQLAlchemy async requires explicit loading or selectinload.
-                    # Let's assume we need to fetch the user.
-                    friend_user = await uow.user.get_one(uuid=f.addressee_id)
-                else:
-                    friend_user = await uow.user.get_one(uuid=f.requester_id)
-
-                if friend_user:
-                    friends.append(UserResponse.model_validate(friend_user))
-
-            return FriendListResponse(friends=friends, total=len(friends))
+            for friend_user, last_run_at, weekly_distance in rows:
+                friend = FriendResponse.model_validate(friend_user)
+                if include_activity:
+                    friend.activity = FriendActivity(
+                        last_run_at=last_run_at,
+                        weekly_distance=weekly_distance or 0.0,
+                    )
+                friends.append(friend)
+
+            return FriendListResponse(
+                friends=friends,
+                total=total,
+                page=page,
+                limit=limit,
+                total_pages=(total + limit - 1) // limit,
+            )
 
     async def list_requests(
         self, uow: ABCUnitOfWork, user_id: UUID
@@ -150,6 +218,59 @@ class FriendshipService:
                 outgoing=[FriendshipResponse.model_validate(f) for f in outgoing],
             )
 
+    async def list_suggestions(
+        self, uow: ABCUnitOfWork, user_id: UUID, limit: int = 20
+    ) -> FriendSuggestionListResponse:
+        async with uow:
+            suggestions = await uow.friend_suggestion.get_suggestions(
+                user_id, limit=limit
+            )
+            return FriendSuggestionListResponse(
+                suggestions=[
+                    FriendSuggestionResponse.model_validate(s) for s in suggestions
+                ]
+            )
+
+    async def refresh_suggestions(
+        self, uow: ABCUnitOfWork, lock_uow: ABCUnitOfWork, batch_size: int = 500
+    ) -> int:
+        """
+        Recompute friend suggestions for every user, one batch per transaction.
+
+        Every worker schedules the refresh: the first one to get here does it
+        while lock_uow holds the refresh lock, the others skip it.
+
+        Returns:
+            Number of users processed, 0 when skipped
+        """
+        processed = 0
+        last_uuid = None
+        computed_at = datetime.now(dt_timezone.utc)
+        # The batches commit one by one, so the lock is held in a transaction
+        # of its own for the whole refresh
+        async with lock_uow, uow:
+            if not await lock_uow.friend_suggestion.lock_refresh():
+                logger.info("Friend suggestions are being refreshed elsewhere")
+                return 0
+            while True:
+                user_ids = await uow.user.list_uuids_after(last_uuid, batch_size)
+                if not user_ids:
+                    break
+
+                await uow.friend_suggestion.refresh_for_users(
+                    user_ids,
+                    computed_at=computed_at,
+                    max_fanout=SUGGESTION_MAX_FANOUT,
+                    max_suggestions=SUGGESTION_MAX_RESULTS,
+                    mutual_weight=SUGGESTION_MUTUAL_FRIEND_WEIGHT,
+                    co_challenge_weight=SUGGESTION_CO_CHALLENGE_WEIGHT,
+                )
+                processed += len(user_ids)
+                last_uuid = user_ids[-1]
+
+        logger.info("Refreshed friend suggestions for {count} users", count=processed)
+        return processed
+
 
 def get_friendship_service() -> FriendshipService:
     return FriendshipService()
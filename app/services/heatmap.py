@@ -0,0 +1,156 @@
+from typing import Any, List, Optional
+from uuid import UUID
+
+from sqlalchemy import delete, select
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.exc import BadRequestException
+from app.core.unit_of_work import ABCUnitOfWork
+from app.enums.heatmap import HeatmapScope
+from app.models.heatmap import HeatmapRun, HeatmapTile
+from app.models.run import Run
+from app.services.friendship import FriendshipService, get_friendship_service
+from app.utils.heatmap import (
+    MAX_ZOOM,
+    MIN_ZOOM,
+    Counts,
+    add_pixels,
+    decode_tile,
+    encode_tile,
+    merge_tiles,
+    route_tiles,
+)
+from app.utils.route_index import route_to_points
+
+# Merged pixel counts per (user, scope, zoom, x, y). A user's own tiles are
+# invalidated when their runs change; friends' tiles expire with the TTL
+tile_cache: TTLCache[tuple, Counts] = TTLCache(
+    ttl_seconds=settings.app.HEATMAP_TILE_CACHE_TTL_SECONDS, max_size=2000
+)
+
+
+class HeatmapService:
+    def __init__(self, friendship_service: FriendshipService):
+        self.friendship_service = friendship_service
+
+    async def get_tile(
+        self,
+        uow: ABCUnitOfWork,
+        user_uuid: UUID,
+        scope: HeatmapScope,
+        zoom: int,
+        x: int,
+        y: int,
+    ) -> Counts:
+        if not MIN_ZOOM <= zoom <= MAX_ZOOM:
+            raise BadRequestException(f"zoom must be between {MIN_ZOOM} and {MAX_ZOOM}")
+        if not (0 <= x < 1 << zoom and 0 <= y < 1 << zoom):
+            raise BadRequestException("Tile out of range")
+
+        key = (user_uuid, scope, zoom, x, y)
+        counts = tile_cache.get(key)
+        if counts is None:
+            async with uow:
+                user_ids = [user_uuid]
+                if scope == HeatmapScope.FRIENDS:
+                    user_ids += await self.friendship_service.get_friend_ids(
+                        uow, user_uuid
+                    )
+                tiles = await uow.heatmap_tile.get_tiles(user_ids, zoom, x, y)
+            counts = merge_tiles(tiles)
+            tile_cache.set(key, counts)
+        return counts
+
+    async def add_run(self, uow: ABCUnitOfWork, run_id: UUID) -> int:
+        """
+        Add a run's route to its owner's tiles.
+
+        Returns:
+            Number of tiles updated
+        """
+        async with uow:
+            # Share-locked so a concurrent delete either comes first, and the
+            # run is skipped, or waits until it is marked and then removed
+            stmt = select(Run).where(Run.uuid == run_id).with_for_update(read=True)
+            run = (await uow.session.execute(stmt)).scalar_one_or_none()
+            if run is None:
+                return 0
+            return await self._apply(uow, run.uuid, run.user_uuid, run.route, 1)
+
+    async def remove_route(
+        self,
+        uow: ABCUnitOfWork,
+        run_id: UUID,
+        user_uuid: UUID,
+        route: Optional[List[Any]],
+    ) -> int:
+        """
+        Take a deleted run's route back out of its owner's tiles, if it was
+        added.
+        """
+        async with uow:
+            return await self._apply(uow, run_id, user_uuid, route, -1)
+
+    async def rebuild(self, uow: ABCUnitOfWork, batch_size: int = 100) -> int:
+        """
+        Recompute every tile from the stored routes.
+
+        Returns:
+            Number of runs added
+        """
+        added = 0
+        last_uuid = None
+        async with uow:
+            await uow.session.execute(delete(HeatmapTile))
+            await uow.session.execute(delete(HeatmapRun))
+            await uow.session.commit()
+            while True:
+                stmt = (
+                    select(Run.uuid, Run.user_uuid, Run.route)
+                    .where(Run.route.is_not(None))
+                    .order_by(Run.uuid)
+                    .limit(batch_size)
+                )
+                if last_uuid is not None:
+                    stmt = stmt.where(Run.uuid > last_uuid)
+                runs = (await uow.session.execute(stmt)).all()
+                if not runs:
+                    return added
+                for run in runs:
+                    if await self._apply(uow, run.uuid, run.user_uuid, run.route, 1):
+                        added += 1
+                last_uuid = runs[-1].uuid
+
+    async def _apply(
+        self,
+        uow: ABCUnitOfWork,
+        run_id: UUID,
+        user_uuid: UUID,
+        route: Optional[List[Any]],
+        sign: int,
+    ) -> int:
+        # The marker commits with the tiles, so a repeated add or a remove of a
+        # run that was never added leaves the counts alone
+        if sign > 0:
+            changed = await uow.heatmap_tile.mark_run(run_id, user_uuid)
+        else:
+            changed = await uow.heatmap_tile.unmark_run(run_id)
+        tiles = route_tiles(route_to_points(route)) if changed else {}
+        if not tiles:
+            return 0
+
+        stored = await uow.heatmap_tile.lock_tiles(user_uuid, list(tiles))
+        merged = {}
+        for key, pixels in tiles.items():
+            counts = decode_tile(stored.get(key, b""))
+            add_pixels(counts, pixels, sign)
+            merged[key] = encode_tile(counts)
+        await uow.heatmap_tile.save_tiles(user_uuid, merged)
+
+        tile_cache.invalidate(*((user_uuid, HeatmapScope.ME, *key) for key in tiles))
+        return len(tiles)
+
+
+def get_heatmap_service() -> HeatmapService:
+    return HeatmapService(get_friendship_service())
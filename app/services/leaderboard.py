@@ -1,8 +1,13 @@
-from datetime import datetime, timedelta
-from typing import Optional
+from datetime import date, datetime, timedelta
+from datetime import timezone as dt_timezone
+from typing import Any, List, Optional, Tuple
 from uuid import UUID
 
+from loguru import logger
+
+from app.core.exc import BadRequestException
 from app.core.unit_of_work import ABCUnitOfWork
+from app.enums.leaderboard import AgeGroup, CohortGender, DistanceBand
 from app.repositories.leaderboard import LeaderboardRepository
 from app.schemas.leaderboard import (
     LeaderboardEntry,
@@ -10,6 +15,7 @@ from app.schemas.leaderboard import (
     LeaderboardPeriod,
     LeaderboardResponse,
 )
+from app.utils.timezones import DEFAULT_TIMEZONE, local_today, month_key, week_key
 
 
 class LeaderboardService:
@@ -21,81 +27,206 @@ class LeaderboardService:
         current_user_uuid: UUID,
         limit: int = 50,
         friends_only: bool = False,
+        timezone: str = DEFAULT_TIMEZONE,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        age_group: Optional[AgeGroup] = None,
+        gender: Optional[CohortGender] = None,
+        distance_band: Optional[DistanceBand] = None,
+        around: int = 0,
     ) -> LeaderboardResponse:
+        """
+        Top limit entries, the current user's entry and, with around, the
+        entries within around positions of it, all from a single query.
+        """
+        if age_group or gender or distance_band:
+            if friends_only:
+                raise BadRequestException(
+                    "Cohort leaderboards can't be limited to friends"
+                )
+            return await self._get_cohort_leaderboard(
+                uow,
+                metric,
+                period,
+                current_user_uuid,
+                limit,
+                timezone,
+                age_group,
+                gender,
+                distance_band,
+                around,
+            )
+
+        start_date, end_date = self._get_period_range(
+            period, timezone, start_date, end_date
+        )
         async with uow:
             repo = LeaderboardRepository(uow.session)
-            start_date = self._get_start_date(period)
+            rows = await repo.get_leaderboard(
+                current_user_uuid,
+                metric,
+                start_date=start_date,
+                end_date=end_date,
+                limit=limit,
+                around=around,
+                friends_only=friends_only,
+            )
+            return self._to_response(
+                rows, current_user_uuid, limit, around, start_date, end_date
+            )
 
-            user_ids = None
-            if friends_only:
-                # Fetch friends
-                friends = await uow.friendship.get_friends(current_user_uuid)
-                friend_ids = []
-                for f in friends:
-                    if str(f.requester_id) == str(current_user_uuid):
-                        friend_ids.append(UUID(str(f.addressee_id)))
-                    else:
-                        friend_ids.append(UUID(str(f.requester_id)))
-
-                # Include current user
-                friend_ids.append(current_user_uuid)
-                user_ids = friend_ids
-
-            # Get top N entries
-            raw_entries = await repo.get_leaderboard(
-                metric, start_date=start_date, limit=limit, user_ids=user_ids
+    async def _get_cohort_leaderboard(
+        self,
+        uow: ABCUnitOfWork,
+        metric: LeaderboardMetric,
+        period: LeaderboardPeriod,
+        current_user_uuid: UUID,
+        limit: int,
+        timezone: str,
+        age_group: Optional[AgeGroup],
+        gender: Optional[CohortGender],
+        distance_band: Optional[DistanceBand],
+        around: int,
+    ) -> LeaderboardResponse:
+        if age_group is None or gender is None:
+            raise BadRequestException(
+                "Cohort leaderboards need both age_group and gender"
+            )
+        if period == LeaderboardPeriod.CUSTOM:
+            raise BadRequestException(
+                "Cohort leaderboards cover the current week, month or all time"
             )
 
-            entries = [
-                LeaderboardEntry(
-                    rank=row.rank,
-                    user_uuid=row.user_uuid,
-                    username=row.username,
-                    value=row.value or 0,
-                    is_current_user=(row.user_uuid == current_user_uuid),
-                )
-                for row in raw_entries
+        start_date, end_date = self._get_period_range(period, timezone, None, None)
+        period_key = self._get_period_key(period, start_date)
+        async with uow:
+            repo = LeaderboardRepository(uow.session)
+            rows = await repo.get_cohort_leaderboard(
+                current_user_uuid,
+                metric,
+                period,
+                period_key,
+                age_group,
+                gender,
+                distance_band,
+                limit=limit,
+                around=around,
+            )
+            return self._to_response(
+                rows, current_user_uuid, limit, around, start_date, end_date
+            )
+
+    async def refresh_snapshots(self, uow: ABCUnitOfWork) -> int:
+        """
+        Recompute the cohort snapshots of every period some time zone is in,
+        and drop the ones no time zone is in any more.
+
+        Returns:
+            Number of periods refreshed
+        """
+        now = datetime.now(dt_timezone.utc)
+        # Local dates range from a day behind UTC to a day ahead
+        days = [(now + timedelta(days=offset)).date() for offset in (-1, 0, 1)]
+        periods = [(LeaderboardPeriod.ALL_TIME, 0)]
+        for period in (LeaderboardPeriod.WEEK, LeaderboardPeriod.MONTH):
+            periods += sorted({(period, self._get_period_key(period, d)) for d in days})
+
+        async with uow:
+            repo = LeaderboardRepository(uow.session)
+            # Every worker schedules the refresh, the first one to get here
+            # does it in one transaction and the others skip it
+            if not await repo.lock_snapshots():
+                logger.info("Leaderboard snapshots are being refreshed elsewhere")
+                return 0
+            for period, period_key in periods:
+                await repo.refresh_snapshot(period, period_key, computed_at=now)
+            await repo.delete_snapshots_except(periods)
+
+        logger.info("Refreshed {count} leaderboard snapshots", count=len(periods))
+        return len(periods)
+
+    def _to_response(
+        self,
+        rows: List[Any],
+        current_user_uuid: UUID,
+        limit: int,
+        around: int,
+        start_date: Optional[date],
+        end_date: Optional[date],
+    ) -> LeaderboardResponse:
+        # Rows are in position order: the top limit, then the ones around the
+        # current user when they rank lower
+        entries = [
+            LeaderboardEntry(
+                rank=row.rank,
+                user_uuid=row.user_uuid,
+                username=row.username,
+                value=row.value or 0,
+                is_current_user=(row.user_uuid == current_user_uuid),
+            )
+            for row in rows
+        ]
+        positions = [row.position for row in rows]
+        own_position = next(
+            (row.position for row in rows if row.user_uuid == current_user_uuid),
+            None,
+        )
+
+        neighbors = []
+        if around and own_position is not None:
+            neighbors = [
+                entry
+                for entry, position in zip(entries, positions)
+                if abs(position - own_position) <= around
             ]
 
-            # Check if current user is in the top N
-            current_user_entry = None
-            user_in_top = any(e.user_uuid == current_user_uuid for e in entries)
+        return LeaderboardResponse(
+            entries=[e for e, p in zip(entries, positions) if p <= limit],
+            current_user_entry=next((e for e in entries if e.is_current_user), None),
+            neighbors=neighbors,
+            start_date=start_date,
+            end_date=end_date,
+        )
 
-            if user_in_top:
-                # Find the entry in the list
-                current_user_entry = next(
-                    e for e in entries if e.user_uuid == current_user_uuid
-                )
-            else:
-                # Fetch user's specific rank
-                raw_user_entry = await repo.get_user_entry(
-                    current_user_uuid, metric, start_date=start_date, user_ids=user_ids
+    def _get_period_key(self, period: LeaderboardPeriod, day: Optional[date]) -> int:
+        # Snapshots are keyed like the runs, by the week or month of local dates
+        if period == LeaderboardPeriod.WEEK:
+            return week_key(day)
+        elif period == LeaderboardPeriod.MONTH:
+            return month_key(day)
+        return 0
+
+    def _get_period_range(
+        self,
+        period: LeaderboardPeriod,
+        timezone: str,
+        start_date: Optional[date],
+        end_date: Optional[date],
+    ) -> Tuple[Optional[date], Optional[date]]:
+        """
+        First and last local date of the period, both None for all time.
+
+        Weeks and months are the current ones in the viewer's time zone,
+        matched against the local dates stored with every run.
+        """
+        if period == LeaderboardPeriod.CUSTOM:
+            if start_date is None or end_date is None:
+                raise BadRequestException(
+                    "start_date and end_date are required for a custom period"
                 )
-                if raw_user_entry:
-                    current_user_entry = LeaderboardEntry(
-                        rank=raw_user_entry.rank,
-                        user_uuid=raw_user_entry.user_uuid,
-                        username=raw_user_entry.username,
-                        value=raw_user_entry.value or 0,
-                        is_current_user=True,
-                    )
-
-            return LeaderboardResponse(
-                entries=entries, current_user_entry=current_user_entry
-            )
+            if start_date > end_date:
+                raise BadRequestException("start_date must not be after end_date")
+            return start_date, end_date
 
-    def _get_start_date(self, period: LeaderboardPeriod) -> Optional[datetime]:
-        now = datetime.now()
+        today = local_today(timezone)
         if period == LeaderboardPeriod.WEEK:
-            # Start of current week (Monday)
-            start_of_week = now - timedelta(days=now.weekday())
-            return start_of_week.replace(hour=0, minute=0, second=0, microsecond=0)
+            monday = today - timedelta(days=today.weekday())
+            return monday, monday + timedelta(days=6)
         elif period == LeaderboardPeriod.MONTH:
-            # Start of current month
-            return now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        elif period == LeaderboardPeriod.ALL_TIME:
-            return None
-        return None
+            first = today.replace(day=1)
+            next_month = (first + timedelta(days=31)).replace(day=1)
+            return first, next_month - timedelta(days=1)
+        return None, None
 
 
 def get_leaderboard_service() -> LeaderboardService:
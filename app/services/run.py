@@ -1,29 +1,59 @@
-from datetime import datetime, timedelta
+from datetime import timedelta
 from uuid import UUID
 
 from app.core.exc import ObjectNotFoundException
 from app.core.unit_of_work import ABCUnitOfWork
+from app.enums.feed import ActivityType
 from app.enums.run import RunSortBy, SortOrder
 from app.enums.statistics import StatisticsPeriod
 from app.models.run import Run
 from app.schemas.runs import RunCreateRequest, RunResponse, RunUpdateRequest
 from app.services.achievement import AchievementService, get_achievement_service
+from app.services.feed import FeedService, get_feed_service
+from app.utils.timezones import DEFAULT_TIMEZONE, local_period_keys, local_today
 
 
 class RunService:
-    def __init__(self, achievement_service: AchievementService):
+    def __init__(
+        self, achievement_service: AchievementService, feed_service: FeedService
+    ):
         self.achievement_service = achievement_service
+        self.feed_service = feed_service
 
     async def create_run(
-        self, uow: ABCUnitOfWork, user_uuid: UUID, data: RunCreateRequest
+        self,
+        uow: ABCUnitOfWork,
+        user_uuid: UUID,
+        data: RunCreateRequest,
+        timezone: str = DEFAULT_TIMEZONE,
     ) -> RunResponse:
         async with uow:
-            run_data = data.model_dump()
+            run_data = data.model_dump(exclude={"route", "route_compact"})
+            run_data["route"] = data.route_dicts()
             run_data["user_uuid"] = user_uuid
+            # Period keys are fixed in the time zone the run was recorded in
+            run_data.update(local_period_keys(data.start_time, timezone))
+            # Analytics totals are committed together with the run
+            await uow.run_totals.add_run(Run(**run_data))
             run = await uow.run.create_one(run_data)
 
+            await self.feed_service.publish(
+                uow,
+                user_uuid,
+                ActivityType.RUN,
+                run.uuid,
+                {
+                    "name": run.name,
+                    "distance": run.distance,
+                    "duration": run.duration,
+                    "start_time": run.start_time.isoformat(),
+                },
+            )
+
             # Check for achievements
-            await self.achievement_service.check_and_award_achievements(uow, user_uuid)
+            await self.achievement_service.check_and_award_achievements(
+                uow, user_uuid, timezone
+            )
 
             return RunResponse.model_validate(run)
 
@@ -38,20 +68,20 @@ class RunService:
         max_distance: float | None = None,
         sort_by: RunSortBy = RunSortBy.DATE,
         order: SortOrder = SortOrder.DESC,
+        timezone: str = DEFAULT_TIMEZONE,
     ) -> tuple[list[RunResponse], int]:
         async with uow:
             filters = [Run.user_uuid == user_uuid]
 
+            # Same local days as the statistics visualizations
             if period:
+                today = local_today(timezone)
                 if period == StatisticsPeriod.LAST_7_DAYS:
-                    start_date = datetime.now() - timedelta(days=7)
-                    filters.append(Run.start_time >= start_date)
+                    filters.append(Run.local_date >= today - timedelta(days=6))
                 elif period == StatisticsPeriod.LAST_30_DAYS:
-                    start_date = datetime.now() - timedelta(days=30)
-                    filters.append(Run.start_time >= start_date)
+                    filters.append(Run.local_date >= today - timedelta(days=29))
                 elif period == StatisticsPeriod.LAST_YEAR:
-                    start_date = datetime.now() - timedelta(days=365)
-                    filters.append(Run.start_time >= start_date)
+                    filters.append(Run.local_date >= today - timedelta(days=365))
                 # ALL_TIME needs no filter
 
             if min_distance is not None:
@@ -111,9 +141,11 @@ class RunService:
             if not run:
                 raise ObjectNotFoundException(run_uuid, "Run")
 
+            await uow.run_totals.remove_run(run)
+            await uow.challenge_best_time.remove_run(run_uuid)
             await uow.run.delete_one(run_uuid)
             return RunResponse.model_validate(run)
 
 
 def get_run_service() -> RunService:
-    return RunService(get_achievement_service())
+    return RunService(get_achievement_service(), get_feed_service())
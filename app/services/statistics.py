@@ -1,29 +1,39 @@
-from datetime import datetime, timedelta
-from typing import List
+from datetime import date, datetime, timedelta
+from datetime import timezone as dt_timezone
+from typing import Any, List
 from uuid import UUID
 
-from sqlalchemy import desc, func, select
+from sqlalchemy import Integer, and_, cast, func, select
 
 from app.core.unit_of_work import ABCUnitOfWork
 from app.enums.statistics import StatisticsPeriod
 from app.models.run import Run
 from app.schemas.statistics import (
+    PersonalBestResponse,
+    PersonalBestsResponse,
     PersonalRecords,
     StreakStats,
     TotalStats,
     UserStatisticsResponse,
     VisualizationDataPoint,
 )
+from app.utils.best_efforts import (
+    STANDARD_DISTANCES_METERS,
+    effort_pace,
+    find_best_efforts,
+)
+from app.utils.route_index import route_to_timed_points
+from app.utils.timezones import DEFAULT_TIMEZONE, local_today, month_key
 
 
 class StatisticsService:
     async def get_user_statistics(
-        self, uow: ABCUnitOfWork, user_uuid: UUID
+        self, uow: ABCUnitOfWork, user_uuid: UUID, timezone: str = DEFAULT_TIMEZONE
     ) -> UserStatisticsResponse:
         async with uow:
             totals = await self._calculate_totals(uow, user_uuid)
             personal_records = await self._calculate_personal_records(uow, user_uuid)
-            streaks = await self._calculate_streaks(uow, user_uuid)
+            streaks = await self._calculate_streaks(uow, user_uuid, timezone)
             return UserStatisticsResponse(
                 totals=totals,
                 streaks=streaks,
@@ -51,25 +61,16 @@ class StatisticsService:
     async def _calculate_personal_records(
         self, uow: ABCUnitOfWork, user_uuid: UUID
     ) -> PersonalRecords:
-        # Longest Distance
-        stmt_dist = select(func.max(Run.distance)).where(Run.user_uuid == user_uuid)
-        res_dist = await uow.session.execute(stmt_dist)
-        longest_dist = res_dist.scalar()
-
-        # Longest Duration
-        stmt_dur = select(func.max(Run.duration)).where(Run.user_uuid == user_uuid)
-        res_dur = await uow.session.execute(stmt_dur)
-        longest_dur = res_dur.scalar()
-
-        # Fastest Pace (min/km) - Lower is better.
-        # Pace = duration / distance. We need to handle division by zero.
-        # Let's fetch runs with distance > 0 and calculate in DB or Python.
-        # SQL: MIN(duration / distance)
-        stmt_pace = select(func.min(Run.duration / Run.distance)).where(
-            Run.user_uuid == user_uuid, Run.distance > 0
-        )
-        res_pace = await uow.session.execute(stmt_pace)
-        fastest_pace = res_pace.scalar()
+        # Longest distance, longest duration and fastest pace (min/km, lower
+        # is better) in one scan; runs without distance have no pace
+        stmt = select(
+            func.max(Run.distance),
+            func.max(Run.duration),
+            func.min(Run.duration / Run.distance).filter(Run.distance > 0),
+        ).where(Run.user_uuid == user_uuid)
+        longest_dist, longest_dur, fastest_pace = (
+            await uow.session.execute(stmt)
+        ).one()
 
         return PersonalRecords(
             fastest_pace=fastest_pace,
@@ -78,167 +79,216 @@ class StatisticsService:
         )
 
     async def _calculate_streaks(
-        self, uow: ABCUnitOfWork, user_uuid: UUID
+        self, uow: ABCUnitOfWork, user_uuid: UUID, timezone: str
     ) -> StreakStats:
-        stmt = (
-            select(func.date(Run.start_time))
+        # Gaps and islands: along consecutive days, day - row_number() stays
+        # constant, so every streak is one group of that anchor date
+        days = (
+            select(Run.local_date.label("day"))
             .where(Run.user_uuid == user_uuid)
             .distinct()
-            .order_by(desc(func.date(Run.start_time)))
+            .subquery()
+        )
+        islands = select(
+            days.c.day,
+            (
+                days.c.day - cast(func.row_number().over(order_by=days.c.day), Integer)
+            ).label("anchor"),
+        ).subquery()
+        streaks = (
+            select(
+                func.count().label("length"),
+                func.min(islands.c.day).label("first_day"),
+                func.max(islands.c.day).label("last_day"),
+            )
+            .group_by(islands.c.anchor)
+            .subquery()
         )
-        result = await uow.session.execute(stmt)
-        dates = [row[0] for row in result.all()]
-
-        if not dates:
-            return StreakStats(current_streak=0, longest_streak=0)
-
-        current_streak = 0
-        longest_streak = 0
-        temp_streak = 0
-
-        today = datetime.now().date()
-        yesterday = today - timedelta(days=1)
-
-        # Check if streak is active (run today or yesterday)
-        is_active = dates[0] == today or dates[0] == yesterday
-
-        if not is_active:
-            current_streak = 0
-
-        # Calculate streaks
-        # Dates are sorted desc (newest first)
-        # Example: [2023-10-25, 2023-10-24, 2023-10-22]
-
-        # Iterate backwards (oldest to newest) to easily count streaks?
-        # Or iterate desc and check diff?
-        # Let's sort asc for easier logic
-        dates.sort()
-
-        temp_streak = 1
-        longest_streak = 1
-
-        for i in range(1, len(dates)):
-            diff = (dates[i] - dates[i - 1]).days
-            if diff == 1:
-                temp_streak += 1
-            elif diff > 1:
-                longest_streak = max(longest_streak, temp_streak)
-                temp_streak = 1
-            # If diff == 0 (same day), ignore
 
-        longest_streak = max(longest_streak, temp_streak)
+        # A streak is still current if the user ran today or yesterday
+        today = local_today(timezone)
+        is_current = and_(
+            streaks.c.first_day <= today,
+            streaks.c.last_day >= today - timedelta(days=1),
+        )
+        stmt = select(
+            func.coalesce(func.max(streaks.c.length), 0),
+            func.coalesce(func.max(streaks.c.length).filter(is_current), 0),
+        )
+        longest_streak, current_streak = (await uow.session.execute(stmt)).one()
 
-        # Calculate current streak
-        # We need to check from today backwards
-        current_streak = 0
-        check_date = today
+        return StreakStats(current_streak=current_streak, longest_streak=longest_streak)
 
-        # If no run today, check if run yesterday to start streak count
-        if dates[-1] != today:
-            if dates[-1] == yesterday:
-                check_date = yesterday
-            else:
-                # Streak broken
-                return StreakStats(current_streak=0, longest_streak=longest_streak)
+    async def get_personal_bests(
+        self, uow: ABCUnitOfWork, user_uuid: UUID
+    ) -> PersonalBestsResponse:
+        async with uow:
+            bests = await uow.personal_best.get_user_bests(user_uuid)
+            return PersonalBestsResponse(
+                personal_bests=[
+                    PersonalBestResponse(
+                        distance=best.distance,
+                        duration=best.duration,
+                        pace=effort_pace(
+                            best.duration * 60,
+                            STANDARD_DISTANCES_METERS[best.distance],
+                        ),
+                        run_id=best.run_id,
+                        started_at=best.started_at,
+                    )
+                    for best in bests
+                ]
+            )
 
-        # Now count backwards from check_date
-        # We can use a set for O(1) lookup
-        dates_set = set(dates)
-        while check_date in dates_set:
-            current_streak += 1
-            check_date -= timedelta(days=1)
+    async def record_personal_bests(self, uow: ABCUnitOfWork, run_id: UUID) -> int:
+        """
+        Store the best efforts of a run.
 
-        return StreakStats(current_streak=current_streak, longest_streak=longest_streak)
+        Returns:
+            Number of distances the run has an effort for
+        """
+        async with uow:
+            run = await uow.run.get_one(uuid=run_id)
+            if run is None:
+                return 0
+            rows = self._personal_best_rows(run)
+            if rows:
+                await uow.personal_best.create_many(rows)
+            return len(rows)
+
+    async def backfill_personal_bests(
+        self, uow: ABCUnitOfWork, batch_size: int = 100
+    ) -> int:
+        """
+        Store the best efforts of every run with a route, in batches of runs.
+        Efforts already stored are kept.
+
+        Returns:
+            Number of efforts found
+        """
+        found = 0
+        last_uuid = None
+        async with uow:
+            while True:
+                stmt = (
+                    select(Run)
+                    .where(Run.route.is_not(None))
+                    .order_by(Run.uuid)
+                    .limit(batch_size)
+                )
+                if last_uuid is not None:
+                    stmt = stmt.where(Run.uuid > last_uuid)
+                runs = (await uow.session.execute(stmt)).scalars().all()
+                if not runs:
+                    return found
+
+                rows = [row for run in runs for row in self._personal_best_rows(run)]
+                if rows:
+                    await uow.personal_best.create_many(rows)
+                found += len(rows)
+                last_uuid = runs[-1].uuid
+                uow.session.expunge_all()
+
+    def _personal_best_rows(self, run: Run) -> List[dict]:
+        points, timestamps = route_to_timed_points(run.route)
+        return [
+            {
+                "run_id": run.uuid,
+                "distance": distance,
+                "user_uuid": run.user_uuid,
+                "duration": effort.seconds / 60,
+                "started_at": datetime.fromtimestamp(
+                    effort.start_time, tz=dt_timezone.utc
+                ),
+                "start_index": effort.start_index,
+                "end_index": effort.end_index,
+            }
+            for distance, effort in find_best_efforts(points, timestamps).items()
+        ]
 
     async def get_visualization_data(
-        self, uow: ABCUnitOfWork, user_uuid: UUID, period: StatisticsPeriod
+        self,
+        uow: ABCUnitOfWork,
+        user_uuid: UUID,
+        period: StatisticsPeriod,
+        timezone: str = DEFAULT_TIMEZONE,
     ) -> List[VisualizationDataPoint]:
+        today = local_today(timezone)
         async with uow:
             if period == StatisticsPeriod.LAST_7_DAYS:
-                start_date = datetime.now() - timedelta(days=6)
-                return await self._aggregate_runs(uow, user_uuid, start_date, "day")
+                start_date = today - timedelta(days=6)
+                return await self._aggregate_runs(
+                    uow, user_uuid, start_date, today, "day"
+                )
             elif period == StatisticsPeriod.LAST_30_DAYS:
-                start_date = datetime.now() - timedelta(days=29)
-                return await self._aggregate_runs(uow, user_uuid, start_date, "day")
+                start_date = today - timedelta(days=29)
+                return await self._aggregate_runs(
+                    uow, user_uuid, start_date, today, "day"
+                )
             elif period == StatisticsPeriod.LAST_YEAR:
-                start_date = datetime.now() - timedelta(days=365)
-                return await self._aggregate_runs(uow, user_uuid, start_date, "month")
+                start_date = today - timedelta(days=365)
+                return await self._aggregate_runs(
+                    uow, user_uuid, start_date, today, "month"
+                )
             else:
                 raise ValueError("Invalid period")
 
     async def _aggregate_runs(
-        self, uow: ABCUnitOfWork, user_uuid: UUID, start_date: datetime, group_by: str
+        self,
+        uow: ABCUnitOfWork,
+        user_uuid: UUID,
+        start_date: date,
+        end_date: date,
+        group_by: str,
     ) -> List[VisualizationDataPoint]:
-        # This is DB specific (Postgres).
-        # We need to truncate date.
-
+        # Buckets come from the local date and month key stored with every
+        # run, so the (user_uuid, local_date) index serves the range scan
         if group_by == "day":
-            date_trunc = func.date_trunc("day", Run.start_time)
-            label_fmt = "YYYY-MM-DD"
+            bucket = Run.local_date
         elif group_by == "month":
-            date_trunc = func.date_trunc("month", Run.start_time)
-            label_fmt = "YYYY-MM"
+            bucket = Run.month_key
         elif group_by == "year":
-            date_trunc = func.date_trunc("year", Run.start_time)
-            label_fmt = "YYYY"
+            bucket = func.div(Run.month_key, 100)
         else:
             raise ValueError("Invalid group_by")
 
         stmt = (
             select(
-                func.to_char(date_trunc, label_fmt).label("label"),
+                bucket.label("bucket"),
                 func.sum(Run.distance).label("distance"),
                 func.sum(Run.duration).label("duration"),
                 func.count(Run.uuid).label("count"),
             )
-            .where(Run.user_uuid == user_uuid, Run.start_time >= start_date)
-            .group_by("label")
-            .order_by("label")
+            .where(Run.user_uuid == user_uuid, Run.local_date >= start_date)
+            .group_by("bucket")
+            .order_by("bucket")
         )
 
         result = await uow.session.execute(stmt)
-        db_points = {
-            row.label: VisualizationDataPoint(
-                label=row.label,
+        db_points = {}
+        for row in result.all():
+            label = self._bucket_label(group_by, row.bucket)
+            db_points[label] = VisualizationDataPoint(
+                label=label,
                 distance=row.distance or 0.0,
                 duration=row.duration or 0.0,
                 count=row.count or 0,
             )
-            for row in result.all()
-        }
 
-        points = []
+        # Normalize start_date to the first day of its bucket
         current_date = start_date
-        end_date = datetime.now()
-
-        # Normalize start_date to ensure correct iteration
-        if group_by == "day":
-            # Reset time to midnight for daily iteration
-            current_date = current_date.replace(
-                hour=0, minute=0, second=0, microsecond=0
-            )
-        elif group_by == "month":
-            # Reset to first day of month
-            current_date = current_date.replace(
-                day=1, hour=0, minute=0, second=0, microsecond=0
-            )
+        if group_by == "month":
+            current_date = current_date.replace(day=1)
         elif group_by == "year":
-            current_date = current_date.replace(
-                month=1, day=1, hour=0, minute=0, second=0, microsecond=0
-            )
+            current_date = current_date.replace(month=1, day=1)
 
+        points = []
         while current_date <= end_date:
             if group_by == "day":
-                label = current_date.strftime(
-                    label_fmt.replace("YYYY", "%Y")
-                    .replace("MM", "%m")
-                    .replace("DD", "%d")
-                )
+                label = self._bucket_label(group_by, current_date)
                 next_date = current_date + timedelta(days=1)
             elif group_by == "month":
-                label = current_date.strftime(
-                    label_fmt.replace("YYYY", "%Y").replace("MM", "%m")
-                )
+                label = self._bucket_label(group_by, month_key(current_date))
                 # Increment month
                 if current_date.month == 12:
                     next_date = current_date.replace(
@@ -246,11 +296,9 @@ class StatisticsService:
                     )
                 else:
                     next_date = current_date.replace(month=current_date.month + 1)
-            elif group_by == "year":
-                label = current_date.strftime(label_fmt.replace("YYYY", "%Y"))
-                next_date = current_date.replace(year=current_date.year + 1)
             else:
-                break
+                label = self._bucket_label(group_by, current_date.year)
+                next_date = current_date.replace(year=current_date.year + 1)
 
             if label in db_points:
                 points.append(db_points[label])
@@ -268,6 +316,15 @@ class StatisticsService:
 
         return points
 
+    @staticmethod
+    def _bucket_label(group_by: str, bucket: Any) -> str:
+        # A local date, a month key such as 202610 or a year
+        if group_by == "day":
+            return bucket.strftime("%Y-%m-%d")
+        elif group_by == "month":
+            return f"{bucket // 100:04d}-{bucket % 100:02d}"
+        return f"{int(bucket):04d}"
+
 
 def get_statistics_service() -> StatisticsService:
     return StatisticsService()
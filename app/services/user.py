@@ -19,7 +19,14 @@ class UserService:
         """Update current user information."""
         async with uow:
             # Remove fields that shouldn't be updated directly
-            allowed_fields = {"username", "age", "gender", "height", "weight"}
+            allowed_fields = {
+                "username",
+                "age",
+                "gender",
+                "height",
+                "weight",
+                "timezone",
+            }
             filtered_data = {
                 k: v
                 for k, v in data.model_dump(exclude_unset=True).items()
@@ -27,6 +34,9 @@ class UserService:
             }
 
             user = await uow.user.update_one(user_uuid, filtered_data)
+            if "username" in filtered_data:
+                # Challenge cards keep a copy of the creator's display name
+                await uow.challenge.update_creator_name(user_uuid, user.username)
             return UserResponse.model_validate(user)
 
 
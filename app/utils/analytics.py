@@ -0,0 +1,85 @@
+"""
+Bucketing helpers for the run totals behind the analytics endpoints.
+"""
+
+import math
+from datetime import date, timedelta
+from typing import List
+
+from app.enums.analytics import AnalyticsGranularity
+from app.utils.timezones import month_key, week_key
+
+# Pace histogram: 15 s/km wide buckets from 2:00 to 20:00 min/km, slower and
+# faster paces are counted in the outermost buckets
+PACE_BUCKET_SECONDS = 15
+MIN_PACE_SECONDS = 120
+MAX_PACE_SECONDS = 1200
+
+
+def pace_bucket(duration: float, distance: float) -> int | None:
+    """
+    Lower bound, in seconds per km, of the pace histogram bucket of a run.
+
+    Args:
+        duration: Minutes
+        distance: Kilometers
+
+    Returns:
+        None for runs without distance
+    """
+    if distance <= 0:
+        return None
+    bucket = math.floor(duration * 60 / distance / PACE_BUCKET_SECONDS)
+    return min(max(bucket * PACE_BUCKET_SECONDS, MIN_PACE_SECONDS), MAX_PACE_SECONDS)
+
+
+def bucket_key(day: date, granularity: AnalyticsGranularity) -> int:
+    """
+    Week key, month key or year of the bucket containing day.
+    """
+    if granularity == AnalyticsGranularity.WEEK:
+        return week_key(day)
+    elif granularity == AnalyticsGranularity.MONTH:
+        return month_key(day)
+    return day.year
+
+
+def bucket_start(key: int, granularity: AnalyticsGranularity) -> date:
+    """
+    First day of the bucket with the given key.
+    """
+    if granularity == AnalyticsGranularity.WEEK:
+        return date.fromisocalendar(key // 100, key % 100, 1)
+    elif granularity == AnalyticsGranularity.MONTH:
+        return date(key // 100, key % 100, 1)
+    return date(key, 1, 1)
+
+
+def bucket_label(key: int, granularity: AnalyticsGranularity) -> str:
+    """
+    Display label of a bucket: 2026-W43, 2026-10 or 2026.
+    """
+    if granularity == AnalyticsGranularity.WEEK:
+        return f"{key // 100:04d}-W{key % 100:02d}"
+    elif granularity == AnalyticsGranularity.MONTH:
+        return f"{key // 100:04d}-{key % 100:02d}"
+    return f"{key:04d}"
+
+
+def bucket_keys(
+    start_date: date, end_date: date, granularity: AnalyticsGranularity
+) -> List[int]:
+    """
+    Keys of every bucket overlapping [start_date, end_date], in order.
+    """
+    keys = []
+    current = bucket_start(bucket_key(start_date, granularity), granularity)
+    while current <= end_date:
+        keys.append(bucket_key(current, granularity))
+        if granularity == AnalyticsGranularity.WEEK:
+            current += timedelta(days=7)
+        elif granularity == AnalyticsGranularity.MONTH:
+            current = (current + timedelta(days=31)).replace(day=1)
+        else:
+            current = current.replace(year=current.year + 1)
+    return keys
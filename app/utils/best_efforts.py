@@ -0,0 +1,97 @@
+"""
+Fastest efforts over standard distances within a timed route.
+"""
+
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+from app.enums.run import PersonalBestDistance
+from app.utils.distance_utils import cumulative_distances_meters
+from app.utils.route_index import Point
+
+STANDARD_DISTANCES_METERS: Dict[PersonalBestDistance, float] = {
+    PersonalBestDistance.KM_1: 1000.0,
+    PersonalBestDistance.KM_5: 5000.0,
+    PersonalBestDistance.KM_10: 10000.0,
+    PersonalBestDistance.HALF_MARATHON: 21097.5,
+    PersonalBestDistance.MARATHON: 42195.0,
+}
+
+# Efforts faster than this are GPS glitches, not running (the 1k world
+# record is about 2:12 min/km)
+MIN_SECONDS_PER_KM = 120.0
+
+
+class BestEffort(NamedTuple):
+    seconds: float
+    start_time: float  # POSIX seconds, interpolated within the first segment
+    start_index: int
+    end_index: int
+
+
+def find_best_efforts(
+    points: Sequence[Point],
+    timestamps: Sequence[Optional[float]],
+    distances: Dict[PersonalBestDistance, float] = STANDARD_DISTANCES_METERS,
+) -> Dict[PersonalBestDistance, BestEffort]:
+    """
+    Fastest stretch of the route covering each distance.
+
+    Points without a timestamp, or with one earlier than the point before,
+    are skipped. For every distance a two-pointer pass over the cumulative
+    distances keeps, for each end point, the latest start point whose window
+    still covers the distance; the window start is then interpolated within
+    its first segment so every effort is timed over exactly the distance.
+
+    Args:
+        points: Route as (latitude, longitude) tuples
+        timestamps: POSIX seconds per point, as from route_to_timed_points
+        distances: Target distances in meters
+
+    Returns:
+        Best effort per distance the route is long enough for; indices refer
+        to points
+    """
+    indices: List[int] = []
+    times: List[float] = []
+    for index, timestamp in enumerate(timestamps):
+        if timestamp is not None and (not times or timestamp >= times[-1]):
+            indices.append(index)
+            times.append(timestamp)
+    if len(times) < 2:
+        return {}
+
+    cumulative = cumulative_distances_meters([points[i] for i in indices])
+    total = cumulative[-1]
+    count = len(cumulative)
+
+    efforts = {}
+    for name, target in distances.items():
+        if total < target:
+            continue
+        min_seconds = target / 1000 * MIN_SECONDS_PER_KM
+        best: Optional[BestEffort] = None
+        i = 0
+        for j in range(1, count):
+            end_distance = cumulative[j]
+            if end_distance - cumulative[i] < target:
+                continue
+            while end_distance - cumulative[i + 1] >= target:
+                i += 1
+
+            # Drop the part of segment i the window doesn't need
+            segment = cumulative[i + 1] - cumulative[i]
+            excess = (end_distance - cumulative[i] - target) / segment
+            start_time = times[i] + (times[i + 1] - times[i]) * excess
+            seconds = times[j] - start_time
+            if seconds >= min_seconds and (best is None or seconds < best.seconds):
+                best = BestEffort(seconds, start_time, indices[i], indices[j])
+        if best is not None:
+            efforts[name] = best
+    return efforts
+
+
+def effort_pace(seconds: float, meters: float) -> float:
+    """
+    Pace of an effort in minutes per km.
+    """
+    return seconds / 60 / (meters / 1000)
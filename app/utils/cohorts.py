@@ -0,0 +1,72 @@
+"""
+Demographic cohorts of the leaderboards: age group x gender, optionally
+narrowed to a distance band.
+
+Users are bucketed in SQL when the leaderboard snapshots are filled; the
+expressions below are generated from these tables so there is one definition.
+"""
+
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import case, func
+
+from app.enums.leaderboard import AgeGroup, CohortGender, DistanceBand
+
+# Lower bounds, ascending
+AGE_GROUPS: List[Tuple[int, AgeGroup]] = [
+    (0, AgeGroup.UNDER_20),
+    (20, AgeGroup.AGE_20_29),
+    (30, AgeGroup.AGE_30_39),
+    (40, AgeGroup.AGE_40_49),
+    (50, AgeGroup.AGE_50_59),
+    (60, AgeGroup.AGE_60_69),
+    (70, AgeGroup.AGE_70_PLUS),
+]
+
+# Average run distance in km, lower bounds, ascending
+DISTANCE_BANDS: List[Tuple[float, DistanceBand]] = [
+    (0, DistanceBand.UNDER_5K),
+    (5, DistanceBand.FROM_5K_TO_10K),
+    (10, DistanceBand.FROM_10K_TO_HALF),
+    (21.0975, DistanceBand.HALF_PLUS),
+]
+
+# User.gender is free text; anything else is left out of gender cohorts
+GENDER_ALIASES: Dict[str, CohortGender] = {
+    "female": CohortGender.FEMALE,
+    "f": CohortGender.FEMALE,
+    "woman": CohortGender.FEMALE,
+    "male": CohortGender.MALE,
+    "m": CohortGender.MALE,
+    "man": CohortGender.MALE,
+}
+
+
+def age_group_expression(age: Any) -> Any:
+    """
+    AgeGroup value of an age column, NULL when it is missing or negative.
+    """
+    return case(*((age >= bound, group.value) for bound, group in reversed(AGE_GROUPS)))
+
+
+def gender_expression(gender: Any) -> Any:
+    """
+    CohortGender value of a free text gender column, NULL when unrecognized.
+    """
+    return case(
+        {alias: g.value for alias, g in GENDER_ALIASES.items()},
+        value=func.lower(func.trim(gender)),
+    )
+
+
+def distance_band_expression(distance: Any, runs: Any) -> Any:
+    """
+    DistanceBand value of the average distance of runs totalling distance km;
+    runs must be positive.
+    """
+    return case(
+        *(
+            (distance / runs >= bound, band.value)
+            for bound, band in reversed(DISTANCE_BANDS)
+        )
+    )
@@ -2,8 +2,12 @@
 Utilities for calculating distances between GPS coordinates.
 """
 
+import itertools
 import math
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Sequence
+
+# Earth's radius in meters
+EARTH_RADIUS_METERS = 6371000
 
 
 def calculate_distance_meters(
@@ -21,8 +25,7 @@ def calculate_distance_meters(
     Returns:
         Distance in meters
     """
-    # Earth's radius in meters
-    R = 6371000
+    R = EARTH_RADIUS_METERS
 
     # Convert degrees to radians
     lat1_rad = math.radians(lat1)
@@ -41,6 +44,51 @@ def calculate_distance_meters(
     return distance
 
 
+def segment_distances_meters(points: Sequence[Sequence[float]]) -> List[float]:
+    """
+    Haversine distance between each pair of consecutive points.
+
+    Same result as calling calculate_distance_meters on every pair, about
+    twice as fast: each point's cosine is computed once and reused for both
+    segments it belongs to, and the loop avoids per-pair function calls.
+
+    Args:
+        points: Sequence of (latitude, longitude) pairs in degrees
+
+    Returns:
+        List of len(points) - 1 distances in meters
+    """
+    if len(points) < 2:
+        return []
+
+    sin, cos, asin, sqrt = math.sin, math.cos, math.asin, math.sqrt
+    to_radians = math.pi / 180
+    half_radians = to_radians / 2
+    diameter = 2 * EARTH_RADIUS_METERS
+
+    distances: List[float] = []
+    append = distances.append
+    lat1, lng1 = points[0]
+    cos1 = cos(lat1 * to_radians)
+    for lat2, lng2 in points[1:]:
+        cos2 = cos(lat2 * to_radians)
+        sin_lat = sin((lat2 - lat1) * half_radians)
+        sin_lng = sin((lng2 - lng1) * half_radians)
+        a = sin_lat * sin_lat + cos1 * cos2 * sin_lng * sin_lng
+        append(diameter * asin(sqrt(a)))
+        lat1, lng1, cos1 = lat2, lng2, cos2
+    return distances
+
+
+def cumulative_distances_meters(points: Sequence[Sequence[float]]) -> List[float]:
+    """
+    Distance along the path from the first point to each point, in meters.
+    """
+    if not points:
+        return []
+    return list(itertools.accumulate(segment_distances_meters(points), initial=0.0))
+
+
 def points_within_radius(
     point1: Dict[str, Any], point2: Dict[str, Any], radius_meters: float = 100
 ) -> bool:
@@ -0,0 +1,184 @@
+"""
+Web mercator heatmap tiles: routes rasterized into 256x256 pixel counts.
+
+A tile stores, for every pixel a route passed through, the number of runs
+that did, as a sparse blob of pixel indices and counts. Each run counts once
+per pixel, so standing still at a crossing doesn't outweigh running past it.
+"""
+
+import math
+import struct
+import sys
+import zlib
+from array import array
+from typing import Dict, Iterable, List, Sequence, Set, Tuple
+
+TILE_SIZE = 256
+MIN_ZOOM = 0
+# About 4.8 m per pixel at the equator, finer than GPS accuracy
+MAX_ZOOM = 15
+# Consecutive points further apart are a recording gap, not a straight line
+MAX_GAP_PIXELS = 50
+
+# Tiles are shaded relative to their busiest pixel, but a route run only
+# once or twice shouldn't render at full intensity
+MIN_PEAK_COUNT = 4
+
+TileKey = Tuple[int, int, int]  # zoom, x, y
+Counts = Dict[int, int]  # pixel index (y * TILE_SIZE + x) to count
+
+
+def world_pixel(lat: float, lng: float, zoom: int) -> Tuple[float, float]:
+    """
+    Web mercator pixel coordinates of a point at a zoom level.
+    """
+    scale = TILE_SIZE * (1 << zoom)
+    sin_lat = min(max(math.sin(math.radians(lat)), -0.9999), 0.9999)
+    x = (lng + 180) / 360 * scale
+    y = (0.5 - math.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)) * scale
+    return x, y
+
+
+def route_pixels(points: Sequence[Tuple[float, float]]) -> Set[Tuple[int, int]]:
+    """
+    World pixels at MAX_ZOOM covered by the route's segments.
+    """
+    limit = TILE_SIZE * (1 << MAX_ZOOM) - 1
+    pixels: Set[Tuple[int, int]] = set()
+    previous = None
+    for lat, lng in points:
+        x, y = world_pixel(lat, lng, MAX_ZOOM)
+        current = (min(int(x), limit), min(int(y), limit))
+        pixels.add(current)
+        if previous is not None:
+            dx, dy = current[0] - previous[0], current[1] - previous[1]
+            steps = max(abs(dx), abs(dy))
+            if 1 < steps <= MAX_GAP_PIXELS:
+                for step in range(1, steps):
+                    pixels.add(
+                        (
+                            previous[0] + round(dx * step / steps),
+                            previous[1] + round(dy * step / steps),
+                        )
+                    )
+        previous = current
+    return pixels
+
+
+def route_tiles(
+    points: Sequence[Tuple[float, float]],
+    min_zoom: int = MIN_ZOOM,
+    max_zoom: int = MAX_ZOOM,
+) -> Dict[TileKey, List[int]]:
+    """
+    Pixel indices the route covers in every tile it crosses, at every zoom.
+    """
+    base = route_pixels(points)
+    tiles: Dict[TileKey, List[int]] = {}
+    for zoom in range(min_zoom, max_zoom + 1):
+        shift = MAX_ZOOM - zoom
+        pixels = {(x >> shift, y >> shift) for x, y in base} if shift else base
+        for x, y in pixels:
+            key = (zoom, x // TILE_SIZE, y // TILE_SIZE)
+            tiles.setdefault(key, []).append(
+                (y % TILE_SIZE) * TILE_SIZE + x % TILE_SIZE
+            )
+    return tiles
+
+
+def add_pixels(counts: Counts, pixels: Iterable[int], sign: int = 1) -> None:
+    """
+    Add (or with sign -1, remove) one run's pass through each pixel.
+    """
+    for pixel in pixels:
+        count = counts.get(pixel, 0) + sign
+        if count > 0:
+            counts[pixel] = count
+        else:
+            counts.pop(pixel, None)
+
+
+def encode_tile(counts: Counts) -> bytes:
+    """
+    Sorted little-endian uint16 pixel indices followed by uint32 counts.
+    """
+    pixels = sorted(counts)
+    indices = array("H", pixels)
+    values = array("I", [counts[p] for p in pixels])
+    if sys.byteorder == "big":
+        indices.byteswap()
+        values.byteswap()
+    return indices.tobytes() + values.tobytes()
+
+
+def decode_tile(data: bytes) -> Counts:
+    size = len(data) // 6
+    indices = array("H", data[: size * 2])
+    values = array("I", data[size * 2 :])
+    if sys.byteorder == "big":
+        indices.byteswap()
+        values.byteswap()
+    return dict(zip(indices, values))
+
+
+def merge_tiles(tiles: Iterable[bytes]) -> Counts:
+    """
+    Pixel counts of several users' copies of the same tile, summed.
+    """
+    merged: Counts = {}
+    for data in tiles:
+        for pixel, count in decode_tile(data).items():
+            merged[pixel] = merged.get(pixel, 0) + count
+    return merged
+
+
+def _palette() -> Tuple[bytes, bytes]:
+    # Index 0 is transparent; then red to yellow to white, more opaque as
+    # intensity grows
+    rgb, alpha = bytearray(), bytearray()
+    for i in range(256):
+        t = i / 255
+        rgb += bytes(
+            (255, min(255, int(510 * t)), max(0, min(255, int(510 * t - 255))))
+        )
+        alpha.append(0 if i == 0 else 96 + int(159 * t))
+    return bytes(rgb), bytes(alpha)
+
+
+PALETTE, PALETTE_ALPHA = _palette()
+
+
+def _png_chunk(kind: bytes, data: bytes) -> bytes:
+    return (
+        struct.pack(">I", len(data))
+        + kind
+        + data
+        + struct.pack(">I", zlib.crc32(kind + data))
+    )
+
+
+def render_png(counts: Counts) -> bytes:
+    """
+    Palette PNG of a tile, intensity on a log scale of the busiest pixel.
+    """
+    image = bytearray(TILE_SIZE * TILE_SIZE)
+    if counts:
+        scale = 254 / math.log1p(max(max(counts.values()), MIN_PEAK_COUNT))
+        for pixel, count in counts.items():
+            image[pixel] = 1 + int(math.log1p(count) * scale)
+
+    # Every scanline starts with filter type 0
+    rows = bytearray()
+    for row in range(TILE_SIZE):
+        rows.append(0)
+        rows += image[row * TILE_SIZE : (row + 1) * TILE_SIZE]
+
+    header = struct.pack(">IIBBBBB", TILE_SIZE, TILE_SIZE, 8, 3, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + _png_chunk(b"IHDR", header)
+        + _png_chunk(b"PLTE", PALETTE)
+        + _png_chunk(b"tRNS", PALETTE_ALPHA)
+        + _png_chunk(b"IDAT", zlib.compress(bytes(rows), 6))
+        + _png_chunk(b"IEND", b"")
+    )
@@ -0,0 +1,32 @@
+"""
+Opaque cursors for keyset pagination.
+"""
+
+import base64
+from datetime import datetime
+from uuid import UUID
+
+from app.core.exc import BadRequestException
+
+
+def encode_cursor(created_at: datetime, uuid: UUID) -> str:
+    """
+    Encode the sort key of the last returned row into a URL-safe cursor.
+    """
+    raw = f"{created_at.isoformat()}|{uuid}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Raises:
+        BadRequestException: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        created_at, uuid = raw.split("|")
+        return datetime.fromisoformat(created_at), UUID(uuid)
+    except (ValueError, UnicodeError):
+        raise BadRequestException("Invalid cursor")
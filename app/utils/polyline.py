@@ -0,0 +1,125 @@
+"""
+Route simplification and the encoded polyline format.
+
+Encoding follows the Google polyline algorithm (precision 5), which map SDKs
+on the clients decode natively.
+"""
+
+import itertools
+import math
+from typing import List, Tuple
+
+from app.utils.route_index import METERS_PER_DEGREE
+
+Point = Tuple[float, float]
+
+POLYLINE_PRECISION = 5
+
+
+def simplify_points(points: List[Point], tolerance_meters: float) -> List[Point]:
+    """
+    Simplify a polyline with the Ramer-Douglas-Peucker algorithm.
+
+    Args:
+        points: List of (latitude, longitude) tuples
+        tolerance_meters: Largest allowed distance between the simplified line
+            and any dropped point
+
+    Returns:
+        Subset of the points, always keeping the first and last one
+    """
+    if len(points) < 3:
+        return list(points)
+
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+
+    # Iterative to stay clear of the recursion limit on long routes
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        max_distance, max_idx = 0.0, first
+        for idx in range(first + 1, last):
+            distance = _perpendicular_distance(points[idx], points[first], points[last])
+            if distance > max_distance:
+                max_distance, max_idx = distance, idx
+
+        if max_distance > tolerance_meters:
+            keep[max_idx] = True
+            stack.append((first, max_idx))
+            stack.append((max_idx, last))
+
+    return [p for p, kept in zip(points, keep) if kept]
+
+
+def encode_polyline(points: List[Point], precision: int = POLYLINE_PRECISION) -> str:
+    """
+    Encode (latitude, longitude) points as a polyline string.
+    """
+    factor = 10**precision
+    chunks: List[str] = []
+    prev_lat = prev_lng = 0
+    for lat, lng in points:
+        lat_e = round(lat * factor)
+        lng_e = round(lng * factor)
+        chunks.append(_encode_value(lat_e - prev_lat))
+        chunks.append(_encode_value(lng_e - prev_lng))
+        prev_lat, prev_lng = lat_e, lng_e
+    return "".join(chunks)
+
+
+def decode_polyline(encoded: str, precision: int = POLYLINE_PRECISION) -> List[Point]:
+    """
+    Decode a polyline string into (latitude, longitude) points.
+
+    Raises:
+        ValueError: If the string is truncated or contains invalid characters
+    """
+    # One pass over the bytes collecting the deltas, then running sums
+    deltas: List[int] = []
+    result = shift = 0
+    for idx, char in enumerate(encoded):
+        byte = ord(char) - 63
+        if not 0 <= byte < 64:
+            raise ValueError(f"Invalid polyline character at position {idx}")
+        result |= (byte & 0x1F) << shift
+        if byte < 0x20:
+            deltas.append(~(result >> 1) if result & 1 else result >> 1)
+            result = shift = 0
+        else:
+            shift += 5
+    if shift or len(deltas) % 2:
+        raise ValueError("Truncated polyline")
+
+    factor = 10**precision
+    return [
+        (lat / factor, lng / factor)
+        for lat, lng in zip(
+            itertools.accumulate(deltas[0::2]), itertools.accumulate(deltas[1::2])
+        )
+    ]
+
+
+def _encode_value(value: int) -> str:
+    value = ~(value << 1) if value < 0 else value << 1
+    chunks = []
+    while value >= 0x20:
+        chunks.append(chr((0x20 | (value & 0x1F)) + 63))
+        value >>= 5
+    chunks.append(chr(value + 63))
+    return "".join(chunks)
+
+
+def _perpendicular_distance(point: Point, start: Point, end: Point) -> float:
+    # Local equirectangular projection around the segment start, in meters
+    cos_lat = math.cos(math.radians(start[0]))
+    px = (point[1] - start[1]) * cos_lat
+    py = point[0] - start[0]
+    ex = (end[1] - start[1]) * cos_lat
+    ey = end[0] - start[0]
+
+    length_sq = ex * ex + ey * ey
+    if length_sq == 0:
+        return math.hypot(px, py) * METERS_PER_DEGREE
+    t = max(0.0, min(1.0, (px * ex + py * ey) / length_sq))
+    return math.hypot(px - t * ex, py - t * ey) * METERS_PER_DEGREE
@@ -0,0 +1,596 @@
+"""
+Spatial index over a route's segments, used to match runs against challenge courses.
+
+The index is a plain dictionary so it can be stored in a JSONB column and reused
+for every attempt without reprocessing the source route.
+"""
+
+import math
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.utils.distance_utils import (
+    calculate_distance_meters,
+    cumulative_distances_meters,
+    segment_distances_meters,
+)
+
+# Meters per degree of latitude (and of longitude at the equator)
+METERS_PER_DEGREE = 111320.0
+
+# Default grid cell size; also the largest deviation a lookup can detect
+DEFAULT_CELL_SIZE_METERS = 100.0
+
+# Distance run between course endpoints, relative to the course length, for a
+# stretch of a route to count as a traversal
+MIN_TRAVERSAL_LENGTH_RATIO = 0.8
+MAX_TRAVERSAL_LENGTH_RATIO = 1.5
+
+# Fixed grid the ends of every challenge course are stored in, so the courses
+# a run may traverse come from an index lookup on their cells. Cells are square
+# in degrees: DEFAULT_CELL_SIZE_METERS high, narrower away from the equator
+ENDPOINT_CELL_DEGREES = DEFAULT_CELL_SIZE_METERS / METERS_PER_DEGREE
+# A cell id packs its row and column in one integer, columns offset to be
+# non-negative
+ENDPOINT_CELL_COLUMNS = 1 << 20
+
+Point = Tuple[float, float]
+BBox = Tuple[float, float, float, float]
+
+
+def route_to_points(route: Optional[List[Dict[str, Any]]]) -> List[Point]:
+    """
+    Convert a route into a list of (latitude, longitude) tuples.
+
+    Args:
+        route: List of GPS coordinate dictionaries
+
+    Returns:
+        List of points, skipping entries without valid coordinates
+    """
+    return route_to_timed_points(route)[0]
+
+
+def route_to_timed_points(
+    route: Optional[List[Dict[str, Any]]],
+) -> tuple[List[Point], List[Optional[float]]]:
+    """
+    Convert a route into points plus their timestamps.
+
+    Args:
+        route: List of GPS coordinate dictionaries
+
+    Returns:
+        Tuple of (points, timestamps) of equal length; timestamps are POSIX
+        seconds, or None where a point has no parseable timestamp
+    """
+    points: List[Point] = []
+    timestamps: List[Optional[float]] = []
+    for raw in route or []:
+        try:
+            lat = raw.get("latitude")
+            lng = raw.get("longitude")
+            if lat is None or lng is None:
+                continue
+            points.append((float(lat), float(lng)))
+        except (AttributeError, TypeError, ValueError):
+            continue
+        timestamps.append(parse_timestamp(raw.get("timestamp")))
+    return points, timestamps
+
+
+def parse_timestamp(value: Any) -> Optional[float]:
+    """
+    Parse a route point timestamp into POSIX seconds.
+
+    Accepts epoch seconds, epoch milliseconds and ISO 8601 strings.
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        # Anything past year 5138 in seconds is really milliseconds
+        return value / 1000 if value > 1e11 else float(value)
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            return None
+    return None
+
+
+def compute_bbox(points: List[Point]) -> Optional[BBox]:
+    """
+    Compute the bounding box of a list of points.
+
+    Returns:
+        Tuple of (min_lat, min_lng, max_lat, max_lng), or None for an empty list
+    """
+    if not points:
+        return None
+
+    lats = [p[0] for p in points]
+    lngs = [p[1] for p in points]
+    return min(lats), min(lngs), max(lats), max(lngs)
+
+
+def bboxes_overlap(a: BBox, b: BBox, margin_meters: float = 0.0) -> bool:
+    """
+    Check if two bounding boxes overlap, expanding the first one by a margin.
+
+    Args:
+        a: First bounding box (min_lat, min_lng, max_lat, max_lng)
+        b: Second bounding box
+        margin_meters: Distance by which the first box is grown on every side
+
+    Returns:
+        True if the boxes intersect
+    """
+    a = expand_bbox(a, margin_meters)
+    return not (b[2] < a[0] or b[0] > a[2] or b[3] < a[1] or b[1] > a[3])
+
+
+def expand_bbox(bbox: BBox, margin_meters: float) -> BBox:
+    """
+    Grow a bounding box by a margin in meters on every side.
+    """
+    lat_margin, lng_margin = _margin_degrees(margin_meters, (bbox[0] + bbox[2]) / 2)
+    return (
+        bbox[0] - lat_margin,
+        bbox[1] - lng_margin,
+        bbox[2] + lat_margin,
+        bbox[3] + lng_margin,
+    )
+
+
+def build_route_index(
+    route: Optional[List[Dict[str, Any]]],
+    cell_size_meters: float = DEFAULT_CELL_SIZE_METERS,
+) -> Optional[Dict[str, Any]]:
+    """
+    Build a uniform grid index of the route's segments.
+
+    Every segment is registered in each grid cell its bounding box touches, so
+    looking up a point only needs the segments stored in its 3x3 neighbourhood.
+
+    Args:
+        route: List of GPS coordinate dictionaries
+        cell_size_meters: Edge length of a grid cell in meters
+
+    Returns:
+        JSON-serializable index, or None if the route has no valid points
+    """
+    points = route_to_points(route)
+    bbox = compute_bbox(points)
+    if bbox is None:
+        return None
+
+    cell_lat, cell_lng = _margin_degrees(cell_size_meters, (bbox[0] + bbox[2]) / 2)
+
+    cells: Dict[str, List[int]] = {}
+    segment_count = max(len(points) - 1, 1)
+    for idx in range(segment_count):
+        p1 = points[idx]
+        p2 = points[min(idx + 1, len(points) - 1)]
+        i_min = math.floor(min(p1[0], p2[0]) / cell_lat)
+        i_max = math.floor(max(p1[0], p2[0]) / cell_lat)
+        j_min = math.floor(min(p1[1], p2[1]) / cell_lng)
+        j_max = math.floor(max(p1[1], p2[1]) / cell_lng)
+        for i in range(i_min, i_max + 1):
+            for j in range(j_min, j_max + 1):
+                cells.setdefault(f"{i}:{j}", []).append(idx)
+
+    return {
+        "bbox": list(bbox),
+        "cell_size_meters": cell_size_meters,
+        "cell_lat": cell_lat,
+        "cell_lng": cell_lng,
+        "points": [list(p) for p in points],
+        "length_meters": path_length_meters(points),
+        "cells": cells,
+    }
+
+
+def build_route_track(
+    points: List[Point], cell_size_meters: float = DEFAULT_CELL_SIZE_METERS
+) -> Optional[Dict[str, Any]]:
+    """
+    Build the lookups find_course_traversals needs on the run side.
+
+    Matching a run against many courses builds this once: cumulative distances
+    along the run and a grid of its points, so candidate courses are checked
+    against the cells the run enters instead of walking every point.
+
+    Args:
+        points: Run as (latitude, longitude) tuples
+        cell_size_meters: Edge length of a grid cell, at least the match radius
+            for may_traverse to be exact
+
+    Returns:
+        Track dictionary, or None if there are no points
+    """
+    bbox = compute_bbox(points)
+    if bbox is None:
+        return None
+
+    # Sized at the latitude farthest from the equator, so no cell is narrower
+    # than cell_size_meters anywhere on the run
+    cell_lat, cell_lng = _margin_degrees(
+        cell_size_meters, max(abs(bbox[0]), abs(bbox[2]))
+    )
+    cells: Dict[Tuple[int, int], List[int]] = {}
+    for idx, (lat, lng) in enumerate(points):
+        cell = (math.floor(lat / cell_lat), math.floor(lng / cell_lng))
+        cells.setdefault(cell, []).append(idx)
+
+    return {
+        "points": points,
+        "cumulative": cumulative_distances_meters(points),
+        "cell_size_meters": cell_size_meters,
+        "cell_lat": cell_lat,
+        "cell_lng": cell_lng,
+        "cells": cells,
+        # Cells holding a point or next to one: anything within a cell size
+        # of the run falls in one of them
+        "reach": {
+            (i + di, j + dj) for i, j in cells for di in (-1, 0, 1) for dj in (-1, 0, 1)
+        },
+    }
+
+
+def may_traverse(
+    indexes: List[Dict[str, Any]],
+    track: Dict[str, Any],
+    radius_meters: float = DEFAULT_CELL_SIZE_METERS,
+) -> List[bool]:
+    """
+    Cheap check that a run passes near both ends of each course.
+
+    Runs over the whole candidate list at once, as matching a run can check
+    many thousands of courses. False means find_course_traversals would find
+    nothing; True still needs the full search.
+
+    Returns:
+        One flag per index, in order
+    """
+    if radius_meters > track["cell_size_meters"]:
+        return [bool(index.get("points")) for index in indexes]
+
+    reach = track["reach"]
+    cell_lat, cell_lng = track["cell_lat"], track["cell_lng"]
+    floor = math.floor
+    flags = []
+    for index in indexes:
+        course = index.get("points")
+        if not course:
+            flags.append(False)
+            continue
+        start, end = course[0], course[-1]
+        flags.append(
+            (floor(start[0] / cell_lat), floor(start[1] / cell_lng)) in reach
+            and (floor(end[0] / cell_lat), floor(end[1] / cell_lng)) in reach
+        )
+    return flags
+
+
+def endpoint_cell(lat: float, lng: float) -> int:
+    """
+    Id of the endpoint grid cell holding a point.
+    """
+    row = math.floor(lat / ENDPOINT_CELL_DEGREES)
+    column = math.floor(lng / ENDPOINT_CELL_DEGREES)
+    return row * ENDPOINT_CELL_COLUMNS + column + ENDPOINT_CELL_COLUMNS // 2
+
+
+def endpoint_cells_near(points: List[Point], radius_meters: float) -> List[int]:
+    """
+    Ids of the endpoint grid cells within radius_meters of any of the points.
+
+    A course whose start and end cells are both in the list may be traversed
+    by a run over the points; any other course can't be.
+    """
+    bbox = compute_bbox(points)
+    if bbox is None:
+        return []
+
+    # Columns are narrowest at the latitude farthest from the equator
+    lat_margin, lng_margin = _margin_degrees(
+        radius_meters,
+        max(abs(bbox[0]), abs(bbox[2])) + radius_meters / METERS_PER_DEGREE,
+    )
+    row_reach = math.ceil(lat_margin / ENDPOINT_CELL_DEGREES)
+    column_reach = math.ceil(lng_margin / ENDPOINT_CELL_DEGREES)
+    base = {
+        (
+            math.floor(lat / ENDPOINT_CELL_DEGREES),
+            math.floor(lng / ENDPOINT_CELL_DEGREES),
+        )
+        for lat, lng in points
+    }
+    offset = ENDPOINT_CELL_COLUMNS // 2
+    return sorted(
+        {
+            (row + di) * ENDPOINT_CELL_COLUMNS + column + dj + offset
+            for row, column in base
+            for di in range(-row_reach, row_reach + 1)
+            for dj in range(-column_reach, column_reach + 1)
+        }
+    )
+
+
+def index_endpoints(
+    index: Dict[str, Any],
+) -> tuple[Optional[Dict], Optional[Dict]]:
+    """
+    Extract the first and last course points from an index.
+
+    Returns:
+        Tuple of (first_point, last_point) as coordinate dictionaries
+    """
+    points = index.get("points") or []
+    if not points:
+        return None, None
+
+    first, last = points[0], points[-1]
+    return (
+        {"latitude": first[0], "longitude": first[1]},
+        {"latitude": last[0], "longitude": last[1]},
+    )
+
+
+def point_deviation_meters(index: Dict[str, Any], lat: float, lng: float) -> float:
+    """
+    Distance from a point to the closest indexed segment.
+
+    Only segments in the point's cell and its neighbours are considered, so any
+    deviation larger than the cell size is reported as infinity.
+
+    Returns:
+        Distance in meters, or math.inf if no segment is nearby
+    """
+    points = index["points"]
+    cells = index["cells"]
+    i = math.floor(lat / index["cell_lat"])
+    j = math.floor(lng / index["cell_lng"])
+
+    best = math.inf
+    seen: set[int] = set()
+    for di in (-1, 0, 1):
+        for dj in (-1, 0, 1):
+            for seg in cells.get(f"{i + di}:{j + dj}", ()):
+                if seg in seen:
+                    continue
+                seen.add(seg)
+                p1 = points[seg]
+                p2 = points[min(seg + 1, len(points) - 1)]
+                best = min(best, _point_segment_distance(lat, lng, p1, p2))
+    return best
+
+
+def on_course_ratio(
+    index: Dict[str, Any],
+    points: List[Point],
+    tolerance_meters: float = DEFAULT_CELL_SIZE_METERS,
+) -> float:
+    """
+    Share of points that lie within tolerance of the indexed course.
+
+    Args:
+        index: Index built by build_route_index
+        points: List of (latitude, longitude) tuples to check
+        tolerance_meters: Maximum allowed deviation, capped at the cell size
+
+    Returns:
+        Ratio between 0 and 1 (0 for an empty list)
+    """
+    if not points:
+        return 0.0
+
+    on_course = sum(
+        1
+        for lat, lng in points
+        if point_deviation_meters(index, lat, lng) <= tolerance_meters
+    )
+    return on_course / len(points)
+
+
+def find_course_traversals(
+    index: Dict[str, Any],
+    track: Dict[str, Any],
+    radius_meters: float = DEFAULT_CELL_SIZE_METERS,
+    min_on_course_ratio: float = 0.9,
+) -> List[tuple[int, int]]:
+    """
+    Find every stretch of a run that runs the indexed course.
+
+    A traversal starts at the point closest to the course start, ends at the
+    point closest to the course end, covers roughly the course length in
+    between and stays on the course for at least min_on_course_ratio of its
+    points.
+
+    Args:
+        index: Index built by build_route_index
+        track: Run built by build_route_track
+        radius_meters: Radius around the course endpoints and allowed deviation
+        min_on_course_ratio: Share of points that must lie on the course
+
+    Returns:
+        List of (start_idx, end_idx) pairs into the track points, in run order
+    """
+    course = index.get("points") or []
+    if not course or not track:
+        return []
+
+    near_start = _points_near(track, course[0], radius_meters)
+    near_end = _points_near(track, course[-1], radius_meters)
+    if not near_start or not near_end:
+        return []
+
+    course_length = index.get("length_meters")
+    if course_length is None:
+        course_length = path_length_meters(course)
+    min_length = course_length * MIN_TRAVERSAL_LENGTH_RATIO - 2 * radius_meters
+    max_length = course_length * MAX_TRAVERSAL_LENGTH_RATIO + 2 * radius_meters
+
+    points = track["points"]
+    cumulative = track["cumulative"]
+    ends = sorted(near_end)
+
+    def closest_in_cluster(i: int, near: Dict[int, float]) -> tuple[int, int]:
+        # Walk the run of consecutive points within the radius
+        best = i
+        while i + 1 in near:
+            i += 1
+            if near[i] < near[best]:
+                best = i
+        return best, i
+
+    traversals: List[tuple[int, int]] = []
+    resume = 0
+    for i in sorted(near_start):
+        if i < resume:
+            continue
+
+        first, resume = closest_in_cluster(i, near_start)
+        resume += 1
+        # First point near the course end after covering the minimum length
+        k = bisect_left(
+            ends,
+            cumulative[first] + min_length,
+            lo=bisect_right(ends, first),
+            key=cumulative.__getitem__,
+        )
+        if k == len(ends) or cumulative[ends[k]] - cumulative[first] > max_length:
+            continue
+
+        last, _ = closest_in_cluster(ends[k], near_end)
+        stretch = points[first : last + 1]
+        if _stays_on_course(index, stretch, radius_meters, min_on_course_ratio):
+            traversals.append((first, last))
+            resume = last + 1
+
+    return traversals
+
+
+def path_length_meters(points: List[Any]) -> float:
+    """
+    Total length of a polyline given as (latitude, longitude) pairs.
+    """
+    return math.fsum(segment_distances_meters(points))
+
+
+# The point's own grid cell first, where a close segment most likely is
+_NEIGHBOURS = [(0, 0)] + [
+    (di, dj) for di in (-1, 0, 1) for dj in (-1, 0, 1) if (di, dj) != (0, 0)
+]
+
+
+def _stays_on_course(
+    index: Dict[str, Any],
+    points: List[Point],
+    tolerance_meters: float,
+    min_on_course_ratio: float,
+) -> bool:
+    # on_course_ratio(...) >= min_on_course_ratio, stopping as soon as too many
+    # points are off the course to reach it
+    allowed_off = len(points) - math.ceil(len(points) * min_on_course_ratio)
+    off = 0
+    for lat, lng in points:
+        if not _near_course(index, lat, lng, tolerance_meters):
+            off += 1
+            if off > allowed_off:
+                return False
+    return bool(points)
+
+
+def _near_course(
+    index: Dict[str, Any], lat: float, lng: float, tolerance_meters: float
+) -> bool:
+    # point_deviation_meters(...) <= tolerance_meters, on the local plane of
+    # _point_segment_distance and stopping at the first segment close enough,
+    # starting with the point's own cell
+    points = index["points"]
+    cells = index["cells"]
+    last = len(points) - 1
+    i = math.floor(lat / index["cell_lat"])
+    j = math.floor(lng / index["cell_lng"])
+    cos_lat = math.cos(math.radians(lat))
+    tolerance_sq = (tolerance_meters / METERS_PER_DEGREE) ** 2
+
+    for di, dj in _NEIGHBOURS:
+        for seg in cells.get(f"{i + di}:{j + dj}", ()):
+            p1 = points[seg]
+            p2 = points[seg + 1] if seg < last else p1
+            ax = (p1[1] - lng) * cos_lat
+            ay = p1[0] - lat
+            dx = (p2[1] - lng) * cos_lat - ax
+            dy = p2[0] - lat - ay
+            length_sq = dx * dx + dy * dy
+            t = 0.0
+            if length_sq:
+                t = max(0.0, min(1.0, -(ax * dx + ay * dy) / length_sq))
+            x = ax + t * dx
+            y = ay + t * dy
+            if x * x + y * y <= tolerance_sq:
+                return True
+    return False
+
+
+def _track_cell(track: Dict[str, Any], point: Any) -> Tuple[int, int]:
+    return (
+        math.floor(point[0] / track["cell_lat"]),
+        math.floor(point[1] / track["cell_lng"]),
+    )
+
+
+def _points_near(
+    track: Dict[str, Any], target: Any, radius_meters: float
+) -> Dict[int, float]:
+    # Indices of the track points within the radius, with their distances on a
+    # local equirectangular plane, exact enough at the scale of a few cells
+    i, j = _track_cell(track, target)
+    reach = math.ceil(radius_meters / track["cell_size_meters"])
+    points = track["points"]
+    cells = track["cells"]
+    target_lat, target_lng = target[0], target[1]
+    lng_scale = math.cos(math.radians(target_lat))
+    radius_sq = (radius_meters / METERS_PER_DEGREE) ** 2
+
+    near: Dict[int, float] = {}
+    for di in range(-reach, reach + 1):
+        for dj in range(-reach, reach + 1):
+            for idx in cells.get((i + di, j + dj), ()):
+                lat, lng = points[idx]
+                dy = lat - target_lat
+                dx = (lng - target_lng) * lng_scale
+                distance_sq = dx * dx + dy * dy
+                if distance_sq <= radius_sq:
+                    near[idx] = distance_sq
+    return near
+
+
+def _margin_degrees(meters: float, ref_lat: float) -> tuple[float, float]:
+    lat_deg = meters / METERS_PER_DEGREE
+    cos_lat = max(math.cos(math.radians(ref_lat)), 1e-6)
+    lng_deg = meters / (METERS_PER_DEGREE * cos_lat)
+    return lat_deg, lng_deg
+
+
+def _point_segment_distance(
+    lat: float, lng: float, p1: List[float], p2: List[float]
+) -> float:
+    # Project onto a local equirectangular plane around the query point;
+    # the error is negligible at the scale of a single grid cell.
+    cos_lat = math.cos(math.radians(lat))
+    ax = (p1[1] - lng) * cos_lat
+    ay = p1[0] - lat
+    bx = (p2[1] - lng) * cos_lat
+    by = p2[0] - lat
+
+    dx, dy = bx - ax, by - ay
+    length_sq = dx * dx + dy * dy
+    t = 0.0 if length_sq == 0 else max(0.0, min(1.0, -(ax * dx + ay * dy) / length_sq))
+
+    closest_lng = lng + (ax + t * dx) / cos_lat if cos_lat else lng
+    closest_lat = lat + ay + t * dy
+    return calculate_distance_meters(lat, lng, closest_lat, closest_lng)
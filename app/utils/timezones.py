@@ -0,0 +1,76 @@
+"""
+Helpers for the per-user time zone used to bucket runs into local days.
+"""
+
+from datetime import date, datetime, timezone
+from functools import lru_cache
+from typing import Any, Dict
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+DEFAULT_TIMEZONE = "UTC"
+
+
+def validate_timezone(name: str) -> str:
+    """
+    Check that name is a known IANA time zone, e.g. "Europe/Kyiv".
+
+    Raises:
+        ValueError: If the zone is unknown
+    """
+    try:
+        ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Unknown time zone: {name}")
+    return name
+
+
+@lru_cache(maxsize=512)
+def get_zone(name: str | None) -> ZoneInfo:
+    """
+    ZoneInfo for a stored time zone name, UTC when it is missing or unknown.
+    """
+    try:
+        return ZoneInfo(name or DEFAULT_TIMEZONE)
+    except (ZoneInfoNotFoundError, ValueError):
+        return ZoneInfo(DEFAULT_TIMEZONE)
+
+
+def local_today(name: str | None) -> date:
+    """
+    Current date in the given time zone.
+    """
+    return datetime.now(get_zone(name)).date()
+
+
+def week_key(day: date) -> int:
+    """
+    ISO week of a date as a sortable integer, e.g. 202642 for 2026-W42.
+    """
+    iso = day.isocalendar()
+    return iso.year * 100 + iso.week
+
+
+def month_key(day: date) -> int:
+    """
+    Month of a date as a sortable integer, e.g. 202610 for October 2026.
+    """
+    return day.year * 100 + day.month
+
+
+def local_period_keys(moment: datetime, name: str | None) -> Dict[str, Any]:
+    """
+    Local date, hour, ISO week and month keys of a run starting at moment, for
+    the Run.local_date, Run.local_hour, Run.week_key and Run.month_key columns.
+
+    Naive datetimes are taken as UTC, as the database stores them.
+    """
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    local = moment.astimezone(get_zone(name))
+    day = local.date()
+    return {
+        "local_date": day,
+        "local_hour": local.hour,
+        "week_key": week_key(day),
+        "month_key": month_key(day),
+    }
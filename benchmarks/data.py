@@ -0,0 +1,64 @@
+"""
+Synthetic runs and routes shaped like what the mobile app uploads.
+"""
+
+import math
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+from uuid import uuid4
+
+# Central Park, NYC
+ORIGIN = (40.7812, -73.9665)
+
+
+def make_route(
+    points: int, start: datetime | None = None, seed: int = 0
+) -> List[Dict[str, Any]]:
+    """
+    A 1 Hz GPS trace wandering at roughly 3 m/s, with the same keys as the
+    client payload.
+    """
+    rng = random.Random(seed)
+    start = start or datetime(2026, 1, 1, 7, tzinfo=timezone.utc)
+    lat, lng = ORIGIN
+    heading = rng.uniform(0, 2 * math.pi)
+    route = []
+    for i in range(points):
+        heading += rng.gauss(0, 0.1)
+        lat += math.cos(heading) * 3 / 111320
+        lng += math.sin(heading) * 3 / (111320 * math.cos(math.radians(lat)))
+        route.append(
+            {
+                "latitude": round(lat, 7),
+                "longitude": round(lng, 7),
+                "altitude": round(20 + rng.gauss(0, 2), 1),
+                "accuracy": round(rng.uniform(3, 10), 1),
+                "speed": round(rng.uniform(2.5, 3.5), 2),
+                "timestamp": (start + timedelta(seconds=i)).isoformat(),
+            }
+        )
+    return route
+
+
+def make_run(
+    points: int, user_uuid=None, seed: int = 0, start: datetime | None = None
+) -> Dict[str, Any]:
+    """
+    Attributes of a Run row with a generated route.
+    """
+    start = start or datetime(2026, 1, 1, 7, tzinfo=timezone.utc) + timedelta(days=seed)
+    duration = points / 60
+    return {
+        "uuid": uuid4(),
+        "user_uuid": user_uuid or uuid4(),
+        "name": f"Morning run {seed}",
+        "start_time": start,
+        "end_time": start + timedelta(minutes=duration),
+        "duration": duration,
+        "distance": points * 3 / 1000,
+        "calories": int(duration * 10),
+        "route": make_route(points, start, seed),
+        "created_at": start,
+        "updated_at": start,
+    }
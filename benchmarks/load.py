@@ -0,0 +1,511 @@
+"""
+Load test of the hot API endpoints against data from benchmarks.seed.
+
+    python -m benchmarks.load
+    python -m benchmarks.load --url http://localhost:8000 --concurrency 50
+    python -m benchmarks.load --scenario leaderboard --baseline results/old.json
+
+Without --url the app is driven in-process over ASGI, still backed by the
+database configured in .env, so results cover routing, services, queries and
+serialization but not the HTTP server. Every scenario runs for --duration
+seconds with --concurrency workers, each request authenticated as a random
+seeded user. Results are written as JSON to benchmarks/results/, named after
+the current commit, for comparison across commits with --baseline.
+
+Scenarios:
+    upload           POST /api/runs/ with a fresh route
+    statistics       GET /api/statistics/, the dashboard totals
+    visualization    GET /api/statistics/visualization, the dashboard chart
+    year_in_review   GET /api/analytics/year-in-review
+    weekly_series    GET /api/analytics/series, weekly over the last year
+    leaderboard      GET /api/leaderboard/, weekly distance
+    friends_board    GET /api/leaderboard/?friends_only=true
+    around_board     GET /api/leaderboard/?around=5, weekly distance
+    range_board      GET /api/leaderboard/ over a custom six-week range
+    cohort_board     GET /api/leaderboard/ of women 30-39, monthly distance
+    heatmap          GET /api/heatmap/{z}/{x}/{y}.png of the user and friends
+    challenges       GET /api/challenges/
+    challenge_cards  GET /api/challenges/?view=CARD
+    attempt          POST /api/challenges/{id}/attempt with one of the user's runs
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlencode, urlsplit
+from uuid import uuid4
+
+from sqlalchemy import func, select
+
+from app.core.db import async_session
+from app.models import Challenge, Run, User
+from app.schemas.leaderboard import LeaderboardMetric, LeaderboardPeriod
+from app.utils.heatmap import TILE_SIZE, world_pixel
+from app.utils.security import create_access_token
+from benchmarks.data import ORIGIN, make_route
+from benchmarks.seed import EMAIL_DOMAIN
+
+RESULTS_DIR = Path(__file__).parent / "results"
+SCENARIOS = (
+    "upload",
+    "statistics",
+    "visualization",
+    "year_in_review",
+    "weekly_series",
+    "leaderboard",
+    "friends_board",
+    "around_board",
+    "range_board",
+    "cohort_board",
+    "heatmap",
+    "challenges",
+    "challenge_cards",
+    "attempt",
+)
+# Zoom 13 tile around the seeded routes' origin
+HEATMAP_TILE = "/".join(
+    str(v) for v in (13, *(int(p) // TILE_SIZE for p in world_pixel(*ORIGIN, 13)))
+)
+# Built from the enums so the scenarios can't drift from the accepted values
+WEEKLY_DISTANCE = urlencode(
+    {"metric": LeaderboardMetric.DISTANCE.value, "period": LeaderboardPeriod.WEEK.value}
+)
+# Request is (method, path, JSON body or None)
+Request = Tuple[str, str, Optional[bytes]]
+
+
+@dataclass
+class SeededData:
+    users: List[Any]
+    runs: Dict[Any, List[Any]]
+    challenges: List[Any]
+    tokens: Dict[Any, str] = field(default_factory=dict)
+
+
+async def load_seeded_data(runs_per_user: int = 5) -> SeededData:
+    async with async_session() as session:
+        users = list(
+            await session.scalars(
+                select(User.uuid).where(User.email.like(f"%@{EMAIL_DOMAIN}"))
+            )
+        )
+        if not users:
+            raise SystemExit("No seeded users, run python -m benchmarks.seed first")
+
+        numbered = (
+            select(
+                Run.user_uuid,
+                Run.uuid,
+                func.row_number()
+                .over(partition_by=Run.user_uuid, order_by=Run.start_time.desc())
+                .label("n"),
+            )
+            .where(Run.user_uuid.in_(users))
+            .subquery()
+        )
+        runs: Dict[Any, List[Any]] = {}
+        for user_uuid, run_uuid in await session.execute(
+            select(numbered.c.user_uuid, numbered.c.uuid).where(
+                numbered.c.n <= runs_per_user
+            )
+        ):
+            runs.setdefault(user_uuid, []).append(run_uuid)
+
+        challenges = list(
+            await session.scalars(select(Challenge.uuid).where(Challenge.is_active))
+        )
+
+    tokens = {
+        user: create_access_token({"sub": str(user)}, timedelta(hours=12))
+        for user in users
+    }
+    return SeededData(users, runs, challenges, tokens)
+
+
+def upload_bodies(count: int = 20, points: int = 1800) -> List[bytes]:
+    bodies = []
+    for seed in range(count):
+        start = datetime.now(timezone.utc) - timedelta(hours=seed + 1)
+        route = make_route(points, start, seed)
+        bodies.append(
+            json.dumps(
+                {
+                    "name": "Load test run",
+                    "start_time": route[0]["timestamp"],
+                    "end_time": route[-1]["timestamp"],
+                    "duration": points / 60,
+                    "distance": points * 3 / 1000,
+                    "route": route,
+                }
+            ).encode()
+        )
+    return bodies
+
+
+def build_scenarios(data: SeededData) -> Dict[str, Callable[..., Request]]:
+    bodies = upload_bodies()
+    # Six weeks ending last Sunday
+    today = datetime.now(timezone.utc).date()
+    block_end = today - timedelta(days=today.isoweekday())
+    block_start = block_end - timedelta(days=41)
+
+    def attempt(rng: random.Random, user: Any) -> Request:
+        challenge = rng.choice(data.challenges)
+        run = rng.choice(data.runs.get(user) or [uuid4()])
+        body = json.dumps({"run_id": str(run)}).encode()
+        return "POST", f"/api/challenges/{challenge}/attempt", body
+
+    return {
+        "upload": lambda rng, user: ("POST", "/api/runs/", rng.choice(bodies)),
+        "statistics": lambda rng, user: ("GET", "/api/statistics/", None),
+        "visualization": lambda rng, user: (
+            "GET",
+            "/api/statistics/visualization?period=LAST_30_DAYS",
+            None,
+        ),
+        "year_in_review": lambda rng, user: (
+            "GET",
+            "/api/analytics/year-in-review",
+            None,
+        ),
+        "weekly_series": lambda rng, user: (
+            "GET",
+            "/api/analytics/series?granularity=WEEK",
+            None,
+        ),
+        "leaderboard": lambda rng, user: (
+            "GET",
+            f"/api/leaderboard/?{WEEKLY_DISTANCE}",
+            None,
+        ),
+        "friends_board": lambda rng, user: (
+            "GET",
+            f"/api/leaderboard/?{WEEKLY_DISTANCE}&friends_only=true",
+            None,
+        ),
+        "around_board": lambda rng, user: (
+            "GET",
+            f"/api/leaderboard/?{WEEKLY_DISTANCE}&around=5",
+            None,
+        ),
+        "range_board": lambda rng, user: (
+            "GET",
+            "/api/leaderboard/?metric=distance&period=custom"
+            f"&start_date={block_start}&end_date={block_end}",
+            None,
+        ),
+        "cohort_board": lambda rng, user: (
+            "GET",
+            "/api/leaderboard/?metric=distance&period=month"
+            "&age_group=30_39&gender=FEMALE",
+            None,
+        ),
+        "heatmap": lambda rng, user: (
+            "GET",
+            f"/api/heatmap/{HEATMAP_TILE}.png?scope=FRIENDS",
+            None,
+        ),
+        "challenges": lambda rng, user: ("GET", "/api/challenges/", None),
+        "challenge_cards": lambda rng, user: (
+            "GET",
+            "/api/challenges/?view=CARD",
+            None,
+        ),
+        "attempt": attempt,
+    }
+
+
+class AsgiClient:
+    """
+    Sends requests straight to the ASGI app, without sockets.
+
+    A request completes with its last response byte, like over HTTP; the app
+    call itself may continue with background tasks, awaited on close.
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+        self._pending: Set[asyncio.Task] = set()
+
+    async def request(
+        self, method: str, target: str, headers: Dict[str, str], body: bytes
+    ) -> Tuple[int, int]:
+        path, _, query = target.partition("?")
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "root_path": "",
+            "query_string": query.encode(),
+            "headers": [
+                (key.lower().encode(), value.encode()) for key, value in headers.items()
+            ],
+            "server": ("load", 80),
+            "client": ("load", 1),
+        }
+        status = 500
+        size = 0
+        body_sent = False
+        complete = asyncio.Event()
+
+        async def receive() -> dict:
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await complete.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message: dict) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+                if not message.get("more_body", False):
+                    complete.set()
+
+        task = asyncio.create_task(self.app(scope, receive, send))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+        waiter = asyncio.create_task(complete.wait())
+        await asyncio.wait({task, waiter}, return_when=asyncio.FIRST_COMPLETED)
+        waiter.cancel()
+        if task.done():
+            task.result()
+        return status, size
+
+    async def close(self) -> None:
+        await asyncio.gather(*self._pending, return_exceptions=True)
+
+
+class HttpClient:
+    """
+    Minimal HTTP/1.1 client keeping one connection alive, one per worker.
+    """
+
+    def __init__(self, url: str) -> None:
+        parts = urlsplit(url)
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port or 80
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def request(
+        self, method: str, target: str, headers: Dict[str, str], body: bytes
+    ) -> Tuple[int, int]:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(
+                self.host, self.port
+            )
+        head = [f"{method} {target} HTTP/1.1", f"Host: {self.host}:{self.port}"]
+        head += [f"{key}: {value}" for key, value in headers.items()]
+        head.append(f"Content-Length: {len(body)}")
+        self.writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + body)
+        await self.writer.drain()
+
+        status = int((await self.reader.readline()).split()[1])
+        response_headers = {}
+        while line := (await self.reader.readline()).strip():
+            key, _, value = line.decode().partition(":")
+            response_headers[key.lower()] = value.strip()
+
+        if response_headers.get("transfer-encoding") == "chunked":
+            size = 0
+            while chunk_size := int((await self.reader.readline()).strip(), 16):
+                size += len(await self.reader.readexactly(chunk_size + 2)) - 2
+            await self.reader.readline()
+        else:
+            size = len(
+                await self.reader.readexactly(
+                    int(response_headers.get("content-length", 0))
+                )
+            )
+
+        if response_headers.get("connection") == "close":
+            await self.close()
+        return status, size
+
+    async def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, round(q * len(values)) - 1))]
+
+
+async def run_scenario(
+    name: str,
+    make_request: Callable[..., Request],
+    data: SeededData,
+    client_factory: Callable[[], Any],
+    concurrency: int,
+    duration: float,
+    seed: int,
+) -> Dict[str, Any]:
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    received = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker(index: int) -> None:
+        nonlocal received
+        rng = random.Random(seed * 1000 + index)
+        client = client_factory()
+        try:
+            while time.perf_counter() < deadline:
+                user = rng.choice(data.users)
+                method, target, body = make_request(rng, user)
+                headers = {"Authorization": f"Bearer {data.tokens[user]}"}
+                if body is not None:
+                    headers["Content-Type"] = "application/json"
+                started = time.perf_counter()
+                status, size = await client.request(
+                    method, target, headers, body or b""
+                )
+                latencies.append((time.perf_counter() - started) * 1000)
+                statuses[str(status)] = statuses.get(str(status), 0) + 1
+                received += size
+        finally:
+            await client.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    errors = sum(count for status, count in statuses.items() if int(status) >= 500)
+    return {
+        "scenario": name,
+        "requests": len(latencies),
+        "errors": errors,
+        "statuses": statuses,
+        "duration_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "mean_kib": round(received / max(len(latencies), 1) / 1024, 1),
+        "p50_ms": round(percentile(latencies, 0.50), 2),
+        "p95_ms": round(percentile(latencies, 0.95), 2),
+        "p99_ms": round(percentile(latencies, 0.99), 2),
+        "max_ms": round(latencies[-1] if latencies else 0.0, 2),
+    }
+
+
+def current_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(
+    results: List[Dict[str, Any]], baseline: Optional[Dict[str, Any]]
+) -> None:
+    previous = {r["scenario"]: r for r in (baseline or {}).get("scenarios", [])}
+    for r in results:
+        line = (
+            f"{r['scenario']:<16} {r['throughput_rps']:>8.1f} req/s"
+            f"  p50 {r['p50_ms']:>7.1f}  p95 {r['p95_ms']:>7.1f}"
+            f"  p99 {r['p99_ms']:>7.1f} ms  errors {r['errors']}"
+        )
+        old = previous.get(r["scenario"])
+        if old and old["throughput_rps"] and r["p95_ms"]:
+            line += (
+                f"  vs baseline: x{r['throughput_rps'] / old['throughput_rps']:.2f}"
+                f" req/s, p95 x{r['p95_ms'] / old['p95_ms']:.2f}"
+            )
+        print(line)
+
+
+async def run_load_test(args: argparse.Namespace) -> Dict[str, Any]:
+    data = await load_seeded_data()
+    scenarios = build_scenarios(data)
+    if not data.challenges or not data.runs:
+        scenarios.pop("attempt")
+
+    if args.url:
+        client_factory = partial(HttpClient, args.url)
+    else:
+        from app.main import app
+
+        client_factory = partial(AsgiClient, app)
+
+    results = []
+    for name in args.scenario or SCENARIOS:
+        if name not in scenarios:
+            continue
+        results.append(
+            await run_scenario(
+                name,
+                scenarios[name],
+                data,
+                client_factory,
+                args.concurrency,
+                args.duration,
+                args.seed,
+            )
+        )
+
+    return {
+        "commit": current_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "target": args.url or "asgi",
+        "concurrency": args.concurrency,
+        "duration_s": args.duration,
+        "users": len(data.users),
+        "scenarios": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", help="Base URL of a running server")
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=SCENARIOS,
+        help="Scenario to run, repeatable; all by default",
+    )
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=30, help="Seconds each")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="Results file")
+    parser.add_argument("--baseline", type=Path, help="Results file to compare to")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_load_test(args))
+    baseline = json.loads(args.baseline.read_text()) if args.baseline else None
+    print_results(report["scenarios"], baseline)
+
+    output = args.output or RESULTS_DIR / (
+        f"{report['created_at'][:19].replace(':', '')}-{report['commit'] or 'local'}"
+        ".json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,374 @@
+"""
+Microbenchmarks of the distance and route processing primitives.
+
+    python -m benchmarks.micro
+    python -m benchmarks.micro --sizes 1000 10000 --check
+
+Every case is timed on 1k, 10k and 100k point routes and reported per point.
+--check fails (exit status 1) when a case is slower than its budget in
+BUDGETS_NS_PER_POINT, or when a faster variant loses its expected speedup
+over the reference in MIN_SPEEDUPS; test_route_performance.py runs the
+speedup checks under pytest --benchmarks.
+
+Cases:
+    haversine/scalar      calculate_distance_meters on every consecutive pair
+    haversine/batch       segment_distances_meters
+    haversine/numpy       the same formula vectorized with numpy, including the
+                          list to array conversion; only when numpy is installed,
+                          as a reference (it is not a dependency of the app)
+    decode/dicts          route_to_points on stored point dictionaries
+    decode/arrays         CompactRoute validation of parallel latitude/longitude
+                          arrays and to_route, as on upload
+    decode/polyline       decode_polyline
+    endpoints/extract     extract_route_endpoints
+    index/build           build_route_index
+    efforts/best          find_best_efforts over the standard distances
+    heatmap/tiles         route_tiles at every zoom level
+
+Challenge matching is timed separately, once, for a 5k point run:
+    match/full            ChallengeService.match_run without the writes, against
+                          100k challenges starting within 15 km, 10 of them cut
+                          from the run: decoding the run, its track and endpoint
+                          cells, the candidate query, loading the route indexes
+                          it returns, may_traverse and find_course_traversals;
+                          budget MATCH_BUDGET_MS. The query is a lookup of the
+                          rows by start cell standing in for Postgres, so its
+                          index scan is not part of the timing
+    match/dense           may_traverse and find_course_traversals over 100k
+                          courses with both ends in the run's bounding box, the
+                          worst case the endpoint cells can let through;
+                          reported only
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from app.schemas.runs import CompactRoute
+from app.utils.best_efforts import find_best_efforts
+from app.utils.distance_utils import (
+    EARTH_RADIUS_METERS,
+    calculate_distance_meters,
+    extract_route_endpoints,
+    segment_distances_meters,
+)
+from app.utils.heatmap import route_tiles
+from app.utils.polyline import decode_polyline, encode_polyline
+from app.utils.route_index import (
+    METERS_PER_DEGREE,
+    BBox,
+    build_route_index,
+    build_route_track,
+    compute_bbox,
+    endpoint_cell,
+    endpoint_cells_near,
+    expand_bbox,
+    find_course_traversals,
+    may_traverse,
+    route_to_points,
+    route_to_timed_points,
+)
+from benchmarks.data import ORIGIN, make_route
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+SIZES = (1000, 10000, 100000)
+
+# Generous ceilings, about 3x what a current laptop measures, so only real
+# regressions trip them; endpoint extraction is O(1), so per route
+BUDGETS_NS_PER_POINT: Dict[str, float] = {
+    "haversine/scalar": 3000,
+    "haversine/batch": 1500,
+    "haversine/numpy": 800,
+    "decode/dicts": 3000,
+    "decode/arrays": 1000,
+    "decode/polyline": 3000,
+    "index/build": 20000,
+    "efforts/best": 10000,
+    "heatmap/tiles": 30000,
+}
+ENDPOINT_BUDGET_NS = 5000
+
+MATCH_RUN_POINTS = 5000
+MATCH_CANDIDATES = 100000
+MATCH_RADIUS_METERS = 100
+# Radius the challenge courses start in, and how many are cut from the run
+MATCH_AREA_METERS = 15000
+MATCH_RUN_COURSES = 10
+MATCH_BUDGET_MS = 100
+
+# (case, reference, minimum speedup) at every size of at least 10k points
+MIN_SPEEDUPS: List[Tuple[str, str, float]] = [
+    ("haversine/batch", "haversine/scalar", 1.8),
+    ("decode/arrays", "decode/dicts", 2.0),
+]
+
+
+def numpy_segment_distances(points: List[Tuple[float, float]]) -> List[float]:
+    flat = numpy.fromiter((v for p in points for v in p), float, 2 * len(points))
+    coords = numpy.radians(flat.reshape(-1, 2))
+    lats, lngs = coords[:, 0], coords[:, 1]
+    cos_lats = numpy.cos(lats)
+    a = (
+        numpy.sin(numpy.diff(lats) / 2) ** 2
+        + cos_lats[:-1] * cos_lats[1:] * numpy.sin(numpy.diff(lngs) / 2) ** 2
+    )
+    return (2 * EARTH_RADIUS_METERS * numpy.arcsin(numpy.sqrt(a))).tolist()
+
+
+def build_cases(points: int) -> Dict[str, Callable[[], Any]]:
+    route = make_route(points)
+    coords, timestamps = route_to_timed_points(route)
+    latitudes = [p["latitude"] for p in route]
+    longitudes = [p["longitude"] for p in route]
+    polyline = encode_polyline(coords)
+
+    def scalar() -> List[float]:
+        return [
+            calculate_distance_meters(p1[0], p1[1], p2[0], p2[1])
+            for p1, p2 in zip(coords, coords[1:])
+        ]
+
+    cases: Dict[str, Callable[[], Any]] = {
+        "haversine/scalar": scalar,
+        "haversine/batch": lambda: segment_distances_meters(coords),
+    }
+    if numpy is not None:
+        cases["haversine/numpy"] = lambda: numpy_segment_distances(coords)
+    cases.update(
+        {
+            "decode/dicts": lambda: route_to_points(route),
+            "decode/arrays": lambda: CompactRoute.model_validate(
+                {"latitude": latitudes, "longitude": longitudes}
+            ).to_route(),
+            "decode/polyline": lambda: decode_polyline(polyline),
+            "endpoints/extract": lambda: extract_route_endpoints(route),
+            "index/build": lambda: build_route_index(route),
+            "efforts/best": lambda: find_best_efforts(coords, timestamps),
+            "heatmap/tiles": lambda: route_tiles(coords),
+        }
+    )
+    return cases
+
+
+def build_match_cases() -> Dict[str, Callable[[], Any]]:
+    route = make_route(MATCH_RUN_POINTS)
+    points = route_to_points(route)
+    rng = random.Random(0)
+
+    def course_near(lat: float, lng: float, meters: float) -> Dict[str, float]:
+        return {
+            "latitude": lat + rng.uniform(-meters, meters) / METERS_PER_DEGREE,
+            "longitude": lng + rng.uniform(-meters, meters) / METERS_PER_DEGREE,
+        }
+
+    run_cells = set(endpoint_cells_near(points, MATCH_RADIUS_METERS))
+
+    def row(course: List[Dict[str, float]]) -> Dict[str, Any]:
+        course_points = route_to_points(course)
+        start_cell = endpoint_cell(*course_points[0])
+        end_cell = endpoint_cell(*course_points[-1])
+        route_index = None
+        # Only the rows the query can return are ever loaded, so skip building
+        # the others' indexes
+        if start_cell in run_cells and end_cell in run_cells:
+            # As the JSONB column comes back from the driver
+            route_index = json.dumps(build_route_index(course, MATCH_RADIUS_METERS))
+        return {
+            "bbox": compute_bbox(course_points),
+            "start_cell": start_cell,
+            "end_cell": end_cell,
+            "route_index": route_index,
+        }
+
+    # Courses of up to 4 km across the metro area, plus a few cut from the run
+    rows = []
+    for _ in range(MATCH_CANDIDATES - MATCH_RUN_COURSES):
+        start = course_near(*ORIGIN, MATCH_AREA_METERS)
+        end = course_near(start["latitude"], start["longitude"], 3000)
+        rows.append(row([start, end]))
+    step = MATCH_RUN_POINTS // MATCH_RUN_COURSES
+    rows.extend(row(route[i : i + step // 2]) for i in range(0, MATCH_RUN_POINTS, step))
+
+    # Stand-in for ix_challenges_active_endpoints
+    by_start_cell: Dict[int, List[Dict[str, Any]]] = {}
+    for candidate in rows:
+        by_start_cell.setdefault(candidate["start_cell"], []).append(candidate)
+
+    def select_candidates(bbox: BBox, cells: List[int]) -> List[Dict[str, Any]]:
+        # ChallengeRepository.get_within_bbox over the rows
+        cell_set = set(cells)
+        return [
+            {**candidate, "route_index": json.loads(candidate["route_index"])}
+            for cell in cells
+            for candidate in by_start_cell.get(cell, ())
+            if candidate["end_cell"] in cell_set
+            and candidate["bbox"][0] >= bbox[0]
+            and candidate["bbox"][1] >= bbox[1]
+            and candidate["bbox"][2] <= bbox[2]
+            and candidate["bbox"][3] <= bbox[3]
+        ]
+
+    def match(candidates: List[Dict[str, Any]], track: Dict[str, Any]) -> int:
+        indexes = [c["route_index"] for c in candidates]
+        kept = may_traverse(indexes, track, MATCH_RADIUS_METERS)
+        return sum(
+            1
+            for index, keep in zip(indexes, kept)
+            if keep and find_course_traversals(index, track, MATCH_RADIUS_METERS)
+        )
+
+    def full() -> int:
+        # ChallengeService.match_run without the writes
+        run_points, _ = route_to_timed_points(route)
+        track = build_route_track(run_points, MATCH_RADIUS_METERS)
+        bbox = expand_bbox(compute_bbox(run_points), MATCH_RADIUS_METERS)
+        cells = endpoint_cells_near(run_points, MATCH_RADIUS_METERS)
+        return match(select_candidates(bbox, cells), track)
+
+    # Every course with both ends inside the run's bounding box, as if the
+    # endpoint cells did not narrow anything down
+    min_lat, min_lng, max_lat, max_lng = compute_bbox(points)
+    dense = [
+        build_route_index(
+            [
+                {
+                    "latitude": rng.uniform(min_lat, max_lat),
+                    "longitude": rng.uniform(min_lng, max_lng),
+                }
+                for _ in range(2)
+            ],
+            MATCH_RADIUS_METERS,
+        )
+        for _ in range(1000)
+    ]
+    dense = [{"route_index": index} for index in dense] * (
+        MATCH_CANDIDATES // len(dense)
+    )
+
+    def worst_case() -> int:
+        return match(dense, build_route_track(points, MATCH_RADIUS_METERS))
+
+    return {"match/full": full, "match/dense": worst_case}
+
+
+def measure(func: Callable[[], Any], min_time: float = 0.2) -> float:
+    """Median seconds per call over enough calls to fill min_time."""
+    func()  # warm-up
+    started = time.perf_counter()
+    func()
+    once = max(time.perf_counter() - started, 1e-7)
+    number = max(1, min(1000, int(0.02 / once)))
+    repeat = max(3, int(min_time / (once * number)))
+
+    timings = []
+    for _ in range(min(repeat, 25)):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - started) / number)
+    return statistics.median(timings)
+
+
+def run_benchmarks(sizes=SIZES, min_time: float = 0.2) -> Dict[int, Dict[str, float]]:
+    """Seconds per call of every case, by route size."""
+    return {
+        points: {
+            name: measure(func, min_time) for name, func in build_cases(points).items()
+        }
+        for points in sizes
+    }
+
+
+def run_match_benchmarks(min_time: float = 0.2) -> Dict[str, float]:
+    """Seconds per call of every matching case."""
+    return {name: measure(func, min_time) for name, func in build_match_cases().items()}
+
+
+def check_match_budget(timings: Dict[str, float]) -> List[str]:
+    actual = timings["match/full"] * 1000
+    if actual > MATCH_BUDGET_MS:
+        return [
+            f"match/full with {MATCH_CANDIDATES} challenges: {actual:.0f} ms,"
+            f" budget {MATCH_BUDGET_MS} ms"
+        ]
+    return []
+
+
+def check_speedups(results: Dict[int, Dict[str, float]]) -> List[str]:
+    failures = []
+    for points, timings in results.items():
+        if points < 10000:
+            continue
+        for case, reference, minimum in MIN_SPEEDUPS:
+            if case not in timings:
+                continue
+            speedup = timings[reference] / timings[case]
+            if speedup < minimum:
+                failures.append(
+                    f"{case} at {points} points: x{speedup:.1f} over {reference},"
+                    f" expected at least x{minimum}"
+                )
+    return failures
+
+
+def check_budgets(results: Dict[int, Dict[str, float]]) -> List[str]:
+    failures = []
+    for points, timings in results.items():
+        for case, seconds in timings.items():
+            if case == "endpoints/extract":
+                actual, budget, unit = seconds * 1e9, ENDPOINT_BUDGET_NS, "ns"
+            else:
+                actual = seconds * 1e9 / points
+                budget, unit = BUDGETS_NS_PER_POINT[case], "ns/point"
+            if actual > budget:
+                failures.append(
+                    f"{case} at {points} points: {actual:.0f} {unit},"
+                    f" budget {budget:.0f}"
+                )
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--min-time", type=float, default=0.2, help="Seconds per case")
+    parser.add_argument("--check", action="store_true", help="Enforce thresholds")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.sizes, args.min_time)
+    for points, timings in results.items():
+        print(f"{points} points")
+        for case, seconds in timings.items():
+            print(
+                f"  {case:<18} {seconds * 1000:>10.3f} ms"
+                f" {seconds * 1e9 / points:>9.1f} ns/point"
+            )
+
+    match_timings = run_match_benchmarks(args.min_time)
+    print(f"{MATCH_RUN_POINTS} point run, {MATCH_CANDIDATES} challenges")
+    for case, seconds in match_timings.items():
+        print(f"  {case:<18} {seconds * 1000:>10.3f} ms")
+
+    if args.check:
+        failures = (
+            check_budgets(results)
+            + check_speedups(results)
+            + check_match_budget(match_timings)
+        )
+        for failure in failures:
+            print(f"FAIL {failure}")
+        if failures:
+            sys.exit(1)
+        print("All thresholds met")
+
+
+if __name__ == "__main__":
+    main()
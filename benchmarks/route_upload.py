@@ -0,0 +1,101 @@
+"""
+Run upload parsing benchmark: JSON body to storable route.
+
+    python -m benchmarks.route_upload
+    python -m benchmarks.route_upload --points 10000 --repeat 20
+
+Encodings compared:
+    dicts      untyped List[Dict[str, Any]], the previous request schema
+    points     List[RoutePoint], validated point by point
+    arrays     CompactRoute parallel arrays
+    polyline   CompactRoute encoded polyline plus timestamp array
+"""
+
+import argparse
+import json
+import statistics
+import time
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel
+
+from app.schemas.runs import RunCreateRequest
+from app.utils.polyline import encode_polyline
+from app.utils.route_index import parse_timestamp
+from benchmarks.data import make_route
+
+
+class LegacyRunCreateRequest(BaseModel):
+    start_time: str
+    end_time: str
+    duration: float
+    distance: float
+    route: Optional[List[Dict[str, Any]]] = None
+
+
+def build_bodies(points: int) -> Dict[str, bytes]:
+    route = make_route(points)
+    run = {
+        "start_time": route[0]["timestamp"],
+        "end_time": route[-1]["timestamp"],
+        "duration": points / 60,
+        "distance": points * 3 / 1000,
+    }
+    arrays = {
+        key: [p[key] for p in route]
+        for key in ("latitude", "longitude", "accuracy", "altitude", "speed")
+    }
+    timestamps = [parse_timestamp(p["timestamp"]) for p in route]
+
+    return {
+        "dicts": json.dumps({**run, "route": route}).encode(),
+        "points": json.dumps({**run, "route": route}).encode(),
+        "arrays": json.dumps(
+            {**run, "route_compact": {**arrays, "timestamp": timestamps}}
+        ).encode(),
+        "polyline": json.dumps(
+            {
+                **run,
+                "route_compact": {
+                    "polyline": encode_polyline(
+                        list(zip(arrays["latitude"], arrays["longitude"]))
+                    ),
+                    "timestamp": timestamps,
+                },
+            }
+        ).encode(),
+    }
+
+
+def parse(encoding: str, body: bytes) -> Any:
+    if encoding == "dicts":
+        return LegacyRunCreateRequest.model_validate_json(body).route
+    return RunCreateRequest.model_validate_json(body).route_dicts()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--points", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    bodies = build_bodies(args.points)
+    reference = None
+    for encoding, body in bodies.items():
+        parse(encoding, body)  # warm-up
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            parse(encoding, body)
+            timings.append((time.perf_counter() - started) * 1000)
+
+        median = statistics.median(timings)
+        reference = reference or median
+        print(
+            f"{encoding:<9} {len(body) / 1024:>7.0f} KiB {median:>8.2f} ms"
+            f"  x{reference / median:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""
+Load-test data generator: users with run histories, friendships, goals and
+challenges, written straight to the database configured in .env.
+
+    python -m benchmarks.seed
+    python -m benchmarks.seed --users 500 --runs 100 --points 900 --reset
+
+Seeded users have @load.test emails and share the password "load-test";
+--reset deletes them, and everything of theirs, before seeding.
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Sequence
+from uuid import uuid4
+
+from sqlalchemy import delete, insert
+
+from app.core.db import async_session
+from app.enums.goal import GoalType, TimePeriod
+from app.jobs.leaderboard_snapshots import refresh_leaderboard_snapshots
+from app.models import (
+    Challenge,
+    FriendEdge,
+    Friendship,
+    Goal,
+    HeatmapTile,
+    PersonalBest,
+    Run,
+    User,
+)
+from app.models.friendship import FriendshipStatus
+from app.repositories.analytics import RunTotalsRepository
+from app.services.challenge import get_challenge_service
+from app.services.statistics import get_statistics_service
+from app.utils.heatmap import add_pixels, encode_tile, route_tiles
+from app.utils.route_index import route_to_points
+from app.utils.security import get_password_hash
+from app.utils.timezones import local_period_keys
+from benchmarks.data import make_run
+
+EMAIL_DOMAIN = "load.test"
+TIMEZONES = ["UTC", "Europe/Kyiv", "America/New_York", "Asia/Tokyo"]
+PASSWORD = "load-test"
+GOAL_TARGETS = {
+    GoalType.DISTANCE: (10, 200),
+    GoalType.DURATION: (60, 1200),
+    GoalType.NUMBER_OF_RUNS: (2, 30),
+}
+
+
+def make_users(count: int, rng: random.Random) -> List[Dict[str, Any]]:
+    # bcrypt is slow on purpose, hash once for all users
+    hashed_password = get_password_hash(PASSWORD)
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "uuid": uuid4(),
+            "email": f"runner-{i}@{EMAIL_DOMAIN}",
+            "hashed_password": hashed_password,
+            "username": f"runner-{i}",
+            "age": rng.randint(16, 75),
+            "gender": rng.choice(["male", "female"]),
+            "height": rng.randint(150, 200),
+            "weight": rng.randint(45, 110),
+            "timezone": rng.choice(TIMEZONES),
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(count)
+    ]
+
+
+def make_runs(
+    user: Dict[str, Any], count: int, points: int, days: int, rng: random.Random
+) -> List[Dict[str, Any]]:
+    now = datetime.now(timezone.utc)
+    runs = []
+    for _ in range(count):
+        start = now - timedelta(seconds=rng.randint(3600, days * 86400))
+        run = make_run(
+            rng.randint(points // 2, points * 3 // 2),
+            user["uuid"],
+            seed=rng.randrange(2**31),
+            start=start,
+        )
+        run["created_at"] = run["updated_at"] = start
+        run.update(local_period_keys(start, user["timezone"]))
+        runs.append(run)
+    return runs
+
+
+def make_goals(user: Dict[str, Any], rng: random.Random) -> List[Dict[str, Any]]:
+    goals = []
+    for goal_type in rng.sample(list(GoalType), rng.randint(1, 3)):
+        goals.append(
+            {
+                "user_uuid": user["uuid"],
+                "goal_type": goal_type,
+                "target": rng.randint(*GOAL_TARGETS[goal_type]),
+                "time_period": rng.choice(list(TimePeriod)),
+                "is_active": True,
+            }
+        )
+    return goals
+
+
+def make_friendships(
+    users: Sequence[Dict[str, Any]], per_user: int, rng: random.Random
+) -> List[Dict[str, Any]]:
+    pairs = set()
+    for i in range(len(users)):
+        for j in rng.sample(range(len(users)), min(per_user, len(users))):
+            if i != j:
+                pairs.add((min(i, j), max(i, j)))
+    return [
+        {
+            "requester_id": users[i]["uuid"],
+            "addressee_id": users[j]["uuid"],
+            "status": FriendshipStatus.ACCEPTED,
+        }
+        for i, j in sorted(pairs)
+    ]
+
+
+def make_challenges(
+    runs: Sequence[Dict[str, Any]],
+    users: Dict[Any, Dict[str, Any]],
+    count: int,
+    rng: random.Random,
+) -> List[Dict[str, Any]]:
+    service = get_challenge_service()
+    challenges = []
+    for run in rng.sample(list(runs), min(count, len(runs))):
+        user = users[run["user_uuid"]]
+        challenges.append(
+            {
+                "creator_id": run["user_uuid"],
+                "source_run_id": run["uuid"],
+                "name": f"{user['username']} loop",
+                "is_active": True,
+                **service._route_index_fields(run["route"]),
+                **service._card_fields(Run(**run), User(**user)),
+            }
+        )
+    return challenges
+
+
+def make_heatmap_tiles(
+    user: Dict[str, Any], runs: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    tiles: Dict[Any, Dict[int, int]] = {}
+    for run in runs:
+        for key, pixels in route_tiles(route_to_points(run["route"])).items():
+            add_pixels(tiles.setdefault(key, {}), pixels)
+    return [
+        {"user_uuid": user["uuid"], "zoom": z, "x": x, "y": y, "pixels": encode_tile(c)}
+        for (z, x, y), c in tiles.items()
+    ]
+
+
+async def insert_rows(session, model, rows: List[Dict[str, Any]], batch: int) -> None:
+    for i in range(0, len(rows), batch):
+        await session.execute(insert(model), rows[i : i + batch])
+
+
+async def seed(args: argparse.Namespace) -> None:
+    rng = random.Random(args.seed)
+    started = time.perf_counter()
+
+    async with async_session() as session:
+        if args.reset:
+            await session.execute(
+                delete(User).where(User.email.like(f"%@{EMAIL_DOMAIN}"))
+            )
+            await session.commit()
+
+        users = make_users(args.users, rng)
+        await insert_rows(session, User, users, 1000)
+
+        # Routes dominate the volume, so runs are generated and written per user
+        statistics = get_statistics_service()
+        sample_runs = []
+        for user in users:
+            runs = make_runs(user, args.runs, args.points, args.days, rng)
+            await insert_rows(session, Run, runs, 50)
+            await insert_rows(
+                session,
+                PersonalBest,
+                [
+                    row
+                    for run in runs
+                    for row in statistics._personal_best_rows(Run(**run))
+                ],
+                1000,
+            )
+            await insert_rows(
+                session, HeatmapTile, make_heatmap_tiles(user, runs), 1000
+            )
+            sample_runs.extend(rng.sample(runs, min(2, len(runs))))
+            await session.commit()
+
+        # Runs are inserted directly, so their analytics totals are rebuilt
+        await RunTotalsRepository(session).rebuild([u["uuid"] for u in users])
+
+        await insert_rows(
+            session, Goal, [g for u in users for g in make_goals(u, rng)], 1000
+        )
+
+        friendships = make_friendships(users, args.friends, rng)
+        await insert_rows(session, Friendship, friendships, 1000)
+        edges = [
+            {"user_id": a, "friend_id": b}
+            for f in friendships
+            for a, b in (
+                (f["requester_id"], f["addressee_id"]),
+                (f["addressee_id"], f["requester_id"]),
+            )
+        ]
+        await insert_rows(session, FriendEdge, edges, 1000)
+
+        users_by_uuid = {u["uuid"]: u for u in users}
+        challenges = make_challenges(sample_runs, users_by_uuid, args.challenges, rng)
+        await insert_rows(session, Challenge, challenges, 100)
+        await session.commit()
+
+    await refresh_leaderboard_snapshots()
+
+    print(
+        f"Seeded {len(users)} users, {len(users) * args.runs} runs,"
+        f" {len(friendships)} friendships and {len(challenges)} challenges"
+        f" in {time.perf_counter() - started:.1f}s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--runs", type=int, default=30, help="Runs per user")
+    parser.add_argument("--points", type=int, default=600, help="Mean route points")
+    parser.add_argument("--days", type=int, default=365, help="History length")
+    parser.add_argument("--friends", type=int, default=10, help="Friends per user")
+    parser.add_argument("--challenges", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--reset", action="store_true")
+    asyncio.run(seed(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
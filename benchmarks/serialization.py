@@ -0,0 +1,210 @@
+"""
+Response serialization benchmark for /runs and /challenges payloads.
+
+Every scenario is served by a bare FastAPI app driven in-process over ASGI, so
+the numbers cover the whole response pipeline (response_model validation,
+encoding, rendering) without the database:
+
+    python -m benchmarks.serialization
+    python -m benchmarks.serialization --items 100 --points 3600 --repeat 20
+
+Pipelines compared:
+    legacy     response_model validation, jsonable dict and json.dumps; what
+               every route does on FastAPI releases without the dump_json path
+    fastapi    current FastAPI defaults
+    direct     endpoint returns ModelResponse, skipping response_model validation
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Any, Callable, Dict, List
+from uuid import uuid4
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+from app.core.responses import ModelResponse
+from app.schemas.challenge import (
+    ChallengeCardListResponse,
+    ChallengeCardResponse,
+    ChallengeListResponse,
+    ChallengeResponse,
+)
+from app.schemas.runs import RunListResponse, RunResponse
+from app.schemas.users import UserResponse
+from app.utils.polyline import encode_polyline, simplify_points
+from app.utils.route_index import route_to_points
+from benchmarks.data import make_run
+
+
+def build_payloads(items: int, points: int) -> Dict[str, Any]:
+    runs = [RunResponse(**make_run(points, seed=i)) for i in range(items)]
+    creator = UserResponse(
+        uuid=uuid4(),
+        email="bench@example.com",
+        username="bench",
+        age=30,
+        gender="male",
+        height=180,
+        weight=75,
+        created_at=runs[0].created_at,
+        updated_at=runs[0].updated_at,
+    )
+
+    challenges, cards = [], []
+    for run in runs:
+        polyline = encode_polyline(simplify_points(route_to_points(run.route), 10))
+        card = {
+            "uuid": uuid4(),
+            "name": run.name,
+            "description": None,
+            "creator_id": creator.uuid,
+            "creator_name": creator.username,
+            "is_active": True,
+            "course_distance": run.distance,
+            "course_duration": run.duration,
+            "course_polyline": polyline,
+            "created_at": run.created_at,
+        }
+        cards.append(ChallengeCardResponse(**card))
+        challenges.append(
+            ChallengeResponse(
+                **card,
+                source_run_id=run.uuid,
+                updated_at=run.updated_at,
+                creator=creator,
+                source_run=run,
+            )
+        )
+
+    page = {"total": items, "page": 1, "limit": items, "total_pages": 1}
+    return {
+        "runs": RunListResponse(runs=runs, **page),
+        "challenges": ChallengeListResponse(items=challenges, **page),
+        "cards": ChallengeCardListResponse(items=cards, **page),
+    }
+
+
+def build_apps(payloads: Dict[str, Any]) -> Dict[str, FastAPI]:
+    runs, challenges = payloads["runs"], payloads["challenges"]
+
+    legacy = FastAPI(default_response_class=JSONResponse)
+    fastapi = FastAPI()
+    for app in (legacy, fastapi):
+        app.get("/runs", response_model=RunListResponse)(lambda: runs)
+        app.get("/challenges", response_model=ChallengeListResponse)(lambda: challenges)
+
+    direct = FastAPI()
+    for path, model in (
+        ("/runs", RunListResponse),
+        ("/challenges", ChallengeListResponse),
+        ("/challenges/cards", ChallengeCardListResponse),
+    ):
+        content = payloads[path.strip("/").split("/")[-1]]
+        direct.get(path, response_model=model)(_respond_with(content))
+
+    return {"legacy": legacy, "fastapi": fastapi, "direct": direct}
+
+
+def _respond_with(content: Any) -> Callable[[], ModelResponse]:
+    # A closure rather than a default argument, which FastAPI would treat as a
+    # query parameter
+    return lambda: ModelResponse(content)
+
+
+async def call(app: FastAPI, path: str) -> bytes:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [],
+        "server": ("bench", 80),
+        "client": ("bench", 1),
+    }
+    chunks: List[bytes] = []
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        if message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return b"".join(chunks)
+
+
+def measure(func: Callable[[], Any], repeat: int) -> List[float]:
+    func()  # warm-up
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def run_benchmarks(items: int, points: int, repeat: int) -> List[Dict[str, Any]]:
+    payloads = build_payloads(items, points)
+    apps = build_apps(payloads)
+    loop = asyncio.new_event_loop()
+
+    scenarios = [
+        ("/runs", "legacy"),
+        ("/runs", "fastapi"),
+        ("/runs", "direct"),
+        ("/challenges", "legacy"),
+        ("/challenges", "fastapi"),
+        ("/challenges", "direct"),
+        ("/challenges/cards", "direct"),
+    ]
+    results = []
+    try:
+        for path, pipeline in scenarios:
+            app = apps[pipeline]
+            body = loop.run_until_complete(call(app, path))
+            timings = measure(lambda: loop.run_until_complete(call(app, path)), repeat)
+            results.append(
+                {
+                    "path": path,
+                    "pipeline": pipeline,
+                    "bytes": len(body),
+                    "median_ms": statistics.median(timings),
+                    "min_ms": min(timings),
+                }
+            )
+    finally:
+        loop.close()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=10, help="Runs per page")
+    parser.add_argument("--points", type=int, default=3600, help="Points per route")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.items, args.points, args.repeat)
+    # Speedups are relative to the legacy pipeline of the same endpoint
+    baselines = {
+        r["path"]: r["median_ms"] for r in results if r["pipeline"] == "legacy"
+    }
+    for r in results:
+        reference = baselines[r["path"].removesuffix("/cards")]
+        print(
+            f"{r['path']:<20} {r['pipeline']:<9} {r['bytes'] / 1024:>9.0f} KiB"
+            f" {r['median_ms']:>9.2f} ms  x{reference / r['median_ms']:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import os
+
+import pytest
+
+from app.core.query_budget import assert_max_queries
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--benchmarks",
+        action="store_true",
+        help="Also run the wall-clock tests marked benchmark",
+    )
+
+
+def pytest_configure(config):
+    # Settings otherwise read from .env, for tests importing the services
+    os.environ.setdefault("ALLOWED_ORIGINS", "*")
+    config.addinivalue_line(
+        "markers", "benchmark: wall-clock performance check, needs --benchmarks"
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--benchmarks"):
+        return
+    skip = pytest.mark.skip(reason="needs --benchmarks")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture
+def max_queries():
+    """
+    Context manager failing the test when a block runs too many SQL statements.
+
+        with max_queries(3):
+            await service.list_friends(uow, user_uuid)
+    """
+    return assert_max_queries
@@ -0,0 +1,40 @@
+"""
+Tests for the analytics bucketing helpers
+"""
+
+from datetime import date
+
+from app.enums.analytics import AnalyticsGranularity
+from app.utils.analytics import bucket_keys, bucket_label, bucket_start, pace_bucket
+
+
+def test_pace_bucket():
+    """Test paces fall into 15 s/km buckets clamped to the histogram range"""
+    assert pace_bucket(30, 6) == 300  # 5:00 min/km
+    assert pace_bucket(30.2, 6) == 300
+    assert pace_bucket(31.5, 6) == 315
+    assert pace_bucket(5, 10) == 120
+    assert pace_bucket(600, 1) == 1200
+    assert pace_bucket(30, 0) is None
+
+
+def test_weekly_buckets_cross_iso_year():
+    """Test week buckets follow ISO weeks across the new year"""
+    keys = bucket_keys(date(2026, 12, 24), date(2027, 1, 11), AnalyticsGranularity.WEEK)
+    assert keys == [202652, 202653, 202701, 202702]
+    assert bucket_start(202653, AnalyticsGranularity.WEEK) == date(2026, 12, 28)
+    assert bucket_label(202701, AnalyticsGranularity.WEEK) == "2027-W01"
+
+
+def test_monthly_and_yearly_buckets():
+    """Test month and year buckets cover partial periods at both ends"""
+    months = bucket_keys(
+        date(2025, 11, 30), date(2026, 2, 1), AnalyticsGranularity.MONTH
+    )
+    assert months == [202511, 202512, 202601, 202602]
+    assert bucket_label(202602, AnalyticsGranularity.MONTH) == "2026-02"
+    assert bucket_start(202602, AnalyticsGranularity.MONTH) == date(2026, 2, 1)
+
+    years = bucket_keys(date(2017, 6, 1), date(2026, 1, 1), AnalyticsGranularity.YEAR)
+    assert years == list(range(2017, 2027))
+    assert bucket_label(2017, AnalyticsGranularity.YEAR) == "2017"
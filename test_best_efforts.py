@@ -0,0 +1,76 @@
+"""
+Tests for best efforts over standard distances
+"""
+
+import pytest
+
+from app.enums.run import PersonalBestDistance
+from app.utils.best_efforts import find_best_efforts
+from app.utils.distance_utils import cumulative_distances_meters
+
+# About 10 m between points along a meridian
+STEP_DEGREES = 10 / 111195
+
+
+def straight_route(seconds_per_point: list[float]):
+    """Points 10 m apart, timed with the given gap before each point"""
+    points = [(STEP_DEGREES * i, 0.0) for i in range(len(seconds_per_point) + 1)]
+    timestamps = [0.0]
+    for gap in seconds_per_point:
+        timestamps.append(timestamps[-1] + gap)
+    return points, timestamps
+
+
+def brute_force_best(points, timestamps, target: float) -> float:
+    cumulative = cumulative_distances_meters(points)
+    best = float("inf")
+    for i in range(len(points) - 1):
+        for j in range(i + 1, len(points)):
+            covered = cumulative[j] - cumulative[i]
+            if covered >= target and cumulative[j] - cumulative[i + 1] < target:
+                excess = (covered - target) / (cumulative[i + 1] - cumulative[i])
+                start = timestamps[i] + (timestamps[i + 1] - timestamps[i]) * excess
+                best = min(best, timestamps[j] - start)
+    return best
+
+
+def test_finds_fast_stretch_inside_longer_run():
+    """Test the fastest kilometer is found in the middle of a slow run"""
+    # 4 s per 10 m, with a 1.2 km stretch at 3 s per 10 m
+    gaps = [4.0] * 100 + [3.0] * 120 + [4.0] * 100
+    points, timestamps = straight_route(gaps)
+
+    efforts = find_best_efforts(points, timestamps)
+
+    assert set(efforts) == {PersonalBestDistance.KM_1}
+    effort = efforts[PersonalBestDistance.KM_1]
+    assert effort.seconds == pytest.approx(300, rel=1e-3)
+    assert 100 <= effort.start_index and effort.end_index <= 220
+
+
+def test_matches_brute_force():
+    """Test the two-pointer pass agrees with checking every window"""
+    gaps = [3.0 + (i * 7919 % 13) / 10 for i in range(400)]
+    points, timestamps = straight_route(gaps)
+
+    effort = find_best_efforts(points, timestamps)[PersonalBestDistance.KM_1]
+
+    assert effort.seconds == pytest.approx(brute_force_best(points, timestamps, 1000.0))
+
+
+def test_skips_untimed_and_backwards_points():
+    """Test points without usable timestamps are left out of every effort"""
+    points, timestamps = straight_route([4.0] * 150)
+    timestamps[50] = None
+    timestamps[80] = timestamps[79] - 30
+
+    effort = find_best_efforts(points, timestamps)[PersonalBestDistance.KM_1]
+
+    assert effort.seconds == pytest.approx(400, rel=1e-3)
+    assert find_best_efforts(points, [None] * len(points)) == {}
+
+
+def test_discards_gps_glitches():
+    """Test efforts faster than any runner are not records"""
+    points, timestamps = straight_route([0.1] * 150)
+    assert find_best_efforts(points, timestamps) == {}
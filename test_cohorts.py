@@ -0,0 +1,75 @@
+"""
+Tests for leaderboard cohort bucketing, evaluating the generated SQL
+"""
+
+import pytest
+from sqlalchemy import Float, Integer, String, column, create_engine, literal, select
+from sqlalchemy.dialects import postgresql
+
+from app.enums.leaderboard import AgeGroup, CohortGender, DistanceBand
+from app.utils.cohorts import (
+    age_group_expression,
+    distance_band_expression,
+    gender_expression,
+)
+
+engine = create_engine("sqlite://")
+
+
+def evaluate(expression):
+    with engine.connect() as conn:
+        return conn.execute(select(expression)).scalar()
+
+
+@pytest.mark.parametrize(
+    "age, expected",
+    [
+        (None, None),
+        (-1, None),
+        (0, AgeGroup.UNDER_20),
+        (19, AgeGroup.UNDER_20),
+        (20, AgeGroup.AGE_20_29),
+        (39, AgeGroup.AGE_30_39),
+        (69, AgeGroup.AGE_60_69),
+        (70, AgeGroup.AGE_70_PLUS),
+        (101, AgeGroup.AGE_70_PLUS),
+    ],
+)
+def test_age_group(age, expected):
+    assert evaluate(age_group_expression(literal(age, Integer))) == expected
+
+
+def test_cohort_gender_normalizes_free_text():
+    """Test case and surrounding spaces are ignored and unknown values left out"""
+
+    def gender(value):
+        return evaluate(gender_expression(literal(value, String)))
+
+    assert gender(" Female ") == CohortGender.FEMALE
+    assert gender("M") == CohortGender.MALE
+    assert gender("non-binary") is None
+    assert gender(None) is None
+
+
+def test_distance_band_by_average_run():
+    def band(distance, runs):
+        return evaluate(
+            distance_band_expression(literal(distance, Float), literal(runs, Integer))
+        )
+
+    assert band(12.0, 3) == DistanceBand.UNDER_5K
+    assert band(15.0, 3) == DistanceBand.FROM_5K_TO_10K
+    assert band(21.0975, 1) == DistanceBand.HALF_PLUS
+    assert band(21.0, 1) == DistanceBand.FROM_10K_TO_HALF
+
+
+def test_age_group_sql():
+    """Test the compiled CASE checks the highest bound first"""
+    sql = str(
+        age_group_expression(column("age", Integer)).compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        )
+    )
+
+    assert sql.startswith("CASE WHEN (age >= 70) THEN '70_PLUS' WHEN (age >= 60)")
+    assert sql.endswith("WHEN (age >= 0) THEN 'UNDER_20' END")
@@ -0,0 +1,118 @@
+"""
+Tests for the compression middleware
+"""
+
+import asyncio
+import gzip
+import json
+
+import pytest
+
+from app.core.middleware.compression import (
+    REQUEST_ENCODINGS,
+    RESPONSE_ENCODINGS,
+    CompressionMiddleware,
+    DecompressionError,
+    negotiate_encoding,
+)
+
+PAYLOAD = json.dumps([{"latitude": 40.0, "longitude": -73.0}] * 200).encode()
+
+
+async def echo_app(scope, receive, send):
+    """Respond with the request body, or PAYLOAD for empty requests"""
+    message = await receive()
+    body = message.get("body", b"") or PAYLOAD
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+def call(headers, body=b"", **options):
+    """Send a request through the middleware, return (status, headers, body)"""
+    app = CompressionMiddleware(echo_app, **options)
+    scope = {"type": "http", "method": "POST", "path": "/", "headers": headers}
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    start = sent[0]
+    return (
+        start["status"],
+        dict(start["headers"]),
+        b"".join(m.get("body", b"") for m in sent[1:]),
+    )
+
+
+def test_negotiate_encoding():
+    """Test Accept-Encoding parsing with quality values"""
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+    assert negotiate_encoding("gzip;q=0, deflate") is None
+    assert negotiate_encoding("*") is not None
+    assert negotiate_encoding("") is None
+
+
+def test_response_compressed():
+    """Test that large responses are gzipped"""
+    status, headers, body = call([(b"accept-encoding", b"gzip")])
+
+    assert status == 200
+    assert headers[b"content-encoding"] == b"gzip"
+    assert int(headers[b"content-length"]) == len(body)
+    assert gzip.decompress(body) == PAYLOAD
+
+
+def test_small_response_not_compressed():
+    """Test that responses below the threshold are sent as is"""
+    _, headers, body = call(
+        [(b"accept-encoding", b"gzip")], minimum_size=len(PAYLOAD) + 1
+    )
+
+    assert b"content-encoding" not in headers
+    assert body == PAYLOAD
+
+
+def test_request_decompressed():
+    """Test that gzip request bodies reach the app decompressed"""
+    body = json.dumps({"route": []}).encode()
+    _, _, echoed = call([(b"content-encoding", b"gzip")], gzip.compress(body))
+
+    assert echoed == body
+
+
+def test_request_decompression_limit():
+    """Test that a small body expanding past the limit is rejected"""
+    bomb = gzip.compress(b"0" * 1_000_000)
+    status, _, _ = call([(b"content-encoding", b"gzip")], bomb, max_body_size=2000)
+
+    assert len(bomb) < 2000
+    assert status == 413
+
+
+def test_request_invalid_encoding():
+    """Test that corrupt and unsupported bodies are rejected"""
+    assert call([(b"content-encoding", b"gzip")], b"not gzip")[0] == 400
+    assert call([(b"content-encoding", b"lzma")], b"data")[0] == 415
+
+
+@pytest.mark.skipif("zstd" not in REQUEST_ENCODINGS, reason="no zstd backend")
+def test_truncated_zstd_rejected():
+    """Test that a zstd frame cut short is an error, not a shorter body"""
+    frame = RESPONSE_ENCODINGS["zstd"]().finish(PAYLOAD)
+
+    assert REQUEST_ENCODINGS["zstd"](frame, len(PAYLOAD)) == PAYLOAD
+    with pytest.raises(DecompressionError, match="Truncated"):
+        REQUEST_ENCODINGS["zstd"](frame[:-4], len(PAYLOAD))
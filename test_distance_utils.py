@@ -4,8 +4,10 @@ Tests for distance calculation utilities
 
 from app.utils.distance_utils import (
     calculate_distance_meters,
+    cumulative_distances_meters,
     extract_route_endpoints,
     points_within_radius,
+    segment_distances_meters,
 )
 
 
@@ -71,6 +73,27 @@ def test_points_with_missing_data():
     print("✓ Invalid coordinates handled correctly")
 
 
+def test_segment_distances_match_scalar():
+    """Test batched segment distances against the pairwise formula"""
+    points = [(40.758896, -73.985130), (40.759350, -73.985130), (40.785091, -73.968285)]
+
+    distances = segment_distances_meters(points)
+    expected = [
+        calculate_distance_meters(*points[0], *points[1]),
+        calculate_distance_meters(*points[1], *points[2]),
+    ]
+    assert len(distances) == 2
+    for actual, wanted in zip(distances, expected):
+        assert abs(actual - wanted) < 1e-6
+
+    cumulative = cumulative_distances_meters(points)
+    assert cumulative[0] == 0.0
+    assert abs(cumulative[-1] - sum(expected)) < 1e-6
+    assert segment_distances_meters(points[:1]) == []
+    assert cumulative_distances_meters([]) == []
+    print("✓ Segment distances match the pairwise formula")
+
+
 if __name__ == "__main__":
     print("Testing distance calculation utilities...\n")
 
@@ -80,5 +103,6 @@ if __name__ == "__main__":
     test_extract_route_endpoints()
     test_extract_empty_route()
     test_points_with_missing_data()
+    test_segment_distances_match_scalar()
 
     print("\n✅ All tests passed!")
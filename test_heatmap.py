@@ -0,0 +1,98 @@
+"""
+Tests for heatmap tile rasterization, storage and rendering
+"""
+
+import struct
+import zlib
+
+from app.utils.heatmap import (
+    MAX_ZOOM,
+    MIN_ZOOM,
+    TILE_SIZE,
+    add_pixels,
+    decode_tile,
+    encode_tile,
+    merge_tiles,
+    render_png,
+    route_pixels,
+    route_tiles,
+    world_pixel,
+)
+
+# About 10 m between points along a meridian
+STEP_DEGREES = 10 / 111195
+
+
+def test_world_pixel_corners():
+    """Null island is the world center; the antimeridian is the left edge"""
+    assert world_pixel(0, 0, 0) == (128, 128)
+    x, y = world_pixel(0, -180, 3)
+    assert x == 0 and abs(y - TILE_SIZE * 4) < 1e-6
+
+
+def test_route_tiles_every_zoom():
+    """A short route is drawn at every zoom level"""
+    points = [(50.45 + STEP_DEGREES * i, 30.52) for i in range(20)]
+    tiles = route_tiles(points)
+    assert {zoom for zoom, _, _ in tiles} == set(range(MIN_ZOOM, MAX_ZOOM + 1))
+    assert tiles[(0, 0, 0)]  # visible on the world tile
+
+
+def test_route_counted_once_per_pixel():
+    """Going back and forth over the same street counts once"""
+    out = [(50.45 + STEP_DEGREES * i, 30.52) for i in range(50)]
+    tiles = route_tiles(out + out[::-1] + out)
+    for pixels in tiles.values():
+        assert len(pixels) == len(set(pixels))
+
+
+def test_segments_rasterized_without_gaps():
+    """Points further apart than a pixel are joined by a line"""
+    points = [(50.45, 30.52), (50.45 + STEP_DEGREES * 10, 30.52)]
+    rows = sorted(y for _, y in route_pixels(points))
+    assert len(rows) > 10
+    assert all(b - a <= 1 for a, b in zip(rows, rows[1:]))
+
+
+def test_encode_decode_round_trip():
+    counts = {0: 1, 255: 7, TILE_SIZE * TILE_SIZE - 1: 70000}
+    assert decode_tile(encode_tile(counts)) == counts
+    assert decode_tile(b"") == {}
+
+
+def test_add_and_remove_run():
+    """Removing a run restores the tile, dropping pixels it alone covered"""
+    counts = {1: 2}
+    add_pixels(counts, [1, 2])
+    assert counts == {1: 3, 2: 1}
+    add_pixels(counts, [1, 2], sign=-1)
+    assert counts == {1: 2}
+
+
+def test_merge_tiles_sums_users():
+    merged = merge_tiles([encode_tile({1: 1, 2: 2}), encode_tile({2: 3})])
+    assert merged == {1: 1, 2: 5}
+
+
+def test_render_png_valid():
+    """Chunks carry valid CRCs and the image data is 256 filtered rows"""
+    png = render_png({0: 1, 300: 10})
+    assert png.startswith(b"\x89PNG\r\n\x1a\n")
+
+    position, chunks = 8, {}
+    while position < len(png):
+        (length,) = struct.unpack(">I", png[position : position + 4])
+        kind = png[position + 4 : position + 8]
+        data = png[position + 8 : position + 8 + length]
+        (crc,) = struct.unpack(
+            ">I", png[position + 8 + length : position + 12 + length]
+        )
+        assert zlib.crc32(kind + data) == crc
+        chunks[kind] = data
+        position += 12 + length
+
+    assert list(chunks) == [b"IHDR", b"PLTE", b"tRNS", b"IDAT", b"IEND"]
+    assert struct.unpack(">II", chunks[b"IHDR"][:8]) == (TILE_SIZE, TILE_SIZE)
+    rows = zlib.decompress(chunks[b"IDAT"])
+    assert len(rows) == TILE_SIZE * (TILE_SIZE + 1)
+    assert rows[1] > 0 and rows[2] == 0  # pixel 0 shaded, pixel 1 transparent
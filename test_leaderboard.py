@@ -0,0 +1,151 @@
+"""
+Tests for shaping leaderboard rows into responses and for period ranges
+"""
+
+from datetime import date
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from app.core.exc import BadRequestException
+from app.schemas.leaderboard import LeaderboardPeriod
+from app.services import leaderboard
+from app.services.leaderboard import LeaderboardService
+
+service = LeaderboardService()
+USERS = [uuid4() for _ in range(10)]
+
+
+def rows_at(*positions):
+    """Rows of the ranked query at the given 1-based positions"""
+    return [
+        SimpleNamespace(
+            user_uuid=USERS[position - 1],
+            username=f"runner{position}",
+            value=100 - position,
+            rank=position,
+            position=position,
+        )
+        for position in positions
+    ]
+
+
+def respond(rows, position, limit=3, around=0):
+    return service._to_response(rows, USERS[position - 1], limit, around, None, None)
+
+
+def ranks(entries):
+    return [entry.rank for entry in entries]
+
+
+def test_current_user_in_top():
+    """Test the user's row is flagged in the top entries and repeated alone"""
+    response = respond(rows_at(1, 2, 3), position=2)
+
+    assert ranks(response.entries) == [1, 2, 3]
+    assert [e.is_current_user for e in response.entries] == [False, True, False]
+    assert response.current_user_entry.rank == 2
+    assert response.neighbors == []
+
+
+def test_current_user_below_top():
+    """Test a row past limit is the user's entry, not one of the top entries"""
+    response = respond(rows_at(1, 2, 3, 7), position=7)
+
+    assert ranks(response.entries) == [1, 2, 3]
+    assert not any(e.is_current_user for e in response.entries)
+    assert response.current_user_entry.rank == 7
+    assert response.current_user_entry.username == "runner7"
+
+
+def test_current_user_not_ranked():
+    """Test a user without a row gets no entry and no neighbors"""
+    response = respond(rows_at(1, 2, 3), position=9, around=2)
+
+    assert ranks(response.entries) == [1, 2, 3]
+    assert response.current_user_entry is None
+    assert response.neighbors == []
+
+
+@pytest.mark.parametrize(
+    "rows, position, neighbors",
+    [
+        # First place: only the positions below exist
+        (rows_at(1, 2, 3), 1, [1, 2, 3]),
+        # Last place: only the positions above exist
+        (rows_at(1, 2, 3, 8, 9, 10), 10, [8, 9, 10]),
+        # Overlapping the top entries
+        (rows_at(1, 2, 3, 4, 5, 6), 4, [2, 3, 4, 5, 6]),
+    ],
+)
+def test_neighbors_at_edges(rows, position, neighbors):
+    """Test neighbors stop at the ends of the board and keep the top intact"""
+    response = respond(rows, position=position, around=2)
+
+    assert ranks(response.neighbors) == neighbors
+    assert ranks(response.entries) == [1, 2, 3]
+    assert response.current_user_entry.rank == position
+
+
+def test_ties_and_missing_values():
+    """Test tied rows keep their shared rank and a missing total counts as 0"""
+    rows = rows_at(1, 2, 3)
+    rows[2].rank = 2
+    rows[2].value = None
+
+    response = respond(rows, position=3)
+
+    assert ranks(response.entries) == [1, 2, 2]
+    assert response.entries[2].value == 0
+    assert response.current_user_entry.rank == 2
+
+
+@pytest.mark.parametrize(
+    "start_date, end_date, message",
+    [
+        (None, date(2026, 10, 19), "are required"),
+        (date(2026, 10, 1), None, "are required"),
+        (date(2026, 10, 19), date(2026, 10, 18), "must not be after"),
+    ],
+)
+def test_custom_range_rejected(start_date, end_date, message):
+    """Test a custom range needs both dates, in order"""
+    with pytest.raises(BadRequestException, match=message):
+        service._get_period_range(LeaderboardPeriod.CUSTOM, "UTC", start_date, end_date)
+
+
+def test_custom_range():
+    """Test a custom range is kept as given, a single day included"""
+    day = date(2026, 10, 19)
+    period_range = service._get_period_range(LeaderboardPeriod.CUSTOM, "UTC", day, day)
+
+    assert period_range == (day, day)
+
+
+@pytest.mark.parametrize(
+    "today, period, expected",
+    [
+        (
+            date(2024, 2, 29),
+            LeaderboardPeriod.WEEK,
+            (date(2024, 2, 26), date(2024, 3, 3)),
+        ),
+        (
+            date(2024, 2, 14),
+            LeaderboardPeriod.MONTH,
+            (date(2024, 2, 1), date(2024, 2, 29)),
+        ),
+        (
+            date(2024, 12, 31),
+            LeaderboardPeriod.MONTH,
+            (date(2024, 12, 1), date(2024, 12, 31)),
+        ),
+        (date(2024, 12, 31), LeaderboardPeriod.ALL_TIME, (None, None)),
+    ],
+)
+def test_current_period_range(monkeypatch, today, period, expected):
+    """Test weeks start on Monday and months end on their last day"""
+    monkeypatch.setattr(leaderboard, "local_today", lambda timezone: today)
+
+    assert service._get_period_range(period, "UTC", None, None) == expected
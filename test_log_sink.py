@@ -0,0 +1,45 @@
+"""
+Tests for the queued log sink
+"""
+
+import threading
+
+from app.core.log import QueueSink
+
+
+def test_queue_sink_writes_in_background(tmp_path):
+    """Test that queued records end up in the log file"""
+    path = tmp_path / "app.log"
+    sink = QueueSink(str(path), max_bytes=1024 * 1024, backup_count=1, queue_size=10)
+
+    sink.write("first\n")
+    sink.write("second\n")
+    sink.stop()
+
+    assert path.read_text().splitlines() == ["first", "second"]
+    assert sink.written == 2
+
+
+def test_queue_sink_drops_when_full(tmp_path):
+    """Test that writes never block and overflow is counted"""
+    path = tmp_path / "app.log"
+    sink = QueueSink(str(path), max_bytes=1024 * 1024, backup_count=1, queue_size=2)
+    writing = threading.Event()
+    release = threading.Event()
+    emit = sink._emit
+
+    def slow_emit(line):
+        writing.set()
+        release.wait()
+        emit(line)
+
+    sink._emit = slow_emit
+    sink.write("held by the writer\n")
+    writing.wait()
+    for i in range(5):
+        sink.write(f"queued {i}\n")
+    release.set()
+    sink.stop()
+
+    assert sink.dropped == 3
+    assert "dropped 3 records" in path.read_text()
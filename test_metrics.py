@@ -0,0 +1,102 @@
+"""
+Tests for the metrics registry and instrumentation
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import QueuePool
+
+from app.core import metrics
+from app.core.metrics import Counter, Histogram, MetricsRegistry
+from app.core.middleware.metrics import MetricsMiddleware
+
+
+def test_render_counter_and_histogram():
+    """Test the text exposition of labelled counters and cumulative buckets"""
+    registry = MetricsRegistry()
+    requests = registry.register(Counter("requests_total", "Requests", ["path"]))
+    latency = registry.register(Histogram("latency_seconds", "Latency", buckets=[1, 2]))
+
+    requests.inc(path='/a"b')
+    requests.inc(2, path='/a"b')
+    for value in (0.5, 1.5, 3):
+        latency.observe(value)
+
+    lines = registry.render().splitlines()
+    assert "# TYPE requests_total counter" in lines
+    assert 'requests_total{path="/a\\"b"} 3' in lines
+    assert 'latency_seconds_bucket{le="1"} 1' in lines
+    assert 'latency_seconds_bucket{le="2"} 2' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in lines
+    assert "latency_seconds_sum 5" in lines
+    assert "latency_seconds_count 3" in lines
+
+
+def test_queries_tagged_by_outermost_method():
+    """Test statements are counted per request and attributed to repositories"""
+    engine = create_engine("sqlite://", poolclass=QueuePool)
+    metrics.instrument_engine(engine)
+
+    class Repository:
+        async def inner(self):
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+
+        async def outer(self):
+            await self.inner()
+            await self.inner()
+
+    metrics.tag_repository_methods(Repository)
+    before = metrics.db_queries._values.get((("repository", "Repository.outer"),), 0)
+
+    stats = metrics.RequestStats()
+    token = metrics.request_stats.set(stats)
+    try:
+        asyncio.run(Repository().outer())
+    finally:
+        metrics.request_stats.reset(token)
+
+    assert stats.queries == 2
+    assert stats.statements == {"SELECT 1": 2}
+    assert (
+        metrics.db_queries._values[(("repository", "Repository.outer"),)] == before + 2
+    )
+
+
+def test_middleware_labels_route_template():
+    """Test requests are labelled with the matched route, not the raw path"""
+
+    class Route:
+        path = "/api/runs/{run_uuid}"
+
+    async def app(scope, receive, send):
+        scope["route"] = Route()
+        await send({"type": "http.response.start", "status": 404, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    scope = {"type": "http", "method": "GET", "path": "/api/runs/1", "headers": []}
+    asyncio.run(MetricsMiddleware(app)(scope, receive, send))
+
+    key = (("method", "GET"), ("route", "/api/runs/{run_uuid}"), ("status", "404"))
+    assert metrics.http_requests._values[key] == 1
+
+
+def test_failed_statement_releases_start_time():
+    """Test a failing statement doesn't leave its start time on the connection"""
+    engine = create_engine("sqlite://", poolclass=QueuePool)
+    metrics.instrument_engine(engine)
+
+    with engine.connect() as conn:
+        with pytest.raises(Exception):
+            conn.execute(text("SELECT * FROM missing_table"))
+        assert conn.info.get("query_started") == []
+        conn.execute(text("SELECT 1"))
+        assert conn.info["query_started"] == []
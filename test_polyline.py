@@ -0,0 +1,38 @@
+"""
+Tests for route simplification and polyline encoding
+"""
+
+import pytest
+
+from app.utils.polyline import decode_polyline, encode_polyline, simplify_points
+
+
+def test_encode_polyline_reference():
+    """Test against the example from the polyline format documentation"""
+    points = [(38.5, -120.2), (40.7, -120.95), (43.252, -126.453)]
+
+    assert encode_polyline(points) == "_p~iF~ps|U_ulLnnqC_mqNvxq`@"
+    assert decode_polyline("_p~iF~ps|U_ulLnnqC_mqNvxq`@") == points
+
+
+def test_decode_polyline_invalid():
+    """Test that truncated strings are rejected"""
+    with pytest.raises(ValueError):
+        decode_polyline("_p~iF~ps|U_")
+
+
+def test_simplify_points_straight_line():
+    """Test that collinear points collapse to the endpoints"""
+    points = [(40.0 + i * 0.0001, -73.0) for i in range(100)]
+
+    assert simplify_points(points, tolerance_meters=1) == [points[0], points[-1]]
+
+
+def test_simplify_points_keeps_corners():
+    """Test that a right-angle turn survives simplification"""
+    leg_north = [(40.0 + i * 0.0001, -73.0) for i in range(50)]
+    leg_east = [(40.0049, -73.0 + i * 0.0001) for i in range(1, 50)]
+    points = leg_north + leg_east
+
+    simplified = simplify_points(points, tolerance_meters=5)
+    assert simplified == [points[0], leg_north[-1], leg_east[-1]]
@@ -0,0 +1,57 @@
+"""
+Tests for query budgets and N+1 detection
+"""
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import QueuePool
+
+from app.core import metrics
+from app.core.query_budget import (
+    QueryBudgetExceeded,
+    assert_max_queries,
+    repeated_statements,
+    statement_shape,
+)
+
+engine = create_engine("sqlite://", poolclass=QueuePool)
+metrics.instrument_engine(engine)
+
+
+def run_queries(*statements):
+    with engine.connect() as conn:
+        for statement in statements:
+            conn.execute(text(statement))
+
+
+def test_statement_shape():
+    """Test statements differing only in parameters share a shape"""
+    assert statement_shape("SELECT * FROM runs WHERE uuid = $1::UUID") == (
+        statement_shape("SELECT *\n  FROM runs\n WHERE uuid = $7::UUID")
+    )
+    assert statement_shape("SELECT 1 WHERE name = 'a''b'") == "SELECT ? WHERE name = ?"
+    assert statement_shape("SELECT x FROM t WHERE id IN ($1, $2, $3)") == (
+        statement_shape("SELECT x FROM t WHERE id IN ($1)")
+    )
+    assert statement_shape("INSERT INTO t VALUES (?, ?), (?, ?)") == (
+        "INSERT INTO t VALUES (?)"
+    )
+
+
+def test_repeated_statements():
+    """Test the per-row query of an N+1 pattern is reported once with its count"""
+    with assert_max_queries(10) as stats:
+        run_queries("SELECT 1", *(f"SELECT {i} + 1" for i in range(4)))
+
+    assert stats.queries == 5
+    assert repeated_statements(stats, 3) == [("SELECT ? + ?", 4)]
+
+
+def test_max_queries_fixture(max_queries):
+    """Test the fixture passes within the budget and fails above it"""
+    with max_queries(2):
+        run_queries("SELECT 1", "SELECT 2")
+
+    with pytest.raises(QueryBudgetExceeded, match="3 SQL statements"):
+        with max_queries(2):
+            run_queries("SELECT 1", "SELECT 2", "SELECT 3")
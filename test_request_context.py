@@ -0,0 +1,28 @@
+"""
+Tests for request correlation IDs
+"""
+
+import pytest
+from starlette.datastructures import Headers
+
+from app.core.middleware.request_context import REQUEST_ID_HEADER, get_request_id
+
+
+def test_client_request_id_kept():
+    headers = Headers({REQUEST_ID_HEADER: "req-1.2_3"})
+    assert get_request_id(headers) == "req-1.2_3"
+
+
+@pytest.mark.parametrize(
+    "value",
+    ["", "a" * 65, "id\nforged log line", "id with spaces", "id;drop"],
+)
+def test_unsafe_request_id_replaced(value):
+    """Test invalid or oversized client IDs are replaced with a generated one"""
+    request_id = get_request_id(Headers({REQUEST_ID_HEADER: value}))
+    assert request_id != value
+    assert len(request_id) == 32
+
+
+def test_missing_request_id_generated():
+    assert len(get_request_id(Headers({}))) == 32
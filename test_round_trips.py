@@ -0,0 +1,247 @@
+"""
+Tests for the SQL round trips of service methods and for repository writes,
+run on SQLite through the real repositories and engine hooks
+"""
+
+import asyncio
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.schema import CreateTable
+
+from app.core import metrics
+from app.core.unit_of_work import UnitOfWork
+from app.enums.challenge import ChallengeView
+from app.enums.goal import GoalType, TimePeriod
+from app.models import (
+    Achievement,
+    Base,
+    Challenge,
+    ChallengeAttempt,
+    ChallengeBestTime,
+    FriendEdge,
+    Goal,
+    Run,
+    User,
+)
+from app.repositories.challenge import ChallengeBestTimeRepository
+from app.services.achievement import get_achievement_service
+from app.services.challenge import get_challenge_service
+from app.services.friendship import friend_ids_cache
+from app.utils.timezones import local_period_keys
+
+
+@compiles(JSONB, "sqlite")
+def _compile_jsonb(type_, compiler, **kw):
+    return "JSON"
+
+
+class SyncSession:
+    """
+    The AsyncSession methods the repositories use, over a sync session.
+    """
+
+    def __init__(self, session):
+        self.sync_session = session
+
+    async def execute(self, *args, **kwargs):
+        return self.sync_session.execute(*args, **kwargs)
+
+    async def commit(self):
+        self.sync_session.commit()
+
+    async def rollback(self):
+        self.sync_session.rollback()
+
+    async def close(self):
+        self.sync_session.close()
+
+    async def refresh(self, instance):
+        self.sync_session.refresh(instance)
+
+    def add(self, instance):
+        self.sync_session.add(instance)
+
+
+@pytest.fixture
+def session_maker(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'db.sqlite'}", poolclass=QueuePool)
+    metrics.instrument_engine(engine)
+    with engine.begin() as conn:
+        # Tables only, the indexes use Postgres functions
+        for table in Base.metadata.sorted_tables:
+            conn.execute(CreateTable(table))
+    friend_ids_cache.clear()
+    yield sessionmaker(engine, expire_on_commit=False)
+    engine.dispose()
+
+
+@pytest.fixture
+def uow(session_maker):
+    def make():
+        uow = UnitOfWork()
+        uow.session_maker = lambda: SyncSession(session_maker())
+        return uow
+
+    return make
+
+
+def add_user(session, **fields):
+    user = User(
+        username=f"user-{uuid4().hex[:8]}",
+        email=f"{uuid4().hex}@example.com",
+        hashed_password="x",
+        **fields,
+    )
+    session.add(user)
+    session.flush()
+    return user
+
+
+def add_run(session, user, distance=5.0):
+    now = datetime.now(timezone.utc)
+    run = Run(
+        user_uuid=user.uuid,
+        start_time=now,
+        end_time=now,
+        duration=30.0,
+        distance=distance,
+        **local_period_keys(now, user.timezone),
+    )
+    session.add(run)
+    session.flush()
+    return run
+
+
+def test_check_achievements_queries(session_maker, uow, max_queries):
+    """Test goals of every period are checked in a fixed number of statements"""
+    with session_maker() as session:
+        user = add_user(session)
+        add_run(session, user)
+        for time_period, goal_type in zip(TimePeriod, GoalType):
+            session.add(
+                Goal(
+                    user_uuid=user.uuid,
+                    goal_type=goal_type,
+                    time_period=time_period,
+                    target=1,
+                    is_active=True,
+                )
+            )
+        session.commit()
+        user_uuid = user.uuid
+
+    service = get_achievement_service()
+    asyncio.run(service.check_and_award_achievements(uow(), user_uuid))
+
+    # Goals, their count, the progress aggregate, awards and their count
+    with max_queries(5) as stats:
+        asyncio.run(service.check_and_award_achievements(uow(), user_uuid))
+
+    with session_maker() as session:
+        assert session.query(Achievement).count() == 3
+    progress = next(s for s in stats.statements if "FROM runs" in s)
+    assert "runs.local_date >= ? AND runs.local_date < ?" in progress.split("WHERE")[-1]
+
+
+@pytest.mark.parametrize(
+    "view, budget",
+    [
+        # Friends, page, count, creators and source runs
+        (ChallengeView.FULL, 5),
+        # No relations on cards
+        (ChallengeView.CARD, 3),
+    ],
+)
+def test_list_challenges_queries(session_maker, uow, max_queries, view, budget):
+    """Test listing challenges doesn't query per challenge"""
+    with session_maker() as session:
+        user = add_user(session)
+        for _ in range(3):
+            friend = add_user(session)
+            session.add(FriendEdge(user_id=user.uuid, friend_id=friend.uuid))
+            for _ in range(4):
+                run = add_run(session, friend)
+                session.add(
+                    Challenge(
+                        creator_id=friend.uuid,
+                        source_run_id=run.uuid,
+                        name="Loop",
+                        creator_name=friend.username,
+                    )
+                )
+        session.commit()
+        user_uuid = user.uuid
+
+    with max_queries(budget):
+        response = asyncio.run(
+            get_challenge_service().list_available_challenges(
+                uow(), user_uuid, page=1, limit=10, view=view
+            )
+        )
+
+    assert response.total == 12
+    assert len(response.items) == 10
+
+
+def test_deleted_best_time_handed_over(session_maker):
+    """Test deleting a best time's run ranks the user's next fastest success"""
+    with session_maker() as session:
+        creator, runner, other = (add_user(session) for _ in range(3))
+        challenge = Challenge(
+            creator_id=creator.uuid,
+            source_run_id=add_run(session, creator).uuid,
+            name="Loop",
+        )
+        session.add(challenge)
+        session.flush()
+
+        def attempt(user, duration, success=True):
+            run = add_run(session, user)
+            session.add(
+                ChallengeAttempt(
+                    challenge_id=challenge.uuid,
+                    user_id=user.uuid,
+                    run_id=run.uuid,
+                    success=success,
+                    duration=duration,
+                )
+            )
+            return run
+
+        best = attempt(runner, 20.0)
+        attempt(runner, 18.0, success=False)
+        next_best = attempt(runner, 22.0)
+        attempt(runner, 25.0)
+        only = attempt(other, 21.0)
+        session.flush()
+        for user, run, duration in ((runner, best, 20.0), (other, only, 21.0)):
+            session.add(
+                ChallengeBestTime(
+                    challenge_id=challenge.uuid,
+                    user_id=user.uuid,
+                    best_duration=duration,
+                    run_id=run.uuid,
+                    achieved_at=datetime.now(timezone.utc),
+                )
+            )
+        session.commit()
+
+    for run in (best, only):
+        with session_maker() as session:
+            asyncio.run(
+                ChallengeBestTimeRepository(SyncSession(session)).remove_run(run.uuid)
+            )
+            session.commit()
+
+    with session_maker() as session:
+        rows = session.query(ChallengeBestTime).all()
+    assert [(row.user_id, row.run_id, row.best_duration) for row in rows] == [
+        (runner.uuid, next_best.uuid, 22.0)
+    ]
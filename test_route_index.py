@@ -0,0 +1,165 @@
+"""
+Tests for the route spatial index
+"""
+
+import math
+import random
+
+from app.utils.route_index import (
+    METERS_PER_DEGREE,
+    _near_course,
+    bboxes_overlap,
+    build_route_index,
+    build_route_track,
+    compute_bbox,
+    endpoint_cell,
+    endpoint_cells_near,
+    find_course_traversals,
+    may_traverse,
+    on_course_ratio,
+    point_deviation_meters,
+    route_to_points,
+)
+
+# Straight course heading north from Times Square, one point every ~11m
+COURSE = [
+    {"latitude": 40.758896 + i * 0.0001, "longitude": -73.985130} for i in range(50)
+]
+
+
+def test_route_to_points_skips_invalid():
+    """Test that points without coordinates are dropped"""
+    route = [
+        {"latitude": 40.0, "longitude": -73.0},
+        {"latitude": None, "longitude": -73.0},
+        {"longitude": -73.0},
+        "garbage",
+    ]
+
+    assert route_to_points(route) == [(40.0, -73.0)]
+    assert route_to_points(None) == []
+
+
+def test_build_route_index_empty_route():
+    """Test that an empty route has no index"""
+    assert build_route_index([]) is None
+    assert build_route_index(None) is None
+
+
+def test_point_on_course():
+    """Test deviation of a point lying on the course"""
+    index = build_route_index(COURSE)
+
+    deviation = point_deviation_meters(index, 40.759500, -73.985130)
+    assert deviation < 1
+
+
+def test_point_near_course():
+    """Test deviation of a point ~50m east of the course"""
+    index = build_route_index(COURSE)
+
+    deviation = point_deviation_meters(index, 40.759500, -73.984540)
+    assert 40 < deviation < 60
+
+
+def test_point_far_from_course():
+    """Test that points outside the neighbouring cells are not matched"""
+    index = build_route_index(COURSE)
+
+    deviation = point_deviation_meters(index, 40.785091, -73.968285)
+    assert deviation == math.inf
+
+
+def test_on_course_ratio():
+    """Test share of points following the course"""
+    index = build_route_index(COURSE)
+    points = route_to_points(COURSE[:10]) + [(40.785091, -73.968285)] * 10
+
+    assert on_course_ratio(index, route_to_points(COURSE)) == 1.0
+    assert on_course_ratio(index, points) == 0.5
+    assert on_course_ratio(index, []) == 0.0
+
+
+def test_bboxes_overlap():
+    """Test bounding box intersection with a margin"""
+    course_bbox = compute_bbox(route_to_points(COURSE))
+    nearby = (40.7590, -73.9840, 40.7600, -73.9835)  # ~90m east of the course
+    far_away = (40.7850, -73.9690, 40.7860, -73.9680)
+
+    assert bboxes_overlap(course_bbox, course_bbox)
+    assert not bboxes_overlap(course_bbox, nearby)
+    assert bboxes_overlap(course_bbox, nearby, margin_meters=100)
+    assert not bboxes_overlap(course_bbox, far_away, margin_meters=100)
+
+
+def test_find_course_traversals():
+    """Test locating the course inside a longer run"""
+    index = build_route_index(COURSE)
+    # Warm up ~1km to the west, run the course, then keep going north
+    warmup = [(40.758896, -73.997 + i * 0.0005) for i in range(24)]
+    run = warmup + route_to_points(COURSE)
+    run += [(40.764 + i * 0.0001, -73.985130) for i in range(50)]
+
+    track = build_route_track(run, cell_size_meters=20)
+    traversals = find_course_traversals(index, track, radius_meters=20)
+    assert traversals == [(len(warmup), len(warmup) + len(COURSE) - 1)]
+
+    warmup_track = build_route_track(warmup, cell_size_meters=20)
+    assert find_course_traversals(index, warmup_track, radius_meters=20) == []
+
+
+def test_may_traverse():
+    """Test that only runs passing near both course ends are kept"""
+    index = build_route_index(COURSE)
+    course = route_to_points(COURSE)
+    # Starts on the course but turns off ~500m east before the end
+    detour = course[:10] + [(40.7598, -73.985130 + i * 0.001) for i in range(1, 7)]
+
+    indexes = [index, {"points": []}]
+    assert may_traverse(indexes, build_route_track(course, 20), 20) == [True, False]
+    assert may_traverse(indexes, build_route_track(detour, 20), 20) == [False, False]
+
+
+def test_endpoint_cells_near():
+    """Test that every point within the radius of the route has its cell listed"""
+    rng = random.Random(0)
+    points = route_to_points(COURSE)
+    cells = set(endpoint_cells_near(points, 100))
+
+    for _ in range(1000):
+        lat, lng = rng.choice(points)
+        bearing = rng.uniform(0, 2 * math.pi)
+        meters = rng.uniform(0, 100)
+        lat += math.cos(bearing) * meters / METERS_PER_DEGREE
+        lng += (
+            math.sin(bearing)
+            * meters
+            / (METERS_PER_DEGREE * math.cos(math.radians(lat)))
+        )
+        assert endpoint_cell(lat, lng) in cells
+
+    assert endpoint_cell(40.785091, -73.968285) not in cells
+    assert endpoint_cells_near([], 100) == []
+
+
+def test_endpoint_cell_signs():
+    """Test that cells on either side of the equator and meridian differ"""
+    cells = {
+        endpoint_cell(lat, lng)
+        for lat in (-0.0001, 0.0001)
+        for lng in (-0.0001, 0.0001)
+    }
+    assert len(cells) == 4
+
+
+def test_near_course_matches_deviation():
+    """Test the early exit check agrees with the point deviation"""
+    rng = random.Random(0)
+    index = build_route_index(COURSE)
+
+    for _ in range(500):
+        lat = 40.758896 + rng.uniform(-0.002, 0.007)
+        lng = -73.985130 + rng.uniform(-0.002, 0.002)
+        deviation = point_deviation_meters(index, lat, lng)
+        if abs(deviation - 50) > 0.01:
+            assert _near_course(index, lat, lng, 50) == (deviation <= 50)
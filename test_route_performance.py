@@ -0,0 +1,18 @@
+"""
+Performance regression checks for route math, see benchmarks/micro.py
+
+Wall-clock comparisons, so they only run with pytest --benchmarks.
+"""
+
+import pytest
+
+from benchmarks.micro import check_speedups, run_benchmarks
+
+pytestmark = pytest.mark.benchmark
+
+
+def test_route_math_speedups():
+    """Test the batched and array code paths keep their lead over the references"""
+    results = run_benchmarks(sizes=[10000], min_time=0.05)
+    failures = check_speedups(results)
+    assert not failures, "\n".join(failures)
@@ -0,0 +1,88 @@
+"""
+Tests for route upload validation
+"""
+
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.runs import RunCreateRequest
+
+RUN = {
+    "start_time": "2026-01-01T07:00:00Z",
+    "end_time": "2026-01-01T07:30:00Z",
+    "duration": 30,
+    "distance": 5,
+}
+
+
+def test_route_points_are_strict():
+    """Test that unknown keys and out of range coordinates are rejected"""
+    with pytest.raises(ValidationError):
+        RunCreateRequest(**RUN, route=[{"latitude": 40.0, "longitude": -73.0, "x": 1}])
+    with pytest.raises(ValidationError):
+        RunCreateRequest(**RUN, route=[{"latitude": 91.0, "longitude": -73.0}])
+
+
+def test_route_timestamps_are_stored_as_sent():
+    """Test that POSIX and ISO 8601 timestamps are kept, and garbage rejected"""
+    run = RunCreateRequest(
+        **RUN,
+        route=[
+            {"latitude": 40.0, "longitude": -73.0, "timestamp": 1767250800},
+            {"latitude": 40.1, "longitude": -73.1, "timestamp": "2026-01-01T07:00:01Z"},
+        ],
+    )
+
+    assert [p["timestamp"] for p in run.route_dicts()] == [
+        1767250800,
+        "2026-01-01T07:00:01Z",
+    ]
+    with pytest.raises(ValidationError):
+        RunCreateRequest(
+            **RUN, route=[{"latitude": 40.0, "longitude": -73.0, "timestamp": "noon"}]
+        )
+
+
+def test_compact_route_matches_point_route():
+    """Test that both encodings store the same route"""
+    points = RunCreateRequest(
+        **RUN,
+        route=[
+            {"latitude": 40.0, "longitude": -73.0, "timestamp": 1767250800},
+            {"latitude": 40.1, "longitude": -73.1, "timestamp": 1767250801},
+        ],
+    )
+    compact = RunCreateRequest(
+        **RUN,
+        route_compact={
+            "latitude": [40.0, 40.1],
+            "longitude": [-73.0, -73.1],
+            "timestamp": [1767250800, 1767250801],
+        },
+    )
+
+    assert compact.route_dicts() == points.route_dicts()
+
+
+def test_compact_route_polyline():
+    """Test decoding coordinates sent as an encoded polyline"""
+    run = RunCreateRequest(**RUN, route_compact={"polyline": "_p~iF~ps|U_ulLnnqC"})
+
+    assert run.route_dicts() == [
+        {"latitude": 38.5, "longitude": -120.2},
+        {"latitude": 40.7, "longitude": -120.95},
+    ]
+
+
+def test_compact_route_rejects_mismatched_arrays():
+    """Test that parallel arrays must have the same length"""
+    with pytest.raises(ValidationError):
+        RunCreateRequest(
+            **RUN, route_compact={"latitude": [40.0, 40.1], "longitude": [-73.0]}
+        )
+    with pytest.raises(ValidationError):
+        RunCreateRequest(
+            **RUN,
+            route=[{"latitude": 40.0, "longitude": -73.0}],
+            route_compact={"latitude": [40.0], "longitude": [-73.0]},
+        )
@@ -0,0 +1,61 @@
+"""
+Tests for the per-user time zone helpers
+"""
+
+from datetime import date, datetime, timezone
+
+import pytest
+
+from app.utils.timezones import (
+    get_zone,
+    local_period_keys,
+    month_key,
+    validate_timezone,
+    week_key,
+)
+
+
+def test_validate_timezone():
+    """Test IANA names are accepted and anything else rejected"""
+    assert validate_timezone("Europe/Kyiv") == "Europe/Kyiv"
+    with pytest.raises(ValueError):
+        validate_timezone("Mars/Olympus_Mons")
+    with pytest.raises(ValueError):
+        validate_timezone("../etc/passwd")
+
+
+def test_get_zone_falls_back_to_utc():
+    """Test missing or unknown stored names resolve to UTC"""
+    assert get_zone(None).key == "UTC"
+    assert get_zone("Nowhere/Special").key == "UTC"
+    assert get_zone("America/New_York").key == "America/New_York"
+
+
+def test_period_keys_use_iso_weeks():
+    """Test week keys follow ISO years across the new year"""
+    assert week_key(date(2026, 10, 19)) == 202643
+    assert week_key(date(2027, 1, 1)) == 202653
+    assert week_key(date(2024, 12, 30)) == 202501
+    assert month_key(date(2026, 10, 19)) == 202610
+
+
+def test_local_period_keys_near_midnight():
+    """Test a late evening run lands on the runner's local day, week and month"""
+    moment = datetime(2026, 10, 31, 23, 30, tzinfo=timezone.utc)
+    assert local_period_keys(moment, "UTC") == {
+        "local_date": date(2026, 10, 31),
+        "local_hour": 23,
+        "week_key": 202644,
+        "month_key": 202610,
+    }
+    # Already Sunday morning, November 1st, in Kyiv
+    assert local_period_keys(moment, "Europe/Kyiv") == {
+        "local_date": date(2026, 11, 1),
+        "local_hour": 1,
+        "week_key": 202644,
+        "month_key": 202611,
+    }
+    # Naive datetimes are UTC
+    assert local_period_keys(moment.replace(tzinfo=None), "Europe/Kyiv") == (
+        local_period_keys(moment, "Europe/Kyiv")
+    )